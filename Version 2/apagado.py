@@ -0,0 +1,51 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import select
+import socket
+import threading
+
+#CLASE SEÑAL DE APAGADO-----------------------------------------------------
+#     Esta clase reemplaza la bandera servidor_activo y los timeouts con
+#     que cada servicio la revisaba periódicamente. Combina un evento, que
+#     el hilo principal espera sin consumir CPU, con un par de sockets de
+#     aviso: los servidores esperan con select() a que su socket tenga
+#     datos o a que llegue el aviso, así que al activar la señal se
+#     despiertan de inmediato en lugar de esperar el próximo timeout.
+#---------------------------------------------------------------------------
+
+class SenalApagado:
+    def __init__(self):
+        self._evento = threading.Event()
+        self._lector, self._escritor = socket.socketpair()
+        self._lock = threading.Lock()
+
+    # INICIAR EL APAGADO Y DESPERTAR A QUIENES ESPERAN---------------------
+    def activar(self):
+        with self._lock:
+            if self._evento.is_set():
+                return
+            self._evento.set()
+            # EL BYTE NO SE LEE: EL SOCKET QUEDA LEGIBLE PARA TODOS LOS HILOS
+            self._escritor.send(b"\0")
+
+    def activo(self):
+        return not self._evento.is_set()
+
+    def esperar(self, timeout=None):
+        return self._evento.wait(timeout)
+
+    # ESPERAR DATOS EN UN SOCKET O EL APAGADO, LO QUE OCURRA PRIMERO--------
+    # Retorna True si el socket está listo (o venció el timeout) y False si
+    # se activó el apagado.
+    def esperar_legible(self, sock, timeout=None):
+        if self._evento.is_set():
+            return False
+        legibles, _, _ = select.select([sock, self._lector], [], [], timeout)
+        return self._lector not in legibles
+
+    # DESPUÉS DE UN fork() EL PAR DE SOCKETS QUEDA COMPARTIDO CON LOS OTROS--
+    # PROCESOS: CADA HIJO CREA EL SUYO PARA QUE SU APAGADO NO LOS DESPIERTE
+    def renovar(self):
+        self._lector.close()
+        self._escritor.close()
+        self._lector, self._escritor = socket.socketpair()
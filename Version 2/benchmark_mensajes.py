@@ -0,0 +1,115 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import argparse
+import datetime
+import re
+import time
+import timeit
+import compresion
+from compresion import entrenar_diccionario, registrar_diccionario, SIN_DICCIONARIO
+from mensajes import interpretar_mensaje, extender_mensaje, serializar_mensaje, nuevo_mensaje_completo, TIPO_FIN, TIPO_COMPLETO, CODEC_TEXTO, CODEC_BINARIO
+from palabras import ProveedorAleatorio
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+LARGOS = (10, 100, 1000, 10000, 100000)
+REPETICIONES = 2000
+UMBRAL_COMPRESION = 1024
+
+#FUNCIÓN SALTO ORIGINAL-----------------------------------------------------
+#     Reproduce el procesamiento de un salto antes del módulo mensajes:
+#     verificar la finalización con una expresión regular, separar el
+#     mensaje con otra que recorre todo el texto y volver a contar las
+#     palabras de la cadena completa.
+#---------------------------------------------------------------------------
+
+def salto_original(data, nueva_palabra):
+    if re.match(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}-FIN', data):
+        return None
+    patron = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})-([0-9a-f]+)-(\d+)-(\d+)-(.+)$'
+    timestamp, id_cadena, largo_minimo, largo_actual, mensaje_actual = re.match(patron, data).groups()
+    mensaje_actualizado = f"{mensaje_actual} {nueva_palabra}"
+    nuevo_largo = len(mensaje_actualizado.split())
+    nuevo_timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return f"{nuevo_timestamp}-{id_cadena}-{largo_minimo}-{nuevo_largo}-{mensaje_actualizado}"
+
+#FUNCIÓN SALTO CON EL MÓDULO MENSAJES---------------------------------------
+
+def salto_actual(data, nueva_palabra, codec=CODEC_TEXTO):
+    tipo, contenido = interpretar_mensaje(data)
+    if tipo == TIPO_FIN:
+        return None
+    assert tipo == TIPO_COMPLETO
+    return serializar_mensaje(extender_mensaje(contenido, nueva_palabra), codec)
+
+def salto_binario(data, nueva_palabra):
+    return salto_actual(data, nueva_palabra, CODEC_BINARIO)
+
+#FUNCIÓN MEDIR---------------------------------------------------------------
+#     Retorna el costo promedio por mensaje, en microsegundos, de procesar
+#     un salto sobre una cadena del largo indicado.
+#---------------------------------------------------------------------------
+
+def medir(funcion, data, repeticiones):
+    total = timeit.timeit(lambda: funcion(data, "palabra"), number=repeticiones)
+    return 1e6 * total / repeticiones
+
+#FUNCIÓN MEDIR CADENA-------------------------------------------------------
+#     Encadena saltos a partir de un mensaje, como lo recorre el anillo, y
+#     retorna el costo promedio por salto en microsegundos y el promedio de
+#     bytes enviados. Con compresión, incluye las veces en que la cola
+#     supera el umbral y el texto se vuelve a comprimir.
+#---------------------------------------------------------------------------
+
+def medir_cadena(data, repeticiones, codec=CODEC_TEXTO):
+    enviados = 0
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        data = salto_actual(data, "palabra", codec)
+        enviados += len(data)
+    return 1e6 * (time.perf_counter() - inicio) / repeticiones, enviados / repeticiones
+
+#FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark del procesamiento de un salto en modo completo")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES,
+                        help="cantidad de mensajes procesados por medición")
+    parser.add_argument('--umbral', type=int, default=UMBRAL_COMPRESION,
+                        help="umbral de compresión en bytes para los saltos encadenados")
+    args = parser.parse_args()
+
+    proveedor = ProveedorAleatorio(0)
+    print(f"{'palabras':>10} {'bytes':>10} {'original (us)':>15} {'mensajes (us)':>15} {'parseo (us)':>13} {'binario (us)':>14}")
+    for largo in LARGOS:
+        texto = " ".join(proveedor.siguiente() for _ in range(largo))
+        inicial = nuevo_mensaje_completo("0123456789ab", largo + 1, texto)
+        data = serializar_mensaje(inicial)
+        binario = serializar_mensaje(inicial, CODEC_BINARIO)
+        assert salto_original(data, "palabra").split("-", 4)[3:] == salto_actual(data, "palabra").split("-", 4)[3:]
+
+        original = medir(salto_original, data, args.repeticiones)
+        actual = medir(salto_actual, data, args.repeticiones)
+        parseo = medir(lambda mensaje, _: interpretar_mensaje(mensaje), data, args.repeticiones)
+        codec_binario = medir(salto_binario, binario, args.repeticiones)
+        print(f"{largo:>10} {len(data):>10} {original:>15.2f} {actual:>15.2f} {parseo:>13.2f} {codec_binario:>14.2f}")
+
+    # COMPRESIÓN: SALTOS ENCADENADOS SIN Y CON DICCIONARIO PREDEFINIDO------
+    diccionario = registrar_diccionario(entrenar_diccionario(list(proveedor.vocabulario)), activar=False)
+    variantes = ((0, SIN_DICCIONARIO), (args.umbral, SIN_DICCIONARIO), (args.umbral, diccionario))
+    print(f"\nSaltos encadenados, con compresión sobre {args.umbral} bytes (promedio por salto)")
+    print(f"{'palabras':>10} {'bytes':>10} {'texto (us)':>12} {'comprimido':>11} {'(us)':>8} {'con dicc.':>10} {'(us)':>8}")
+    for largo in LARGOS:
+        texto = " ".join(proveedor.siguiente() for _ in range(largo))
+        resultados = []
+        for umbral, compresion.diccionario_activo in variantes:
+            inicial = nuevo_mensaje_completo("0123456789ab", 2 * largo, texto, umbral)
+            resultados.append(medir_cadena(serializar_mensaje(inicial), args.repeticiones))
+        (plano, bytes_plano), (comprimido, bytes_comprimido), (con_diccionario, bytes_diccionario) = resultados
+        print(f"{largo:>10} {bytes_plano:>10.0f} {plano:>12.2f} {bytes_comprimido:>11.0f} {comprimido:>8.2f} {bytes_diccionario:>10.0f} {con_diccionario:>8.2f}")
+    compresion.diccionario_activo = SIN_DICCIONARIO
+
+#EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
+
+if __name__ == "__main__":
+    main()
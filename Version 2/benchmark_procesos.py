@@ -0,0 +1,94 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import argparse
+import glob
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from nodo import CONEXIONES_POR_PROCESO
+from topologia import PUERTO_BASE
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+PROCESOS = (1, 2, 4)
+CADENAS = 400
+LARGO_MINIMO = 40
+PATRON_TIEMPO = re.compile(r"^Tiempo total: ([\d.]+) ms", re.MULTILINE)
+PATRON_CADENAS = re.compile(r"(\d+)/(\d+) cadenas completadas")
+PATRON_TAREAS = re.compile(r"^Métricas del pool de trabajadores: Servicio (\d): (\d+) tareas", re.MULTILINE)
+PATRON_DERIVADOS = re.compile(r"(\d+) mensajes derivados a otros procesos")
+
+#FUNCIÓN EJECUTAR ANILLO----------------------------------------------------
+#     Ejecuta un anillo completo con nodo.py --todos y reúne, de la salida
+#     de cada nodo, las tareas que procesó cada proceso de los Servicio 2,
+#     3 y 4 y los mensajes que tuvieron que derivarse a otro proceso.
+#
+#     PARÁMETROS:
+#          procesos = procesos de los Servicio 2, 3 y 4
+#          conexiones = conexiones de cada nodo hacia el siguiente
+#          puerto_base = puerto del primer nodo
+#          args = opciones interpretadas por main()
+#
+#     RETORNA:
+#          (milisegundos, cadenas completadas, {servicio: [tareas por proceso]}, derivados)
+#---------------------------------------------------------------------------
+
+def ejecutar_anillo(procesos, conexiones, puerto_base, args):
+    with tempfile.TemporaryDirectory() as directorio:
+        comando = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nodo.py'),
+                   '--todos', '--puerto-base', str(puerto_base), '--directorio', directorio,
+                   '--cadenas', str(args.cadenas), '--largo-minimo', str(args.largo_minimo),
+                   '--palabras', 'aleatorio:0', '--procesos', str(procesos),
+                   '--conexiones-destino', str(conexiones)]
+        salida = subprocess.run(comando, capture_output=True, text=True).stdout
+        tiempo = float(PATRON_TIEMPO.search(salida).group(1))
+        completadas = sum(int(hechas) for hechas, _ in PATRON_CADENAS.findall(salida))
+        tareas = {}
+        derivados = 0
+        for ruta in glob.glob(os.path.join(directorio, "*.out")):
+            with open(ruta, encoding='utf-8') as archivo:
+                texto = archivo.read()
+            for servicio, cantidad in PATRON_TAREAS.findall(texto):
+                if servicio != "1":
+                    tareas.setdefault(f"Servicio {servicio}", []).append(int(cantidad))
+            derivados += sum(int(cantidad) for cantidad in PATRON_DERIVADOS.findall(texto))
+    return tiempo, completadas, tareas, derivados
+
+#FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara el anillo con los Servicio 2, 3 y 4 divididos en distinta cantidad de procesos")
+    parser.add_argument('--procesos', type=int, nargs='+', default=list(PROCESOS),
+                        help="cantidades de procesos por servicio que se comparan")
+    parser.add_argument('--cadenas', type=int, default=CADENAS,
+                        help="cadenas que circulan por el anillo en cada medición")
+    parser.add_argument('--largo-minimo', type=int, default=LARGO_MINIMO,
+                        help="largo mínimo de cada cadena")
+    parser.add_argument('--puerto-base', type=int, default=PUERTO_BASE,
+                        help="puerto del primer nodo de la primera medición; cada medición usa otros puertos")
+    args = parser.parse_args()
+
+    print(f"{args.cadenas} cadenas de largo {args.largo_minimo}, {os.cpu_count()} CPU")
+    if os.cpu_count() == 1:
+        print("Con una sola CPU los procesos no corren en paralelo: solo se ve el reparto, no la ganancia de tiempo")
+
+    # CON UNA SOLA CONEXIÓN HACIA CADA SERVICIO, TODO LLEGA A UN PROCESO----
+    variantes = []
+    for procesos in args.procesos:
+        if procesos > 1:
+            variantes.append((procesos, 1))
+        variantes.append((procesos, CONEXIONES_POR_PROCESO * procesos if procesos > 1 else 1))
+
+    print(f"{'procesos':>9} {'conexiones':>11} {'tiempo (ms)':>12} {'cadenas/s':>10} {'derivados':>10}  tareas por proceso")
+    for numero, (procesos, conexiones) in enumerate(variantes):
+        tiempo, completadas, tareas, derivados = ejecutar_anillo(procesos, conexiones, args.puerto_base + 10 * numero, args)
+        reparto = "  ".join(f"S{servicio[-1]} " + "/".join(str(cantidad) for cantidad in sorted(tareas[servicio], reverse=True))
+                            for servicio in sorted(tareas))
+        print(f"{procesos:>9} {conexiones:>11} {tiempo:>12.1f} {completadas / tiempo * 1000:>10.1f} {derivados:>10}  {reparto}")
+
+#EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
+
+if __name__ == "__main__":
+    main()
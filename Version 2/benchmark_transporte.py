@@ -0,0 +1,209 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import argparse
+import multiprocessing
+import socket
+import tempfile
+import time
+from apagado import SenalApagado
+from conexiones import conectar
+from memoria_compartida import EmisorCompartido, ReceptorCompartido
+from protocolo import empaquetar_trama, recibir_tramas
+from transporte import direccion_servicio, crear_socket_servidor, TRANSPORTE_INET, TRANSPORTE_UNIX, TRANSPORTE_COMPARTIDA
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+TAMANOS_FLUJO = (64, 1024, 16 * 1024, 256 * 1024)
+TAMANOS_DATAGRAMA = (64, 512, 1400, 8192)
+REPETICIONES = 2000
+VOLUMEN_RENDIMIENTO = 64 * 1024 * 1024
+TAMANO_TRAMA_RENDIMIENTO = 64 * 1024
+PING = "p"
+FIN_ECO = "fin"
+
+#FUNCIÓN ECO DE TRAMAS------------------------------------------------------
+#     Devuelve cada mensaje de ping recibido, igual que un salto decodifica
+#     y reenvía un mensaje. Los demás solo se cuentan, y con una trama
+#     vacía responde la cantidad de bytes contados, para medir el
+#     rendimiento en un solo sentido. Termina al cerrarse la conexión o al
+#     recibir FIN_ECO.
+#
+#     PARÁMETROS:
+#          tramas = iterable con los mensajes recibidos
+#          enviar = función que escribe una trama de respuesta
+#---------------------------------------------------------------------------
+
+def eco(tramas, enviar):
+    recibidos = 0
+    for trama in tramas:
+        if not trama:
+            enviar(empaquetar_trama(str(recibidos)))
+            recibidos = 0
+        elif trama == FIN_ECO:
+            return
+        elif trama[:1] == PING:
+            enviar(empaquetar_trama(trama))
+        else:
+            recibidos += len(trama)
+
+def eco_flujo(server_sock):
+    conn, _ = server_sock.accept()
+    with conn:
+        eco(recibir_tramas(conn), conn.sendall)
+
+# EL ECO DEL ANILLO DE IDA RESPONDE POR EL ANILLO DE VUELTA------------------
+def eco_compartido(ida, directorio):
+    vuelta = EmisorCompartido("benchmark-vuelta", directorio)
+    try:
+        eco(ida.recibir(SenalApagado()), vuelta.enviar)
+    finally:
+        vuelta.cerrar()
+
+#FUNCIÓN SERVIDOR DE ECO DE DATAGRAMAS--------------------------------------
+
+def eco_datagramas(server_sock):
+    while True:
+        data, addr = server_sock.recvfrom(65535)
+        if not data:
+            return
+        server_sock.sendto(data, addr)
+
+#FUNCIÓN INICIAR ECO--------------------------------------------------------
+#     Ejecuta un eco en un proceso hijo, como el servicio siguiente del
+#     anillo, para que no comparta el GIL con el proceso que mide. Con
+#     fork el hijo hereda los sockets y segmentos ya creados.
+#---------------------------------------------------------------------------
+
+def iniciar_eco(funcion, *args):
+    proceso = multiprocessing.get_context("fork").Process(target=funcion, args=args, daemon=True)
+    proceso.start()
+    return proceso
+
+#FUNCIÓN MEDIR ECO----------------------------------------------------------
+#     Retorna la latencia promedio de ida y vuelta, en microsegundos, de
+#     cada tamaño de trama y el rendimiento en MB/s de un envío continuo.
+#
+#     PARÁMETROS:
+#          enviar = función que escribe una trama hacia el eco
+#          tramas = iterador con las respuestas del eco
+#          repeticiones = cantidad de idas y vueltas por tamaño
+#---------------------------------------------------------------------------
+
+def medir_eco(enviar, tramas, repeticiones):
+    latencias = []
+    for tamano in TAMANOS_FLUJO:
+        trama = empaquetar_trama(PING * tamano)
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            enviar(trama)
+            next(tramas)
+        latencias.append(1e6 * (time.perf_counter() - inicio) / repeticiones)
+
+    trama = empaquetar_trama("x" * TAMANO_TRAMA_RENDIMIENTO)
+    cantidad = VOLUMEN_RENDIMIENTO // TAMANO_TRAMA_RENDIMIENTO
+    inicio = time.perf_counter()
+    for _ in range(cantidad):
+        enviar(trama)
+    enviar(empaquetar_trama(""))
+    recibidos = int(next(tramas))
+    return latencias, recibidos / (time.perf_counter() - inicio) / 1e6
+
+#FUNCIÓN MEDIR FLUJO--------------------------------------------------------
+#     Mide el eco por el mismo tipo de conexión que usan los saltos TCP y
+#     HTTP, sobre INET o sobre un socket Unix.
+#---------------------------------------------------------------------------
+
+def medir_flujo(transporte, directorio, repeticiones):
+    direccion = direccion_servicio(transporte, "localhost", 0, directorio=directorio)
+    with crear_socket_servidor(direccion) as server_sock:
+        proceso = iniciar_eco(eco_flujo, server_sock)
+        sock = conectar(server_sock.getsockname(), 1.0)
+        sock.settimeout(None)
+        with sock:
+            resultado = medir_eco(sock.sendall, recibir_tramas(sock), repeticiones)
+    proceso.join(1.0)
+    return resultado
+
+#FUNCIÓN MEDIR MEMORIA COMPARTIDA-------------------------------------------
+#     Mide el eco con un anillo en memoria compartida en cada sentido, como
+#     los que usan los servicios con --transporte compartida. Este proceso
+#     crea ambos anillos y los borra al terminar; el hijo lee el de ida.
+#---------------------------------------------------------------------------
+
+def medir_compartida(directorio, repeticiones):
+    ida = ReceptorCompartido("benchmark-ida", directorio)
+    vuelta = ReceptorCompartido("benchmark-vuelta", directorio)
+    emisor_ida = EmisorCompartido("benchmark-ida", directorio)
+    proceso = iniciar_eco(eco_compartido, ida, directorio)
+    try:
+        resultado = medir_eco(emisor_ida.enviar, vuelta.recibir(SenalApagado()), repeticiones)
+        emisor_ida.enviar(empaquetar_trama(FIN_ECO))
+        proceso.join(1.0)
+        return resultado
+    finally:
+        for extremo in (emisor_ida, ida, vuelta):
+            extremo.cerrar()
+
+#FUNCIÓN MEDIR DATAGRAMAS---------------------------------------------------
+#     Retorna la latencia promedio de ida y vuelta, en microsegundos, de
+#     cada tamaño de datagrama. Con sockets Unix el cliente se enlaza a una
+#     ruta propia para recibir la respuesta, igual que el emisor confiable.
+#---------------------------------------------------------------------------
+
+def medir_datagramas(transporte, directorio, repeticiones):
+    direccion = direccion_servicio(transporte, "localhost", 0, socket.SOCK_DGRAM, directorio)
+    with crear_socket_servidor(direccion, socket.SOCK_DGRAM) as server_sock:
+        proceso = iniciar_eco(eco_datagramas, server_sock)
+        destino = server_sock.getsockname()
+        with socket.socket(server_sock.family, socket.SOCK_DGRAM) as sock:
+            if transporte == TRANSPORTE_UNIX:
+                sock.bind(direccion_servicio(transporte, "localhost", "cliente", socket.SOCK_DGRAM, directorio))
+            sock.connect(destino)
+            latencias = []
+            for tamano in TAMANOS_DATAGRAMA:
+                datagrama = b"x" * tamano
+                inicio = time.perf_counter()
+                for _ in range(repeticiones):
+                    sock.send(datagrama)
+                    sock.recv(65535)
+                latencias.append(1e6 * (time.perf_counter() - inicio) / repeticiones)
+            sock.send(b"")
+        proceso.join(1.0)
+    return latencias
+
+#FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los saltos sobre loopback INET, sockets de dominio Unix y memoria compartida")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES,
+                        help="cantidad de idas y vueltas por medición")
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix="sockets-") as directorio:
+        for transporte in (TRANSPORTE_INET, TRANSPORTE_UNIX):
+            latencias, rendimiento = medir_flujo(transporte, directorio, args.repeticiones)
+            resultados[transporte] = (latencias, rendimiento, medir_datagramas(transporte, directorio, args.repeticiones))
+        resultados[TRANSPORTE_COMPARTIDA] = medir_compartida(directorio, args.repeticiones)
+
+    print("Ida y vuelta por conexión de flujo (TCP / Unix SOCK_STREAM / anillo en memoria compartida)")
+    print(f"{'bytes':>10} {'inet (us)':>12} {'unix (us)':>12} {'mejora':>8} {'compartida (us)':>16} {'mejora':>8}")
+    for i, tamano in enumerate(TAMANOS_FLUJO):
+        inet, unix, compartida = (resultados[transporte][0][i] for transporte in (TRANSPORTE_INET, TRANSPORTE_UNIX, TRANSPORTE_COMPARTIDA))
+        print(f"{tamano:>10} {inet:>12.2f} {unix:>12.2f} {inet / unix:>7.2f}x {compartida:>16.2f} {inet / compartida:>7.2f}x")
+
+    print("\nIda y vuelta por datagramas (UDP / Unix SOCK_DGRAM)")
+    print(f"{'bytes':>10} {'inet (us)':>12} {'unix (us)':>12} {'mejora':>8}")
+    for i, tamano in enumerate(TAMANOS_DATAGRAMA):
+        inet, unix = resultados[TRANSPORTE_INET][2][i], resultados[TRANSPORTE_UNIX][2][i]
+        print(f"{tamano:>10} {inet:>12.2f} {unix:>12.2f} {inet / unix:>7.2f}x")
+
+    inet, unix, compartida = (resultados[transporte][1] for transporte in (TRANSPORTE_INET, TRANSPORTE_UNIX, TRANSPORTE_COMPARTIDA))
+    print(f"\nRendimiento de flujo en un sentido ({TAMANO_TRAMA_RENDIMIENTO // 1024} KB por trama)")
+    print(f"{'inet (MB/s)':>12} {'unix (MB/s)':>12} {'mejora':>8} {'compartida (MB/s)':>18} {'mejora':>8}")
+    print(f"{inet:>12.1f} {unix:>12.1f} {unix / inet:>7.2f}x {compartida:>18.1f} {compartida / inet:>7.2f}x")
+
+#EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
+
+if __name__ == "__main__":
+    main()
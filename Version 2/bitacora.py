@@ -0,0 +1,303 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import argparse
+import collections
+import os
+import struct
+import threading
+import time
+import zlib
+from mensajes import formatear_timestamp, timestamp_a_ns
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+ARCHIVO_BITACORA = "mensajes_finales.log"
+EXTENSION_INDICE = ".idx"
+LOTE_FSYNC = 32
+INTERVALO_FSYNC = 0.01
+
+# REGISTRO: CRC32, LARGO DEL TEXTO, ID, TIMESTAMP (NS) Y CANTIDAD DE PALABRAS
+# El CRC cubre todo lo que le sigue, así que un registro cortado por una
+# caída a mitad de escritura se detecta al abrir la bitácora.
+CABECERA_REGISTRO = struct.Struct('!II6sQI')
+# ENTRADA DEL ÍNDICE: ID DE LA CADENA Y POSICIÓN DE SU REGISTRO--------------
+ENTRADA_INDICE = struct.Struct('!6sQ')
+
+RegistroCadena = collections.namedtuple('RegistroCadena', 'id_cadena timestamp largo texto')
+
+#FUNCIÓN CODIFICAR REGISTRO-------------------------------------------------
+
+def codificar_registro(id_cadena, timestamp, largo, texto):
+    datos = texto.encode('utf-8')
+    cabecera = CABECERA_REGISTRO.pack(0, len(datos), bytes.fromhex(id_cadena), timestamp_a_ns(timestamp), largo)
+    crc = zlib.crc32(datos, zlib.crc32(cabecera[4:]))
+    return struct.pack('!I', crc) + cabecera[4:] + datos
+
+#FUNCIÓN LEER REGISTRO------------------------------------------------------
+#     Lee el registro que comienza en la posición indicada de un archivo
+#     binario abierto.
+#
+#     RETORNA:
+#          tupla (RegistroCadena, posición siguiente), o None si el
+#          registro está incompleto o su CRC no coincide
+#---------------------------------------------------------------------------
+
+def leer_registro(archivo, posicion):
+    archivo.seek(posicion)
+    cabecera = archivo.read(CABECERA_REGISTRO.size)
+    if len(cabecera) < CABECERA_REGISTRO.size:
+        return None
+    crc, largo_texto, id_bytes, timestamp, largo = CABECERA_REGISTRO.unpack(cabecera)
+    datos = archivo.read(largo_texto)
+    if len(datos) < largo_texto or zlib.crc32(datos, zlib.crc32(cabecera[4:])) != crc:
+        return None
+    registro = RegistroCadena(id_bytes.hex(), timestamp, largo, datos.decode('utf-8'))
+    return registro, posicion + CABECERA_REGISTRO.size + largo_texto
+
+#CLASE BITÁCORA DE CADENAS--------------------------------------------------
+#     Esta clase guarda los resultados de las cadenas completadas en un
+#     archivo de solo agregado, en lugar de sobrescribir un archivo por
+#     cada cadena. El archivo y su índice se abren una sola vez. Cada
+#     registro se escribe al llegar, pero el fsync se hace por grupos
+#     (commit en grupo): un hilo sincroniza cuando se juntan `lote`
+#     registros o pasa `intervalo` desde el primero sin sincronizar, y
+#     agregar() espera ese fsync compartido antes de retornar. Un índice
+#     lateral guarda la posición de cada registro para buscar el resultado
+#     de una cadena sin recorrer la bitácora; si falta o quedó incompleto
+#     tras una caída, se reconstruye al abrir.
+#
+#     PARÁMETROS:
+#          ruta = archivo de la bitácora (el índice agrega EXTENSION_INDICE)
+#          lote = registros que fuerzan un fsync
+#          intervalo = segundos máximos que un registro espera su fsync
+#---------------------------------------------------------------------------
+
+class BitacoraCadenas:
+    def __init__(self, ruta=ARCHIVO_BITACORA, lote=LOTE_FSYNC, intervalo=INTERVALO_FSYNC):
+        self.ruta = ruta
+        self.ruta_indice = ruta + EXTENSION_INDICE
+        self.lote = lote
+        self.intervalo = intervalo
+        self._posiciones = self._recuperar()
+        self._archivo = open(self.ruta, 'ab')
+        self._indice = open(self.ruta_indice, 'ab')
+        self._posicion = self._archivo.tell()
+        self._escritos = 0
+        self._sincronizados = 0
+        self._primero_pendiente = None
+        self._fsyncs = 0
+        self._cerrado = False
+        self._condicion = threading.Condition()
+        self._hilo = threading.Thread(target=self._sincronizar_grupos, name="bitacora")
+        self._hilo.daemon = True
+        self._hilo.start()
+
+    # VALIDAR LA BITÁCORA Y SU ÍNDICE AL ABRIR------------------------------
+    # Si la última entrada del índice apunta a un registro válido que
+    # termina justo al final del archivo, ambos están al día. Si no, se
+    # recorre la bitácora, se descarta un registro final incompleto y se
+    # reescribe el índice.
+    def _recuperar(self):
+        if not os.path.exists(self.ruta):
+            open(self.ruta, 'wb').close()
+        tamano = os.path.getsize(self.ruta)
+        entradas = b""
+        if os.path.exists(self.ruta_indice):
+            with open(self.ruta_indice, 'rb') as indice:
+                entradas = indice.read()
+        cantidad = len(entradas) // ENTRADA_INDICE.size
+        posiciones = {}
+        for numero in range(cantidad):
+            id_bytes, posicion = ENTRADA_INDICE.unpack_from(entradas, numero * ENTRADA_INDICE.size)
+            posiciones[id_bytes.hex()] = posicion
+
+        with open(self.ruta, 'rb') as archivo:
+            if len(entradas) == cantidad * ENTRADA_INDICE.size:
+                if cantidad == 0 and tamano == 0:
+                    return posiciones
+                if cantidad:
+                    _, ultima = ENTRADA_INDICE.unpack_from(entradas, (cantidad - 1) * ENTRADA_INDICE.size)
+                    leido = leer_registro(archivo, ultima)
+                    if leido is not None and leido[1] == tamano:
+                        return posiciones
+
+            # RECONSTRUIR EL ÍNDICE RECORRIENDO LA BITÁCORA------------------
+            print(f"Reconstruyendo el índice de {self.ruta}")
+            posiciones = {}
+            nuevas = []
+            posicion = 0
+            while True:
+                leido = leer_registro(archivo, posicion)
+                if leido is None:
+                    break
+                registro, siguiente = leido
+                posiciones[registro.id_cadena] = posicion
+                nuevas.append(ENTRADA_INDICE.pack(bytes.fromhex(registro.id_cadena), posicion))
+                posicion = siguiente
+        if posicion < tamano:
+            print(f"Se descartan {tamano - posicion} bytes de un registro incompleto en {self.ruta}")
+            os.truncate(self.ruta, posicion)
+        with open(self.ruta_indice, 'wb') as indice:
+            indice.write(b"".join(nuevas))
+        return posiciones
+
+    # AGREGAR EL RESULTADO DE UNA CADENA------------------------------------
+    # Con esperar=True retorna cuando el registro ya está en disco.
+    def agregar(self, id_cadena, timestamp, largo, texto, esperar=True):
+        registro = codificar_registro(id_cadena, timestamp, largo, texto)
+        with self._condicion:
+            if self._cerrado:
+                raise ValueError("Bitácora cerrada")
+            posicion = self._posicion
+            self._archivo.write(registro)
+            self._indice.write(ENTRADA_INDICE.pack(bytes.fromhex(id_cadena), posicion))
+            self._posicion += len(registro)
+            self._posiciones[id_cadena] = posicion
+            self._escritos += 1
+            numero = self._escritos
+            if self._primero_pendiente is None:
+                self._primero_pendiente = time.monotonic()
+            self._condicion.notify_all()
+            while esperar and self._sincronizados < numero and not self._cerrado:
+                self._condicion.wait()
+        return posicion
+
+    # HILO DE COMMIT EN GRUPO: UN FSYNC PARA TODOS LOS REGISTROS PENDIENTES
+    def _sincronizar_grupos(self):
+        with self._condicion:
+            while not self._cerrado:
+                pendientes = self._escritos - self._sincronizados
+                if not pendientes:
+                    self._condicion.wait()
+                    continue
+                espera = self._primero_pendiente + self.intervalo - time.monotonic()
+                if pendientes < self.lote and espera > 0:
+                    self._condicion.wait(espera)
+                    continue
+                self._sincronizar()
+
+    # SE LLAMA CON EL LOCK TOMADO; LO LIBERA DURANTE EL FSYNC, ASÍ LOS
+    # REGISTROS QUE LLEGAN MIENTRAS TANTO QUEDAN PARA EL SIGUIENTE GRUPO
+    def _sincronizar(self):
+        objetivo = self._escritos
+        self._archivo.flush()
+        self._indice.flush()
+        self._primero_pendiente = None
+        descriptor = self._archivo.fileno()
+        self._condicion.release()
+        try:
+            os.fsync(descriptor)
+        finally:
+            self._condicion.acquire()
+        self._sincronizados = max(self._sincronizados, objetivo)
+        self._fsyncs += 1
+        if self._escritos > self._sincronizados:
+            self._primero_pendiente = time.monotonic()
+        self._condicion.notify_all()
+
+    # BUSCAR EL RESULTADO DE UNA CADENA USANDO EL ÍNDICE---------------------
+    def buscar(self, id_cadena):
+        with self._condicion:
+            posicion = self._posiciones.get(id_cadena)
+            if posicion is None:
+                return None
+            self._archivo.flush()
+        with open(self.ruta, 'rb') as archivo:
+            leido = leer_registro(archivo, posicion)
+        return leido[0] if leido is not None else None
+
+    def metricas(self):
+        with self._condicion:
+            return {
+                'registros': self._escritos,
+                'fsyncs': self._fsyncs,
+                'bytes': self._posicion,
+            }
+
+    def cerrar(self):
+        with self._condicion:
+            if self._cerrado:
+                return
+            if self._escritos > self._sincronizados:
+                self._sincronizar()
+            self._cerrado = True
+            self._condicion.notify_all()
+            self._archivo.close()
+            self._indice.close()
+
+#FUNCIÓN BUSCAR EN BITÁCORA-------------------------------------------------
+#     Busca el resultado de una cadena leyendo solo el índice y el registro
+#     correspondiente, sin abrir la bitácora para escritura.
+#
+#     PARÁMETROS:
+#          id_cadena = identificador de la cadena
+#          ruta = archivo de la bitácora
+#
+#     RETORNA:
+#          RegistroCadena, o None si la cadena no está en la bitácora
+#---------------------------------------------------------------------------
+
+def buscar_en_bitacora(id_cadena, ruta=ARCHIVO_BITACORA):
+    objetivo = bytes.fromhex(id_cadena)
+    posicion = None
+    with open(ruta + EXTENSION_INDICE, 'rb') as indice:
+        entradas = indice.read()
+    for numero in range(len(entradas) // ENTRADA_INDICE.size):
+        id_bytes, candidata = ENTRADA_INDICE.unpack_from(entradas, numero * ENTRADA_INDICE.size)
+        if id_bytes == objetivo:
+            posicion = candidata
+    if posicion is None:
+        return None
+    with open(ruta, 'rb') as archivo:
+        leido = leer_registro(archivo, posicion)
+    return leido[0] if leido is not None else None
+
+#FUNCIÓN RECORRER BITÁCORA--------------------------------------------------
+
+def recorrer_bitacora(ruta=ARCHIVO_BITACORA):
+    with open(ruta, 'rb') as archivo:
+        posicion = 0
+        while True:
+            leido = leer_registro(archivo, posicion)
+            if leido is None:
+                return
+            registro, posicion = leido
+            yield registro
+
+#FUNCIÓN FORMATEAR REGISTRO-------------------------------------------------
+#     Entrega un registro con el mismo formato que tenía mensaje_final.txt.
+#---------------------------------------------------------------------------
+
+def formatear_registro(registro):
+    return (
+        f"Mensaje final completado\n"
+        f"Cadena: {registro.id_cadena}\n"
+        f"Timestamp: {formatear_timestamp(registro.timestamp)}\n"
+        f"Mensaje: {registro.texto}\n"
+        f"Cantidad de palabras: {registro.largo}\n"
+    )
+
+#FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta la bitácora de cadenas completadas")
+    parser.add_argument('--archivo', default=ARCHIVO_BITACORA,
+                        help="archivo de la bitácora")
+    parser.add_argument('--cadena', default=None,
+                        help="identificador de la cadena a buscar (si se omite, se muestran todas)")
+    args = parser.parse_args()
+
+    if args.cadena is not None:
+        registro = buscar_en_bitacora(args.cadena, args.archivo)
+        if registro is None:
+            print(f"La cadena {args.cadena} no está en {args.archivo}")
+            return
+        print(formatear_registro(registro))
+        return
+    for registro in recorrer_bitacora(args.archivo):
+        print(formatear_registro(registro))
+
+#EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
+
+if __name__ == "__main__":
+    main()
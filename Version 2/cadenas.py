@@ -0,0 +1,133 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import threading
+import uuid
+from mensajes import construir_mensaje_delta, CODEC_TEXTO
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+NODOS_ANILLO = 4
+
+#FUNCIÓN GENERAR IDENTIFICADOR DE CADENA------------------------------------
+
+def nuevo_id_cadena():
+    return uuid.uuid4().hex[:12]
+
+#CLASE ESTADO DE CADENA-----------------------------------------------------
+#     Esta clase guarda el estado local de una cadena. En modo delta guarda
+#     la copia de la cadena: las palabras solo se agregan al final y se
+#     registra cuántas aportó cada salto, lo que permite saber qué parte de
+#     la cadena desconoce el siguiente servicio. En modo completo solo se
+#     recuerda el último largo visto, para descartar mensajes duplicados.
+#
+#     PARÁMETROS:
+#          id_cadena = identificador de la cadena
+#          largo_minimo = largo mínimo del mensaje final
+#---------------------------------------------------------------------------
+
+class EstadoCadena:
+    def __init__(self, id_cadena, largo_minimo):
+        self.id_cadena = id_cadena
+        self.largo_minimo = largo_minimo
+        self.palabras = []
+        self.segmentos = []
+        self.ultimo_largo = 0
+
+    @property
+    def largo(self):
+        return len(self.palabras)
+
+    def texto(self):
+        return " ".join(self.palabras)
+
+#CLASE TABLA DE CADENAS-----------------------------------------------------
+#     Esta clase mantiene el estado de todas las cadenas que pasan por un
+#     servicio, indexado por identificador, para que varias cadenas puedan
+#     circular a la vez. En modo delta aplica los mensajes recibidos sobre
+#     la copia local y construye el delta que se envía al siguiente
+#     servicio, que contiene solo las palabras de los últimos saltos.
+#
+#     PARÁMETROS:
+#          nodos = cantidad de nodos del anillo
+#---------------------------------------------------------------------------
+
+class TablaCadenas:
+    def __init__(self, nodos=NODOS_ANILLO):
+        self.nodos = nodos
+        self._cadenas = {}
+        self._lock = threading.Lock()
+
+    def crear(self, id_cadena, largo_minimo):
+        with self._lock:
+            estado = EstadoCadena(id_cadena, largo_minimo)
+            self._cadenas[id_cadena] = estado
+            return estado
+
+    # APLICAR UN MENSAJE DELTA SOBRE LA COPIA LOCAL------------------------
+    # Retorna None si el mensaje es un duplicado ya aplicado.
+    def aplicar_delta(self, delta):
+        with self._lock:
+            estado = self._cadenas.get(delta.id_cadena)
+            if estado is None:
+                estado = EstadoCadena(delta.id_cadena, delta.largo_minimo)
+                self._cadenas[delta.id_cadena] = estado
+
+            if delta.secuencia <= len(estado.segmentos):
+                return None
+
+            primer_segmento = delta.secuencia - len(delta.cortes)
+            conocidos = len(estado.segmentos) - primer_segmento
+            if conocidos < 0:
+                raise ValueError(f"Faltan saltos de la cadena {delta.id_cadena}")
+
+            omitidas = sum(delta.cortes[:conocidos])
+            if delta.desde + omitidas != estado.largo:
+                raise ValueError(f"Copia local inconsistente para la cadena {delta.id_cadena}")
+
+            estado.palabras.extend(delta.palabras[omitidas:])
+            estado.segmentos.extend(delta.cortes[conocidos:])
+            return estado
+
+    # REGISTRAR UN SALTO EN MODO COMPLETO----------------------------------
+    # Retorna False si el mensaje es un duplicado ya visto.
+    def registrar_salto(self, id_cadena, largo_minimo, largo):
+        with self._lock:
+            estado = self._cadenas.get(id_cadena)
+            if estado is None:
+                estado = EstadoCadena(id_cadena, largo_minimo)
+                self._cadenas[id_cadena] = estado
+            if largo <= estado.ultimo_largo:
+                return False
+            estado.ultimo_largo = largo
+            return True
+
+    def agregar_palabras(self, estado, texto):
+        nuevas = texto.split()
+        with self._lock:
+            estado.palabras.extend(nuevas)
+            estado.segmentos.append(len(nuevas))
+
+    # CONSTRUIR EL DELTA PARA EL SIGUIENTE SERVICIO------------------------
+    # El siguiente servicio conoce la cadena hasta su último envío, es
+    # decir, le faltan los aportes de los otros nodos - 1 saltos.
+    def construir_delta(self, estado, codec=CODEC_TEXTO):
+        with self._lock:
+            cortes = estado.segmentos[-(self.nodos - 1):]
+            desde = estado.largo - sum(cortes)
+            return construir_mensaje_delta(
+                estado.id_cadena,
+                len(estado.segmentos),
+                estado.largo_minimo,
+                desde,
+                cortes,
+                estado.palabras[desde:],
+                codec,
+            )
+
+    def eliminar(self, id_cadena):
+        with self._lock:
+            self._cadenas.pop(id_cadena, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._cadenas.clear()
@@ -0,0 +1,180 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import collections
+import zlib
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+# LOS MENSAJES COMPRIMIDOS EMPIEZAN CON ESTE BYTE (VER mensajes.py)--------
+MARCA_COMPRIMIDA = 0xA5
+NIVEL_COMPRESION = 6
+TAMANO_DICCIONARIO = 32 * 1024  # zlib solo usa los últimos 32 KB
+PALABRAS_ENTRENAMIENTO = 8192
+SIN_DICCIONARIO = 0
+CODIFICACION_HTTP = "x-anillo-zlib"
+diccionarios = {}
+diccionario_activo = SIN_DICCIONARIO
+
+#FUNCIÓN ENTRENAR DICCIONARIO-----------------------------------------------
+#     Esta función arma un diccionario predefinido de zlib con las palabras
+#     más recientes de un texto. Cada palabra aparece una sola vez, con el
+#     espacio que la antecede en los mensajes, y las más frecuentes quedan
+#     al final, donde zlib las referencia con distancias más cortas. Así la
+#     primera aparición de una palabra en un mensaje ya se comprime.
+#
+#     PARÁMETROS:
+#          palabras = lista de palabras, de la más antigua a la más reciente
+#          tamano = tamaño máximo del diccionario en bytes
+#
+#     RETORNA:
+#          bytes = diccionario para zlib
+#---------------------------------------------------------------------------
+
+def entrenar_diccionario(palabras, tamano=TAMANO_DICCIONARIO):
+    frecuencias = collections.Counter(palabras[-PALABRAS_ENTRENAMIENTO:])
+    ordenadas = sorted(frecuencias, key=frecuencias.get)
+    return "".join(f" {palabra}" for palabra in ordenadas).encode('utf-8')[-tamano:]
+
+#FUNCIÓN REGISTRAR DICCIONARIO----------------------------------------------
+#     Los mensajes indican su diccionario con el CRC32 de este, así que un
+#     servicio solo lo usa para descomprimir si tiene exactamente el mismo.
+#
+#     PARÁMETROS:
+#          diccionario = bytes del diccionario
+#          activar = si lo usan las cadenas que inicia este servicio
+#
+#     RETORNA:
+#          int = identificador del diccionario
+#---------------------------------------------------------------------------
+
+def registrar_diccionario(diccionario, activar=True):
+    global diccionario_activo
+    identificador = zlib.crc32(diccionario) or 1
+    diccionarios[identificador] = diccionario
+    if activar:
+        diccionario_activo = identificador
+    return identificador
+
+# ENTRENAR CON LAS ÚLTIMAS PALABRAS DE UN ARCHIVO DE TEXTO------------------
+def cargar_diccionario(ruta):
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        palabras = archivo.read().split()
+    if not palabras:
+        raise ValueError(f"El archivo {ruta} no contiene palabras")
+    return registrar_diccionario(entrenar_diccionario(palabras))
+
+#FUNCIONES COMPRIMIR Y DESCOMPRIMIR-----------------------------------------
+#     La parte comprimida de un mensaje es una serie de segmentos zlib
+#     independientes, todos con el mismo diccionario, que se descomprimen
+#     uno tras otro. Un mensaje con un diccionario que este servicio no
+#     tiene no se puede comprimir ni descomprimir; se informa con ValueError.
+#---------------------------------------------------------------------------
+
+def _zdict(diccionario):
+    if diccionario not in diccionarios:
+        raise ValueError(f"Diccionario de compresión desconocido: {diccionario:08x}")
+    return {'zdict': diccionarios[diccionario]}
+
+def comprimir(datos, diccionario=SIN_DICCIONARIO):
+    opciones = _zdict(diccionario) if diccionario != SIN_DICCIONARIO else {}
+    compresor = zlib.compressobj(NIVEL_COMPRESION, **opciones)
+    return compresor.compress(datos) + compresor.flush()
+
+def descomprimir(datos, diccionario=SIN_DICCIONARIO):
+    opciones = _zdict(diccionario) if diccionario != SIN_DICCIONARIO and datos else {}
+    partes = []
+    while datos:
+        descompresor = zlib.decompressobj(**opciones)
+        partes.append(descompresor.decompress(datos))
+        if not descompresor.eof:
+            raise ValueError("Segmento comprimido incompleto")
+        datos = descompresor.unused_data
+    return b"".join(partes)
+
+#CLASE TEXTO COMPRIMIDO-----------------------------------------------------
+#     Esta clase representa el texto acumulado de una cadena que viaja
+#     comprimida: una parte comprimida con zlib, seguida de una cola con las
+#     palabras agregadas desde la última compresión, sin comprimir. Cada
+#     salto solo agrega su palabra a la cola y reenvía los bytes
+#     comprimidos tal como llegaron; cuando la cola supera el umbral, la
+#     comprime en un segmento nuevo que se suma a la parte comprimida, así
+#     que ningún salto descomprime ni vuelve a comprimir lo anterior. El
+#     texto completo solo se arma al pedirlo con str(), por ejemplo al
+#     guardar el mensaje final, y queda guardado para no descomprimirlo
+#     dos veces.
+#
+#     PARÁMETROS:
+#          comprimido = bytes de la parte comprimida (vacío al inicio)
+#          cola = texto agregado después de la parte comprimida
+#          umbral = bytes de la cola a partir de los cuales se comprime
+#          diccionario = identificador del diccionario de la parte comprimida
+#---------------------------------------------------------------------------
+
+class TextoComprimido:
+    __slots__ = ('comprimido', 'cola', 'umbral', 'diccionario', '_texto')
+
+    def __init__(self, comprimido, cola, umbral, diccionario=SIN_DICCIONARIO):
+        self.comprimido = comprimido
+        self.cola = cola
+        self.umbral = umbral
+        self.diccionario = diccionario
+        self._texto = None if comprimido else cola
+
+    def __str__(self):
+        if self._texto is None:
+            self._texto = descomprimir(self.comprimido, self.diccionario).decode('utf-8') + self.cola
+        return self._texto
+
+    # MOSTRAR EL MENSAJE NO DEBE OBLIGAR A DESCOMPRIMIRLO--------------------
+    def __repr__(self):
+        return f"<{len(self.comprimido)} bytes comprimidos + {len(self.cola)} sin comprimir>"
+
+    def extender(self, palabras):
+        separador = " " if self.comprimido or self.cola else ""
+        return TextoComprimido(self.comprimido, f"{self.cola}{separador}{palabras}", self.umbral, self.diccionario)
+
+    #MÉTODO EMPAQUETAR-------------------------------------------------------
+    #     Retorna la parte comprimida y la cola en UTF-8 con que se envía el
+    #     texto. Si la cola supera el umbral, pasa a un segmento comprimido;
+    #     si este servicio no tiene el diccionario del mensaje, la cola sigue
+    #     creciendo sin comprimir hasta un servicio que sí lo tenga.
+    #-----------------------------------------------------------------------
+
+    def empaquetar(self):
+        cola = self.cola.encode('utf-8')
+        if len(cola) <= self.umbral:
+            return self.comprimido, cola
+        try:
+            return self.comprimido + comprimir(cola, self.diccionario), b""
+        except ValueError:
+            return self.comprimido, cola
+
+#FUNCIÓN DECODIFICAR CONTENIDO HTTP-----------------------------------------
+#     Esta función interpreta el header Content-Encoding de una petición. El
+#     Servicio 3 marca los mensajes comprimidos con CODIFICACION_HTTP, que
+#     el Servicio 4 recibe sin descomprimir; un cuerpo "deflate" de otro
+#     cliente se descomprime entero. Cualquier otra codificación se rechaza
+#     con ValueError, que el servidor responde con 415.
+#
+#     PARÁMETROS:
+#          cuerpo = bytes del cuerpo de la petición
+#          codificacion = valor del header Content-Encoding, o None
+#
+#     RETORNA:
+#          bytes = cuerpo listo para decodificar_datos()
+#---------------------------------------------------------------------------
+
+def decodificar_contenido(cuerpo, codificacion):
+    codificacion = (codificacion or "identity").strip().lower()
+    if codificacion == "identity":
+        return cuerpo
+    if codificacion == CODIFICACION_HTTP:
+        if not cuerpo or cuerpo[0] != MARCA_COMPRIMIDA:
+            raise ValueError(f"El cuerpo no es un mensaje comprimido ({CODIFICACION_HTTP})")
+        return cuerpo
+    if codificacion == "deflate":
+        try:
+            return zlib.decompress(cuerpo)
+        except zlib.error as e:
+            raise ValueError(f"Cuerpo deflate inválido: {e}")
+    raise ValueError(f"Content-Encoding no soportado: {codificacion}")
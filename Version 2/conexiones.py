@@ -0,0 +1,358 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import collections
+import socket
+import select
+import threading
+import time
+from transporte import familia, mostrar_direccion
+from compresion import MARCA_COMPRIMIDA, CODIFICACION_HTTP
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+TAMANO_POOL = 4
+TIMEOUT_CONEXION = 5.0
+TIMEOUT_RESPUESTA = 10.0
+MAX_PENDIENTES_HTTP = 16
+REINTENTOS_HTTP = 2
+PLAZO_SONDEO = 10.0
+ESPERA_SONDEO_INICIAL = 0.02
+ESPERA_SONDEO_MAXIMA = 0.5
+
+#CLASE POOL DE CONEXIONES TCP-----------------------------------------------
+#     Esta clase mantiene un conjunto de conexiones TCP persistentes hacia
+#     un mismo destino. En lugar de abrir y cerrar un socket por cada
+#     mensaje, las conexiones se reutilizan entre envíos, evitando el
+#     handshake de tres vías y la acumulación de sockets en TIME_WAIT.
+#     Si una conexión se cae antes de escribir la trama, se descarta y se
+#     reconecta automáticamente; si se cae a mitad de una trama, el error
+#     se propaga para no entregarla truncada ni duplicada;
+#     si el destino aún no escucha, se reintenta hasta plazo_conexion.
+#     Un pool exclusivo envía de a una trama por una sola conexión, para
+#     que todo lo que pasa por él llegue al mismo proceso del destino.
+#
+#     PARÁMETROS:
+#          direccion = (host, port) del destino, o ruta de su socket Unix
+#          tamano_maximo = cantidad máxima de conexiones ociosas guardadas
+#          plazo_conexion = segundos que se espera a que el destino escuche
+#          exclusiva = True para usar una sola conexión, de a un envío
+#---------------------------------------------------------------------------
+
+class PoolConexiones:
+    def __init__(self, direccion, tamano_maximo=TAMANO_POOL, plazo_conexion=PLAZO_SONDEO, exclusiva=False):
+        self.direccion = direccion
+        self.tamano_maximo = tamano_maximo
+        self.plazo_conexion = plazo_conexion
+        self._libres = []
+        self._lock = threading.Lock()
+        self._turno = threading.Lock() if exclusiva else None
+        self._cerrado = False
+
+    def _crear_conexion(self):
+        sock = conectar(self.direccion, self.plazo_conexion)
+        sock.settimeout(None)
+        return sock
+
+    # UNA CONEXIÓN OCIOSA QUE ES LEGIBLE FUE CERRADA POR EL OTRO EXTREMO----
+    # (los receptores nunca responden, así que solo puede ser EOF o error)
+    def _sigue_viva(self, sock):
+        try:
+            legibles, _, _ = select.select([sock], [], [], 0)
+            return not legibles
+        except (OSError, ValueError):
+            return False
+
+    def _obtener(self):
+        with self._lock:
+            while self._libres:
+                sock = self._libres.pop()
+                if self._sigue_viva(sock):
+                    return sock
+                sock.close()
+        return self._crear_conexion()
+
+    def _devolver(self, sock):
+        with self._lock:
+            if not self._cerrado and len(self._libres) < self.tamano_maximo:
+                self._libres.append(sock)
+                return
+        sock.close()
+
+    # ENVIAR UNA TRAMA COMPLETA-------------------------------------------
+    # Si la conexión reutilizada falla antes de escribir un solo byte, se
+    # reintenta una vez con una conexión nueva. Si ya se escribió parte de
+    # la trama no se reintenta: el receptor vería una trama truncada o
+    # duplicada, así que el error se propaga al llamador.
+    def enviar(self, datos):
+        if self._turno is None:
+            return self._enviar(datos)
+        with self._turno:
+            return self._enviar(datos)
+
+    def _enviar(self, datos):
+        sock = self._obtener()
+        vista = memoryview(datos)
+        enviados = 0
+        try:
+            while enviados < len(vista):
+                enviados += sock.send(vista[enviados:])
+        except OSError:
+            sock.close()
+            if enviados:
+                raise
+            sock = self._crear_conexion()
+            try:
+                sock.sendall(datos)
+            except OSError:
+                sock.close()
+                raise
+        self._devolver(sock)
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrado = True
+            libres, self._libres = self._libres, []
+        for sock in libres:
+            sock.close()
+
+#CLASE CLIENTE HTTP PERSISTENTE---------------------------------------------
+#     Esta clase envía peticiones HTTP/1.1 POST por una única conexión
+#     persistente. Soporta pipelining: varios hilos pueden escribir sus
+#     peticiones sin esperar la respuesta de las anteriores, y un hilo
+#     lector asigna las respuestas en el mismo orden en que se enviaron.
+#     Cada respuesta se interpreta completa (línea de estado, headers y
+#     cuerpo según Content-Length). Si la conexión se cae, se reconecta y
+#     se reenvían las peticiones que quedaron sin respuesta. Si el servidor
+#     aún no escucha, se reintenta la conexión hasta plazo_conexion.
+#
+#     PARÁMETROS:
+#          direccion = (host, port) del servidor HTTP, o ruta de su socket Unix
+#          ruta = ruta a la que se envían las peticiones POST
+#          max_pendientes = cantidad máxima de peticiones sin respuesta
+#          plazo_conexion = segundos que se espera a que el servidor escuche
+#---------------------------------------------------------------------------
+
+class ClienteHTTP:
+    def __init__(self, direccion, ruta="/mensaje", max_pendientes=MAX_PENDIENTES_HTTP, plazo_conexion=PLAZO_SONDEO):
+        self.direccion = direccion
+        self.host = "localhost" if isinstance(direccion, str) else mostrar_direccion(direccion)
+        self.ruta = ruta
+        self.plazo_conexion = plazo_conexion
+        self._sock = None
+        self._pendientes = collections.deque()
+        self._lock = threading.Lock()
+        self._cupos = threading.BoundedSemaphore(max_pendientes)
+        self._cerrado = False
+
+    def _construir_peticion(self, cuerpo):
+        codificacion = ""
+        if isinstance(cuerpo, str):
+            datos, tipo = cuerpo.encode('utf-8'), "text/plain; charset=utf-8"
+        else:
+            datos, tipo = cuerpo, "application/octet-stream"
+            if datos[:1] == bytes((MARCA_COMPRIMIDA,)):
+                codificacion = f"Content-Encoding: {CODIFICACION_HTTP}\r\n"
+        return (
+            f"POST {self.ruta} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Content-Type: {tipo}\r\n"
+            f"{codificacion}"
+            f"Content-Length: {len(datos)}\r\n"
+            f"Connection: keep-alive\r\n"
+            f"\r\n"
+        ).encode('latin-1') + datos
+
+    # ABRIR CONEXIÓN Y LANZAR SU HILO LECTOR (SE LLAMA CON EL LOCK TOMADO)--
+    def _conectar(self):
+        sock = conectar(self.direccion, self.plazo_conexion)
+        sock.settimeout(None)
+        self._sock = sock
+        lector = threading.Thread(target=self._leer_respuestas, args=(sock,))
+        lector.daemon = True
+        lector.start()
+
+    def enviar(self, cuerpo, timeout=TIMEOUT_RESPUESTA):
+        pendiente = {'peticion': self._construir_peticion(cuerpo), 'listo': threading.Event(), 'intentos': 0}
+        self._cupos.acquire()
+        try:
+            with self._lock:
+                if self._cerrado:
+                    raise ConnectionError("Cliente HTTP cerrado")
+                if self._sock is None:
+                    self._conectar()
+                self._pendientes.append(pendiente)
+                try:
+                    self._sock.sendall(pendiente['peticion'])
+                except OSError:
+                    # EL HILO LECTOR DETECTA LA CAÍDA Y REENVÍA LO PENDIENTE
+                    self._cortar(self._sock)
+
+            if not pendiente['listo'].wait(timeout):
+                raise TimeoutError("Sin respuesta del servidor HTTP")
+            if 'error' in pendiente:
+                raise pendiente['error']
+            return pendiente['respuesta']
+        finally:
+            self._cupos.release()
+
+    # HILO LECTOR: ASIGNA CADA RESPUESTA A LA PETICIÓN MÁS ANTIGUA----------
+    def _leer_respuestas(self, sock):
+        archivo = sock.makefile('rb')
+        try:
+            while True:
+                respuesta = leer_respuesta_http(archivo)
+                with self._lock:
+                    pendiente = self._pendientes.popleft()
+                pendiente['respuesta'] = respuesta
+                pendiente['listo'].set()
+                if respuesta[2].get('connection', '').lower() == 'close':
+                    break
+        except (OSError, ValueError, IndexError):
+            pass
+        finally:
+            archivo.close()
+            self._recuperar(sock)
+
+    # RECONECTAR Y REENVIAR LAS PETICIONES QUE QUEDARON SIN RESPUESTA------
+    def _recuperar(self, sock):
+        with self._lock:
+            if self._sock is not sock:
+                return
+            sock.close()
+            self._sock = None
+            if not self._pendientes or self._cerrado:
+                self._fallar_pendientes(ConnectionError("Conexión HTTP cerrada"))
+                return
+            for pendiente in self._pendientes:
+                pendiente['intentos'] += 1
+            if self._pendientes[0]['intentos'] > REINTENTOS_HTTP:
+                self._fallar_pendientes(ConnectionError("El servidor HTTP cerró la conexión repetidamente"))
+                return
+            try:
+                self._conectar()
+                for pendiente in self._pendientes:
+                    self._sock.sendall(pendiente['peticion'])
+            except OSError as e:
+                if self._sock is not None:
+                    self._sock.close()
+                    self._sock = None
+                self._fallar_pendientes(e)
+
+    def _cortar(self, sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _fallar_pendientes(self, error):
+        while self._pendientes:
+            pendiente = self._pendientes.popleft()
+            pendiente['error'] = error
+            pendiente['listo'].set()
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrado = True
+            if self._sock is not None:
+                self._cortar(self._sock)
+
+#FUNCIÓN LEER RESPUESTA HTTP------------------------------------------------
+#     Esta función lee una respuesta HTTP completa desde un archivo binario
+#     asociado a un socket: línea de estado, headers y cuerpo de largo
+#     Content-Length.
+#
+#     PARÁMETROS:
+#          archivo = archivo binario obtenido con socket.makefile('rb')
+#
+#     RETORNA:
+#          tupla (código, razón, headers, cuerpo)
+#---------------------------------------------------------------------------
+
+def leer_respuesta_http(archivo):
+    linea_estado = archivo.readline()
+    if not linea_estado:
+        raise ConnectionError("El servidor HTTP cerró la conexión")
+    partes = linea_estado.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    if len(partes) < 2 or not partes[0].startswith('HTTP/'):
+        raise ValueError(f"Línea de estado inválida: {linea_estado!r}")
+    codigo = partes[1]
+    razon = partes[2] if len(partes) == 3 else ''
+
+    headers = {}
+    while True:
+        linea = archivo.readline().decode('latin-1').rstrip('\r\n')
+        if not linea:
+            break
+        nombre, _, valor = linea.partition(':')
+        headers[nombre.strip().lower()] = valor.strip()
+
+    largo = int(headers.get('content-length', 0))
+    cuerpo = archivo.read(largo) if largo else b''
+    if len(cuerpo) < largo:
+        raise ConnectionError("Respuesta HTTP incompleta")
+    return int(codigo), razon, headers, cuerpo
+
+#FUNCIÓN ABRIR CONEXIÓN-----------------------------------------------------
+#     Abre una conexión de flujo TCP (sin algoritmo de Nagle) o Unix.
+#---------------------------------------------------------------------------
+
+def abrir_conexion(direccion):
+    if familia(direccion) == socket.AF_INET:
+        sock = socket.create_connection(direccion, timeout=TIMEOUT_CONEXION)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(TIMEOUT_CONEXION)
+    try:
+        sock.connect(direccion)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+#FUNCIÓN CONECTAR-----------------------------------------------------------
+#     Esta función abre una conexión de flujo. Si el servicio aún no escucha
+#     (conexión rechazada, o socket Unix todavía inexistente), reintenta con
+#     esperas que se duplican hasta agotar el plazo, de modo que el tiempo
+#     de espera depende de cuándo el servicio queda listo y no de una pausa
+#     fija.
+#
+#     PARÁMETROS:
+#          direccion = (host, port) del servicio, o ruta de su socket Unix
+#          plazo = segundos máximos de reintento (0 intenta una sola vez)
+#
+#     RETORNA:
+#          socket conectado
+#---------------------------------------------------------------------------
+
+def conectar(direccion, plazo=PLAZO_SONDEO):
+    limite = time.monotonic() + plazo
+    espera = ESPERA_SONDEO_INICIAL
+    while True:
+        try:
+            return abrir_conexion(direccion)
+        except (ConnectionRefusedError, FileNotFoundError):
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise
+            time.sleep(min(espera, restante))
+            espera = min(2 * espera, ESPERA_SONDEO_MAXIMA)
+
+#FUNCIÓN ESPERAR SERVICIO---------------------------------------------------
+#     Esta función comprueba que un servicio ya acepta conexiones,
+#     abriendo y cerrando una conexión de prueba con reintentos.
+#
+#     PARÁMETROS:
+#          direccion = (host, port) del servicio, o ruta de su socket Unix
+#          plazo = segundos máximos de espera
+#
+#     RETORNA:
+#          True si el servicio respondió dentro del plazo, False si no
+#---------------------------------------------------------------------------
+
+def esperar_servicio(direccion, plazo=PLAZO_SONDEO):
+    try:
+        conectar(direccion, plazo).close()
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,209 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import threading
+import time
+from mensajes import cabecera_de, TIPO_FIN, TIPO_COMPLETA
+from trabajadores import marcas_por_defecto
+from transporte import BACKLOG
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+POLITICA_ESPERAR = "esperar"
+POLITICA_RECHAZAR = "rechazar"
+POLITICA_DESCARTAR = "descartar"
+POLITICAS = (POLITICA_ESPERAR, POLITICA_RECHAZAR, POLITICA_DESCARTAR)
+MAX_CONEXIONES = 64
+RETRY_AFTER = 1  # segundos que el Servicio 4 pide esperar en un 503
+ESPERA_MAXIMA_REINTENTO = 30  # tope de la espera que se acepta de un Retry-After
+TIPOS_CONTROL = (TIPO_FIN, TIPO_COMPLETA)
+
+#FUNCIÓN AGREGAR OPCIONES DE CONTRAPRESIÓN----------------------------------
+
+def agregar_opciones_contrapresion(parser):
+    parser.add_argument('--politica', choices=POLITICAS, default=POLITICA_ESPERAR,
+                        help="qué hacer con la cola saturada: esperar pausa la lectura de la entrada; rechazar responde 503 con Retry-After (HTTP) o no confirma el datagrama (UDP), y pausa los saltos TCP; descartar pierde los mensajes nuevos")
+    parser.add_argument('--marca-alta', type=int, default=None,
+                        help="mensajes en la cola desde los cuales el servicio está saturado (por defecto, 3/4 de --cola)")
+    parser.add_argument('--marca-baja', type=int, default=None,
+                        help="mensajes en la cola hasta los cuales debe bajar para dejar de estar saturado (por defecto, 1/4 de --cola)")
+    parser.add_argument('--max-conexiones', type=int, default=MAX_CONEXIONES,
+                        help="conexiones de entrada atendidas a la vez; las demás esperan en el backlog")
+    parser.add_argument('--backlog', type=int, default=BACKLOG,
+                        help="largo de la cola de conexiones que el kernel retiene sin aceptar")
+
+# COMPLETAR LAS MARCAS Y COMPROBAR LAS OPCIONES-----------------------------
+def validar_contrapresion(parser, args):
+    if args.cola <= 0:
+        parser.error("la capacidad de la cola debe ser mayor a 0")
+    args.marca_alta, args.marca_baja = marcas_por_defecto(args.cola, args.marca_alta, args.marca_baja)
+    if not 0 <= args.marca_baja < args.marca_alta <= args.cola:
+        parser.error("las marcas deben cumplir 0 <= --marca-baja < --marca-alta <= --cola")
+    if args.max_conexiones <= 0 or args.backlog <= 0:
+        parser.error("--max-conexiones y --backlog deben ser mayores a 0")
+
+#FUNCIÓN CAPACIDAD DEL ANILLO-----------------------------------------------
+#     Calcula cuántas cadenas pueden circular a la vez sin que el anillo se
+#     trabe. Como el anillo es cerrado, cada cadena tiene siempre un solo
+#     mensaje en camino, y un servicio solo deja de avanzar mientras está
+#     pausado: con más de marca_baja mensajes en la cola y sus trabajadores
+#     ocupados enviando al siguiente. Con a lo sumo nodos * (marca_baja +
+#     trabajadores) cadenas, no pueden estar todos los servicios pausados a
+#     la vez, así que el anillo sigue avanzando. El Servicio 1 usa este
+#     valor como --en-vuelo por defecto, suponiendo que los demás servicios
+#     usan las mismas opciones de cola; las colas de los sockets y de los
+#     canales en memoria solo agregan holgura.
+#
+#     PARÁMETROS:
+#          nodos = cantidad de servicios del anillo
+#          trabajadores = hilos trabajadores de cada servicio
+#          marca_baja = marca baja de la cola de cada servicio
+#
+#     RETORNA:
+#          cantidad máxima de cadenas en circulación (al menos 1)
+#---------------------------------------------------------------------------
+
+def capacidad_anillo(nodos, trabajadores, marca_baja):
+    return max(1, nodos * (marca_baja + trabajadores))
+
+# SEGUNDOS QUE PIDE ESPERAR UNA RESPUESTA 503 (CABECERAS EN MINÚSCULAS)----
+def segundos_reintento(cabeceras):
+    try:
+        return min(ESPERA_MAXIMA_REINTENTO, max(0, int(cabeceras.get('retry-after', RETRY_AFTER))))
+    except ValueError:
+        return RETRY_AFTER
+
+#CLASE CONTROL DE CARGA-----------------------------------------------------
+#     Esta clase aplica la política de un servicio cuando su pool de
+#     trabajadores está saturado, es decir, entre que la cola llega a la
+#     marca alta y vuelve a bajar a la marca baja. Cada receptor avisa al
+#     emisor como su protocolo lo permite:
+#          esperar = deja de leer la entrada; TCP, la ventana UDP confiable
+#                    y los anillos en memoria compartida frenan al emisor,
+#                    y el Servicio 4 retiene la respuesta HTTP
+#          rechazar = el Servicio 4 responde 503 con Retry-After y el
+#                     Servicio 3 no confirma el datagrama, así el emisor
+#                     reintenta más tarde; los saltos TCP no tienen cómo
+#                     rechazar y esperan
+#          descartar = los mensajes nuevos se pierden (y sus cadenas no se
+#                      completan): la latencia queda acotada a costa de la
+#                      entrega, para pruebas de sobrecarga
+#     Las señales de finalización y los avisos de cadena completa nunca se
+#     rechazan ni se descartan. Antes de crear el pool, el servicio nunca
+#     está saturado. Con --async, el pool es el propio RuntimeAsync, que
+#     pausa la entrada sin bloquear el bucle de eventos.
+#
+#     PARÁMETROS:
+#          nombre = nombre del servicio, para las métricas
+#          politica = una de POLITICAS
+#---------------------------------------------------------------------------
+
+class ControlCarga:
+    def __init__(self, nombre, politica=POLITICA_ESPERAR):
+        self.nombre = nombre
+        self.politica = politica
+        self.pool = None
+        self._lock = threading.Lock()
+        self._pausas = 0
+        self._tiempo_pausado = 0.0
+        self._rechazados = 0
+        self._descartados = 0
+
+    def saturado(self):
+        return self.pool is not None and self.pool.saturado()
+
+    # NINGUNO DE LOS MENSAJES PUEDE SER UNA SEÑAL DE CONTROL-----------------
+    def _aplica(self, politica, mensajes):
+        if self.politica != politica or not self.saturado():
+            return False
+        return not any(cabecera_de(mensaje)[0] in TIPOS_CONTROL for mensaje in mensajes)
+
+    #MÉTODO PAUSAR-----------------------------------------------------------
+    #     Detiene al hilo que lee la entrada hasta que la cola baje a la
+    #     marca baja. Lo llama el receptor después de encolar cada mensaje.
+    #
+    #     PARÁMETROS:
+    #          rechaza = True si el salto puede rechazar mensajes (HTTP o
+    #                    UDP confiable): con la política rechazar no se
+    #                    pausa, porque el emisor ya recibe el rechazo
+    #-----------------------------------------------------------------------
+
+    def pausar(self, rechaza=False):
+        if not self.debe_pausar(rechaza):
+            return
+        inicio = time.monotonic()
+        self.pool.esperar_espacio()
+        self.anotar_pausa(time.monotonic() - inicio)
+
+    # True SI EL RECEPTOR DEBE DEJAR DE LEER (VER pausar)-------------------
+    def debe_pausar(self, rechaza=False):
+        if self.politica == POLITICA_DESCARTAR or (rechaza and self.politica == POLITICA_RECHAZAR):
+            return False
+        return self.saturado()
+
+    def anotar_pausa(self, segundos):
+        with self._lock:
+            self._pausas += 1
+            self._tiempo_pausado += segundos
+
+    # True SI LOS MENSAJES (LOS DE UN DATAGRAMA, O UNO) SE DEBEN RECHAZAR---
+    # Un datagrama se confirma entero, así que se acepta si lleva alguna
+    # señal de control.
+    def rechazar(self, *mensajes):
+        if not self._aplica(POLITICA_RECHAZAR, mensajes):
+            return False
+        with self._lock:
+            self._rechazados += 1
+        return True
+
+    # False SI EL MENSAJE SE DESCARTA EN LUGAR DE ENCOLARSE------------------
+    def admitir(self, mensaje):
+        if not self._aplica(POLITICA_DESCARTAR, (mensaje,)):
+            return True
+        with self._lock:
+            self._descartados += 1
+            descartados = self._descartados
+        print(f"{self.nombre} saturado: mensaje descartado ({descartados} en total)")
+        return False
+
+    def resumen(self):
+        with self._lock:
+            return (f"{self.nombre} (política {self.politica}): "
+                    f"{self._pausas} pausas de la entrada ({1000 * self._tiempo_pausado:.1f} ms), "
+                    f"{self._rechazados} rechazos, {self._descartados} descartes")
+
+#CLASE CUPOS----------------------------------------------------------------
+#     Esta clase limita cuántas unidades de trabajo se atienden a la vez:
+#     las conexiones de entrada de un servidor, o las cadenas en circulación
+#     del Servicio 1. ocupar() espera a que haya un cupo libre; al cerrar,
+#     despierta a quienes esperan y retorna False.
+#
+#     PARÁMETROS:
+#          maximo = cantidad de cupos (0 no limita)
+#---------------------------------------------------------------------------
+
+class Cupos:
+    def __init__(self, maximo):
+        self.maximo = maximo
+        self._ocupados = 0
+        self._cerrado = False
+        self._condicion = threading.Condition()
+
+    def ocupar(self):
+        with self._condicion:
+            while self.maximo and self._ocupados >= self.maximo and not self._cerrado:
+                self._condicion.wait()
+            if self._cerrado:
+                return False
+            self._ocupados += 1
+            return True
+
+    # LIBERAR UN CUPO NO OCUPADO (UNA CADENA REANUDADA) NO RESTA----------
+    def liberar(self):
+        with self._condicion:
+            self._ocupados = max(0, self._ocupados - 1)
+            self._condicion.notify()
+
+    def cerrar(self):
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify_all()
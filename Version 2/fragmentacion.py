@@ -0,0 +1,140 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import itertools
+import os
+import struct
+import threading
+import time
+from udp_confiable import CABECERA_CONFIABLE
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+# CABECERA DE FRAGMENTO: MARCA, IDENTIFICADOR DEL MENSAJE, ÍNDICE Y TOTAL---
+# 0xA3 no inicia un texto UTF-8, un mensaje binario (0xA1) ni un datagrama
+# confiable (0xA2); los mensajes que caben en un datagrama van sin ella.
+MARCA_FRAGMENTO = 0xA3
+CABECERA_FRAGMENTO = struct.Struct('!BIHH')
+MTU = 1500
+CABECERAS_IP_UDP = 28
+UMBRAL_FLUJO = 256 * 1024
+TIEMPO_REENSAMBLADO = 10.0
+MEMORIA_REENSAMBLADO = 16 * 1024 * 1024
+
+#FUNCIÓN TAMAÑO DE FRAGMENTO------------------------------------------------
+#     Calcula cuántos bytes del mensaje caben en cada datagrama para que,
+#     sumando las cabeceras IP, UDP, de entrega confiable y de fragmento,
+#     el paquete no supere la MTU y no se fragmente a nivel IP.
+#---------------------------------------------------------------------------
+
+def tamano_fragmento(mtu=MTU):
+    return mtu - CABECERAS_IP_UDP - CABECERA_CONFIABLE.size - CABECERA_FRAGMENTO.size
+
+#CLASE FRAGMENTADOR---------------------------------------------------------
+#     Esta clase divide los mensajes más grandes que un datagrama en
+#     fragmentos numerados con un identificador de mensaje común. Los
+#     mensajes que caben en un solo datagrama se entregan sin cambios.
+#
+#     PARÁMETROS:
+#          mtu = MTU del enlace
+#---------------------------------------------------------------------------
+
+class Fragmentador:
+    def __init__(self, mtu=MTU):
+        self.tamano = tamano_fragmento(mtu)
+        self._identificadores = itertools.count(int.from_bytes(os.urandom(4), 'big'))
+        self._lock = threading.Lock()
+
+    def fragmentar(self, datos):
+        if len(datos) <= self.tamano:
+            return [datos]
+        total = -(-len(datos) // self.tamano)
+        if total > 0xFFFF:
+            raise ValueError(f"Mensaje de {len(datos)} bytes demasiado grande para fragmentar")
+        with self._lock:
+            identificador = next(self._identificadores) & 0xFFFFFFFF
+        vista = memoryview(datos)
+        return [
+            CABECERA_FRAGMENTO.pack(MARCA_FRAGMENTO, identificador, indice, total)
+            + vista[indice * self.tamano:(indice + 1) * self.tamano]
+            for indice in range(total)
+        ]
+
+#CLASE REENSAMBLADOR--------------------------------------------------------
+#     Esta clase junta los fragmentos de cada mensaje, que pueden llegar en
+#     cualquier orden y mezclados con los de otros mensajes, y entrega el
+#     mensaje completo cuando tiene todos. Para no acumular memoria sin
+#     límite, descarta los mensajes incompletos que superan el tiempo de
+#     reensamblado y, si los fragmentos guardados exceden la memoria
+#     máxima, descarta primero los mensajes incompletos más antiguos.
+#
+#     PARÁMETROS:
+#          tiempo_maximo = segundos que se espera el resto de un mensaje
+#          memoria_maxima = bytes máximos guardados en fragmentos
+#---------------------------------------------------------------------------
+
+class Reensamblador:
+    def __init__(self, tiempo_maximo=TIEMPO_REENSAMBLADO, memoria_maxima=MEMORIA_REENSAMBLADO):
+        self.tiempo_maximo = tiempo_maximo
+        self.memoria_maxima = memoria_maxima
+        self._parciales = {}
+        self._memoria = 0
+        self._descartados = 0
+        self._lock = threading.Lock()
+
+    def _descartar(self, clave):
+        parcial = self._parciales.pop(clave)
+        self._memoria -= parcial['bytes']
+        self._descartados += 1
+
+    def _limpiar_vencidos(self, ahora):
+        # LOS PARCIALES SE GUARDAN EN ORDEN DE LLEGADA (DICT ORDENADO)
+        while self._parciales:
+            clave, parcial = next(iter(self._parciales.items()))
+            if ahora - parcial['inicio'] < self.tiempo_maximo:
+                break
+            print(f"Mensaje fragmentado {clave[1]} incompleto tras {self.tiempo_maximo} s, se descarta")
+            self._descartar(clave)
+
+    # AGREGAR UN DATAGRAMA--------------------------------------------------
+    # Retorna el mensaje completo, o None si aún faltan fragmentos.
+    def agregar(self, datagrama, addr):
+        if len(datagrama) < CABECERA_FRAGMENTO.size or datagrama[0] != MARCA_FRAGMENTO:
+            return datagrama
+        _, identificador, indice, total = CABECERA_FRAGMENTO.unpack_from(datagrama)
+        contenido = bytes(datagrama[CABECERA_FRAGMENTO.size:])
+        clave = (addr, identificador)
+        ahora = time.monotonic()
+
+        with self._lock:
+            self._limpiar_vencidos(ahora)
+            parcial = self._parciales.get(clave)
+            if parcial is None:
+                parcial = {'inicio': ahora, 'total': total, 'fragmentos': {}, 'bytes': 0}
+                self._parciales[clave] = parcial
+            if indice >= parcial['total'] or indice in parcial['fragmentos']:
+                return None
+            parcial['fragmentos'][indice] = contenido
+            parcial['bytes'] += len(contenido)
+            self._memoria += len(contenido)
+
+            # RESPETAR LA MEMORIA MÁXIMA DESCARTANDO LOS MÁS ANTIGUOS-------
+            while self._memoria > self.memoria_maxima and self._parciales:
+                antigua = next(iter(self._parciales))
+                print(f"Memoria de reensamblado excedida, se descarta el mensaje {antigua[1]}")
+                self._descartar(antigua)
+            if clave not in self._parciales:
+                return None
+
+            if len(parcial['fragmentos']) < parcial['total']:
+                return None
+            del self._parciales[clave]
+            self._memoria -= parcial['bytes']
+        return b"".join(parcial['fragmentos'][i] for i in range(parcial['total']))
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'incompletos': len(self._parciales),
+                'memoria': self._memoria,
+                'descartados': self._descartados,
+            }
@@ -0,0 +1,154 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import servicio1
+import servicio2
+import servicio3
+import servicio4
+from memoria import CanalMemoria, CanalTramas, CanalHTTP, responder_nulo
+from bitacora import ARCHIVO_BITACORA
+from mensajes import CODEC_TEXTO, CODEC_BINARIO, PROTOCOLOS, PROTOCOLO_COMPLETO
+from protocolo import LARGO_MAXIMO_TRAMA
+from trabajadores import CANTIDAD_TRABAJADORES, CAPACIDAD_COLA
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+ORIGEN_MEMORIA = ("memoria", 2)  # dirección con que el Servicio 3 ve al Servicio 2
+SERVICIOS = (servicio1, servicio2, servicio3, servicio4)
+
+#FUNCIÓN CONECTAR SERVICIOS EN MEMORIA--------------------------------------
+#     Esta función configura los cuatro servicios con las mismas opciones
+#     que aceptan por línea de comandos, pero entrega a cada uno un canal en
+#     memoria hacia el siguiente en lugar de su emisor de sockets. El
+#     Servicio 2 envía cada mensaje completo como un único datagrama (sin
+#     fragmentar ni agrupar), que el Servicio 3 recibe por el mismo camino
+#     que los datagramas UDP.
+#
+#     PARÁMETROS:
+#          args = opciones del lanzador
+#          directorio = directorio donde se guardan los WAL de los servicios
+#
+#     RETORNA:
+#          tupla (opciones del Servicio 1, lista de canales)
+#---------------------------------------------------------------------------
+
+def conectar_servicios(args, directorio):
+    comunes = ['--palabras', args.palabras, '--trabajadores', str(args.trabajadores), '--cola', str(args.cola)]
+    if args.diccionario:
+        comunes += ['--diccionario', args.diccionario]
+    canales = [
+        CanalTramas("1->2", servicio2.encolar_mensaje, args.cola),
+        CanalMemoria("2->3", lambda datos: servicio3.recibir_datagrama(datos, ORIGEN_MEMORIA, responder_nulo), args.cola),
+        CanalHTTP("3->4", servicio4.encolar_mensaje, args.cola),
+        CanalTramas("4->1", servicio1.encolar_mensaje, args.cola),
+    ]
+
+    opciones1 = ['--cadenas', str(args.cadenas), '--protocolo', args.protocolo, '--codec', args.codec, '--comprimir', str(args.comprimir), '--esperar-destino', '0',
+                 '--wal', os.path.join(directorio, servicio1.ARCHIVO_WAL),
+                 '--wal-cadenas', os.path.join(directorio, servicio1.ARCHIVO_WAL_CADENAS)]
+    if args.largo_minimo is not None:
+        opciones1 += ['--largo-minimo', str(args.largo_minimo)]
+    if args.en_vuelo is not None:
+        opciones1 += ['--en-vuelo', str(args.en_vuelo)]
+    opciones2 = ['--mtu', str(LARGO_MAXIMO_TRAMA), '--umbral-flujo', str(LARGO_MAXIMO_TRAMA), '--demora-lote', '0',
+                 '--wal', os.path.join(directorio, servicio2.ARCHIVO_WAL)]
+    opciones3 = ['--wal', os.path.join(directorio, servicio3.ARCHIVO_WAL)]
+    opciones4 = ['--bitacora', args.bitacora, '--wal', os.path.join(directorio, servicio4.ARCHIVO_WAL)]
+
+    args1 = servicio1.configurar(comunes + opciones1, canales[0])
+    args2 = servicio2.configurar(comunes + opciones2, canales[1])
+    args3 = servicio3.configurar(comunes + opciones3, canales[2])
+    args4 = servicio4.configurar(comunes + opciones4, canales[3])
+    for servicio, opciones in zip(SERVICIOS, (args1, args2, args3, args4)):
+        servicio.iniciar_trabajadores(opciones)
+    return args1, canales
+
+#FUNCIÓN EJECUTAR ANILLO EN MEMORIA-----------------------------------------
+#     Esta función inicia las cadenas, espera a que la señal de finalización
+#     recorra el anillo y finaliza los servicios en el mismo orden en que la
+#     reciben, de modo que cada uno termina de entregar sus mensajes antes
+#     de que el siguiente se detenga.
+#
+#     PARÁMETROS:
+#          args = opciones del lanzador
+#          directorio = directorio donde se guardan los WAL de los servicios
+#
+#     RETORNA:
+#          tupla (segundos transcurridos, lista de canales)
+#---------------------------------------------------------------------------
+
+def ejecutar_anillo(args, directorio):
+    args1, canales = conectar_servicios(args, directorio)
+    inicio = time.perf_counter()
+    try:
+        for tarea in servicio1.iniciar_o_reanudar(args1):
+            servicio1.pool_trabajadores.enviar(tarea)
+        for servicio in SERVICIOS:
+            servicio.apagado.esperar()
+            servicio.finalizar()
+    except KeyboardInterrupt:
+        print("\nInterrupción detectada. Finalizando...")
+        for servicio in SERVICIOS:
+            servicio.finalizar()
+    return time.perf_counter() - inicio, canales
+
+#FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta los cuatro servicios en un solo proceso, con saltos en memoria")
+    parser.add_argument('--largo-minimo', type=int, default=None,
+                        help="largo mínimo del mensaje final (si se omite, se pide por la terminal)")
+    parser.add_argument('--cadenas', type=int, default=1,
+                        help="cantidad de cadenas que circulan en paralelo por el anillo")
+    parser.add_argument('--en-vuelo', type=int, default=None,
+                        help="cantidad máxima de cadenas en circulación a la vez (por defecto, lo que cabe en las colas del anillo)")
+    parser.add_argument('--protocolo', choices=PROTOCOLOS, default=PROTOCOLO_COMPLETO,
+                        help="modo de protocolo de las cadenas: todo el texto o solo las palabras nuevas en cada salto")
+    parser.add_argument('--codec', choices=[CODEC_TEXTO, CODEC_BINARIO], default=CODEC_TEXTO,
+                        help="formato de los mensajes")
+    parser.add_argument('--comprimir', type=int, default=0, metavar='UMBRAL',
+                        help="comprimir el texto de las cadenas que superen UMBRAL bytes (0 no comprime)")
+    parser.add_argument('--diccionario', default=None,
+                        help="archivo de texto con que se entrena el diccionario de compresión")
+    parser.add_argument('--palabras', default="aleatorio",
+                        help="origen de las palabras de los cuatro servicios: archivo:RUTA, aleatorio[:SEMILLA] o tuberia[:RUTA]")
+    parser.add_argument('--trabajadores', type=int, default=CANTIDAD_TRABAJADORES,
+                        help="cantidad de hilos trabajadores de cada servicio")
+    parser.add_argument('--cola', type=int, default=CAPACIDAD_COLA,
+                        help="capacidad de la cola de cada servicio y de cada canal")
+    parser.add_argument('--bitacora', default=ARCHIVO_BITACORA,
+                        help="archivo de solo agregado donde se guardan las cadenas completadas")
+    parser.add_argument('--directorio-wal', default=None,
+                        help="directorio de los WAL (por defecto uno temporal que se borra al terminar)")
+    parser.add_argument('--silencioso', action='store_true',
+                        help="no mostrar los mensajes de los servicios, solo el resumen final")
+    args = parser.parse_args()
+
+    print("=== LANZADOR - CUATRO SERVICIOS EN UN PROCESO ===")
+    with contextlib.ExitStack() as pila:
+        directorio = args.directorio_wal
+        if directorio is None:
+            directorio = pila.enter_context(tempfile.TemporaryDirectory(prefix="anillo-"))
+        if args.silencioso:
+            pila.enter_context(contextlib.redirect_stdout(open(os.devnull, 'w')))
+        transcurrido, canales = ejecutar_anillo(args, directorio)
+
+    # RESUMEN DE LA EJECUCIÓN-----------------------------------------------
+    print(f"Cadenas completadas: {len(servicio1.cadenas_completadas)}/{servicio1.total_cadenas}")
+    print(f"Tiempo total: {transcurrido * 1000:.1f} ms")
+    for servicio in SERVICIOS:
+        print(f"  {servicio.pool_trabajadores.resumen()}")
+    for canal in canales:
+        metricas = canal.metricas()
+        print(f"  Canal {canal.nombre}: {metricas['enviados']} envíos, cola máx. {metricas['profundidad_maxima']}")
+    return 0 if len(servicio1.cadenas_completadas) == servicio1.total_cadenas else 1
+
+#EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
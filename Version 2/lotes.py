@@ -0,0 +1,202 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import functools
+import struct
+import threading
+import time
+from fragmentacion import tamano_fragmento, MTU
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+# CABECERA DE LOTE: MARCA Y CANTIDAD DE MENSAJES; CADA UNO CON SU LARGO------
+# 0xA4 no inicia un texto UTF-8, un mensaje binario (0xA1), un datagrama
+# confiable (0xA2) ni un fragmento (0xA3); un lote de un solo mensaje se
+# envía sin cabecera.
+MARCA_LOTE = 0xA4
+CABECERA_LOTE = struct.Struct('!BH')
+LARGO_ELEMENTO = struct.Struct('!H')
+LARGO_MAXIMO_ELEMENTO = 0xFFFF  # el mayor largo que registra LARGO_ELEMENTO
+DEMORA_LOTE = 0.002
+
+#CLASE AGRUPADOR DE DATAGRAMAS----------------------------------------------
+#     Esta clase junta varios mensajes pequeños en un solo datagrama cuando
+#     hay muchos listos a la vez, para reducir la cantidad de envíos y el
+#     costo por paquete. El lote se envía cuando el siguiente mensaje ya no
+#     cabe en el tamaño máximo o cuando pasa la demora desde el primer
+#     mensaje guardado. Los mensajes que no caben en un lote, o cuyo largo
+#     no entra en LARGO_ELEMENTO, se envían solos, después de vaciar el
+#     lote actual para conservar el orden. Cada mensaje puede llevar una
+#     función al_confirmar, que se llama cuando su datagrama llega al
+#     receptor: si el enlace confirma sus datagramas (con ACK), enviar la
+#     recibe y la llama al confirmarse; si no, el enlace no pierde datos y
+#     se llama apenas se envía.
+#
+#     PARÁMETROS:
+#          enviar = función que envía un datagrama
+#          mtu = MTU del enlace, de la que se deriva el tamaño máximo del lote
+#          demora = segundos máximos que un mensaje espera en el lote
+#          confirma = True si enviar acepta al_confirmar y la llama con el ACK
+#---------------------------------------------------------------------------
+
+class AgrupadorDatagramas:
+    def __init__(self, enviar, mtu=MTU, demora=DEMORA_LOTE, confirma=False):
+        self._enviar = enviar
+        self.confirma = confirma
+        self.tamano_maximo = min(tamano_fragmento(mtu), CABECERA_LOTE.size + LARGO_ELEMENTO.size + LARGO_MAXIMO_ELEMENTO)
+        self.demora = demora
+        self._lote = []
+        self._confirmaciones = []
+        self._bytes = CABECERA_LOTE.size
+        self._vence = None
+        self._datagramas = 0
+        self._mensajes = 0
+        self._cerrado = False
+        self._condicion = threading.Condition()
+        self._hilo = threading.Thread(target=self._vaciar_vencidos, name="agrupador-udp")
+        self._hilo.daemon = True
+        self._hilo.start()
+
+    # ENVIAR UN DATAGRAMA Y AVISAR CUANDO LLEGUE----------------------------
+    def _despachar(self, datagrama, confirmaciones):
+        self._datagramas += 1
+        if not confirmaciones:
+            self._enviar(datagrama)
+        elif self.confirma:
+            self._enviar(datagrama, functools.partial(_confirmar_todas, confirmaciones))
+        else:
+            self._enviar(datagrama)
+            _confirmar_todas(confirmaciones)
+
+    # ENVIAR EL LOTE ACTUAL (SE LLAMA CON EL LOCK TOMADO)--------------------
+    # El lote se retira antes de empaquetarlo: si el envío falla, el error
+    # llega al llamador una sola vez y no se reintenta el mismo lote.
+    def _vaciar(self):
+        if not self._lote:
+            return
+        lote = self._lote
+        confirmaciones = self._confirmaciones
+        self._lote = []
+        self._confirmaciones = []
+        self._bytes = CABECERA_LOTE.size
+        self._vence = None
+        if len(lote) == 1:
+            datagrama = lote[0]
+        else:
+            partes = [CABECERA_LOTE.pack(MARCA_LOTE, len(lote))]
+            for datos in lote:
+                partes.append(LARGO_ELEMENTO.pack(len(datos)))
+                partes.append(datos)
+            datagrama = b"".join(partes)
+        self._despachar(datagrama, confirmaciones)
+
+    # AGREGAR UN MENSAJE AL LOTE--------------------------------------------
+    def agregar(self, datos, al_confirmar=None):
+        with self._condicion:
+            self._mensajes += 1
+            largo = LARGO_ELEMENTO.size + len(datos)
+            if self.demora <= 0 or CABECERA_LOTE.size + largo > self.tamano_maximo:
+                # NO CABE EN UN LOTE: SE ENVÍA SOLO----------------------------
+                self._vaciar()
+                self._despachar(datos, [al_confirmar] if al_confirmar is not None else [])
+                return
+            if self._bytes + largo > self.tamano_maximo:
+                self._vaciar()
+            self._lote.append(bytes(datos))
+            if al_confirmar is not None:
+                self._confirmaciones.append(al_confirmar)
+            self._bytes += largo
+            if self._vence is None:
+                self._vence = time.monotonic() + self.demora
+                self._condicion.notify_all()
+
+    # HILO QUE ENVÍA LOS LOTES CUYA DEMORA VENCIÓ-----------------------------
+    def _vaciar_vencidos(self):
+        with self._condicion:
+            while not self._cerrado:
+                if self._vence is None:
+                    self._condicion.wait()
+                    continue
+                espera = self._vence - time.monotonic()
+                if espera > 0:
+                    self._condicion.wait(espera)
+                    continue
+                try:
+                    self._vaciar()
+                except Exception as e:
+                    print(f"Error enviando lote de datagramas: {e}")
+
+    def metricas(self):
+        with self._condicion:
+            return {
+                'mensajes': self._mensajes,
+                'datagramas': self._datagramas,
+            }
+
+    def cerrar(self):
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify_all()
+            self._vaciar()
+
+#FUNCIÓN CONFIRMAR TODAS----------------------------------------------------
+#     Llama las funciones al_confirmar de los mensajes de un datagrama.
+#
+#     PARÁMETROS:
+#          confirmaciones = lista de funciones sin argumentos
+#---------------------------------------------------------------------------
+
+def _confirmar_todas(confirmaciones):
+    for al_confirmar in confirmaciones:
+        al_confirmar()
+
+#FUNCIÓN CONFIRMAR AL COMPLETAR---------------------------------------------
+#     Para un mensaje dividido en varias partes (fragmentos) que se confirman
+#     por separado, posiblemente desde otro hilo: retorna la función
+#     al_confirmar de cada parte, que llama confirmar una sola vez, cuando
+#     ya llegaron todas.
+#
+#     PARÁMETROS:
+#          cantidad = cantidad de partes
+#          confirmar = función sin argumentos que confirma el mensaje
+#
+#     RETORNA:
+#          función sin argumentos que se llama al confirmar cada parte
+#---------------------------------------------------------------------------
+
+def confirmar_al_completar(cantidad, confirmar):
+    if cantidad == 1:
+        return confirmar
+    restantes = [cantidad]
+    lock = threading.Lock()
+    def confirmar_parte():
+        with lock:
+            restantes[0] -= 1
+            completo = restantes[0] == 0
+        if completo:
+            confirmar()
+    return confirmar_parte
+
+#FUNCIÓN SEPARAR LOTE-------------------------------------------------------
+#     Esta función es la contraparte del agrupador en el receptor: separa
+#     los mensajes de un lote. Los datagramas sin cabecera de lote se
+#     entregan como un único mensaje.
+#
+#     PARÁMETROS:
+#          datagrama = bytes recibidos
+#
+#     RETORNA:
+#          lista con los mensajes contenidos en el datagrama
+#---------------------------------------------------------------------------
+
+def separar_lote(datagrama):
+    if len(datagrama) < CABECERA_LOTE.size or datagrama[0] != MARCA_LOTE:
+        return [datagrama]
+    _, cantidad = CABECERA_LOTE.unpack_from(datagrama)
+    mensajes = []
+    posicion = CABECERA_LOTE.size
+    for _ in range(cantidad):
+        largo, = LARGO_ELEMENTO.unpack_from(datagrama, posicion)
+        posicion += LARGO_ELEMENTO.size
+        mensajes.append(datagrama[posicion:posicion + largo])
+        posicion += largo
+    return mensajes
@@ -0,0 +1,111 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import queue
+import threading
+from protocolo import LectorTramas
+from trabajadores import CAPACIDAD_COLA
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+# RESPUESTA QUE UN CANAL HTTP EN MEMORIA ENTREGA AL EMISOR------------------
+RESPUESTA_ACEPTADA = (200, "OK", {}, b"Mensaje recibido correctamente")
+
+#FUNCIÓN RESPONDER NULO-----------------------------------------------------
+#     En memoria no hay datagramas que confirmar, así que los ACK que
+#     pidiera el receptor confiable se descartan.
+#---------------------------------------------------------------------------
+
+def responder_nulo(datos, addr):
+    pass
+
+#CLASE CANAL EN MEMORIA-----------------------------------------------------
+#     Esta clase reemplaza a un emisor de sockets cuando los cuatro
+#     servicios corren en un mismo proceso. Tiene la misma interfaz que el
+#     emisor UDP confiable (enviar y cerrar), pero en lugar de escribir en
+#     un socket deja los datos en una cola acotada, de la que un hilo
+#     consumidor los entrega a la función de recepción del servicio
+#     siguiente. Así un salto no hace llamadas al sistema, y si la cola se
+#     llena el emisor espera, igual que con el control de flujo de TCP.
+#
+#     PARÁMETROS:
+#          nombre = nombre del salto, para los mensajes y las métricas
+#          entregar = función que recibe cada elemento en el servicio siguiente
+#          capacidad = cantidad máxima de elementos en espera
+#---------------------------------------------------------------------------
+
+class CanalMemoria:
+    def __init__(self, nombre, entregar, capacidad=CAPACIDAD_COLA):
+        self.nombre = nombre
+        self._entregar = entregar
+        self._cola = queue.Queue(capacidad)
+        self._lock = threading.Lock()
+        self._cerrado = False
+        self._enviados = 0
+        self._profundidad_maxima = 0
+        self._hilo = threading.Thread(target=self._consumir, name=f"canal-{nombre}")
+        self._hilo.daemon = True
+        self._hilo.start()
+
+    def enviar(self, datos):
+        with self._lock:
+            if self._cerrado:
+                raise OSError(f"El canal {self.nombre} está cerrado")
+            self._enviados += 1
+        self._cola.put(datos)
+        profundidad = self._cola.qsize()
+        with self._lock:
+            if profundidad > self._profundidad_maxima:
+                self._profundidad_maxima = profundidad
+
+    # HILO QUE ENTREGA LOS ELEMENTOS AL SERVICIO SIGUIENTE-------------------
+    def _consumir(self):
+        while True:
+            datos = self._cola.get()
+            if datos is None:
+                return
+            try:
+                self._entregar(datos)
+            except Exception as e:
+                print(f"Error entregando en el canal {self.nombre}: {e}")
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'enviados': self._enviados,
+                'profundidad_maxima': self._profundidad_maxima,
+            }
+
+    # CERRAR EL CANAL DESPUÉS DE ENTREGAR LO QUE QUEDA EN LA COLA------------
+    def cerrar(self):
+        with self._lock:
+            if self._cerrado:
+                return
+            self._cerrado = True
+        self._cola.put(None)
+        self._hilo.join()
+
+#CLASE CANAL DE TRAMAS EN MEMORIA-------------------------------------------
+#     Esta clase reemplaza al pool de conexiones TCP: recibe tramas con
+#     largo, igual que el pool, y entrega cada mensaje ya separado.
+#---------------------------------------------------------------------------
+
+class CanalTramas(CanalMemoria):
+    def __init__(self, nombre, entregar, capacidad=CAPACIDAD_COLA):
+        lector = LectorTramas()
+
+        def entregar_tramas(datos):
+            for mensaje in lector.alimentar(datos):
+                entregar(mensaje)
+
+        super().__init__(nombre, entregar_tramas, capacidad)
+
+#CLASE CANAL HTTP EN MEMORIA------------------------------------------------
+#     Esta clase reemplaza al cliente HTTP persistente: enviar() retorna
+#     la misma tupla (código, razón, headers, cuerpo) que una respuesta 200,
+#     ya que el mensaje queda aceptado apenas entra a la cola.
+#---------------------------------------------------------------------------
+
+class CanalHTTP(CanalMemoria):
+    def enviar(self, mensaje):
+        super().enviar(mensaje)
+        return RESPUESTA_ACEPTADA
@@ -0,0 +1,320 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import os
+import socket
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from conexiones import PLAZO_SONDEO, ESPERA_SONDEO_INICIAL, ESPERA_SONDEO_MAXIMA
+from memoria import RESPUESTA_ACEPTADA
+from protocolo import CABECERA, LectorTramas, empaquetar_trama
+from transporte import crear_socket_servidor, eliminar_socket, DIRECTORIO_SOCKETS, PREFIJO_SOCKET
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+# CABECERA DEL SEGMENTO, CADA CONTADOR EN SU PROPIA LÍNEA DE CACHÉ-----------
+# Los contadores de escritura y lectura solo crecen (bytes totales escritos
+# y leídos); la posición en el anillo es el contador módulo la capacidad.
+CONTADOR = struct.Struct('=Q')
+POS_ESCRITO = 0
+POS_LEIDO = 64
+POS_DURMIENDO = 128
+POS_CAPACIDAD = 192
+INICIO_DATOS = 256
+CAPACIDAD_ANILLO = 4 * 1024 * 1024
+ESPERA_ACTIVA = 0.0002 if (os.cpu_count() or 1) > 1 else 0.0  # CON UNA CPU ESPERAR ACTIVAMENTE SOLO ATRASA AL EMISOR
+ESPERA_LLENO_INICIAL = 0.0001
+ESPERA_LLENO_MAXIMA = 0.001
+
+# ANILLOS CREADOS POR ESTE PROCESO (EL EMISOR NO LOS DESREGISTRA)-----------
+anillos_propios = set()
+
+# BARRERA DE MEMORIA ENTRE UNA ESCRITURA Y UNA LECTURA POSTERIOR-------------
+# El emisor publica el contador de escritura y después lee la marca de
+# dormido; el receptor escribe la marca y después lee el contador. Sin una
+# barrera completa, el procesador puede adelantar cada lectura a la
+# escritura anterior y ambos extremos ven el valor viejo: el emisor no toca
+# el timbre y el receptor se duerme con datos en el anillo. Tomar un lock
+# ejecuta una operación atómica (lock cmpxchg en x86, casal en ARMv8), que
+# actúa como esa barrera.
+_lock_barrera = threading.Lock()
+
+def barrera():
+    with _lock_barrera:
+        pass
+
+def nombre_anillo(port):
+    return f"{PREFIJO_SOCKET}-{port}"
+
+def ruta_timbre(port, directorio=DIRECTORIO_SOCKETS):
+    return os.path.join(directorio, f"{PREFIJO_SOCKET}-{port}.timbre")
+
+#CLASE EXTREMO DE UN ANILLO-------------------------------------------------
+#     Acceso a un segmento de memoria compartida organizado como buffer
+#     circular de un solo productor y un solo consumidor. Cada extremo
+#     escribe solo su propio contador, así que no se necesitan locks entre
+#     procesos: el productor copia los datos y después publica el contador
+#     de escritura; el consumidor los lee y después publica el de lectura.
+#---------------------------------------------------------------------------
+
+class ExtremoAnillo:
+    def _usar(self, segmento):
+        self._segmento = segmento
+        self._buf = segmento.buf
+        self.capacidad = self._leer(POS_CAPACIDAD)
+
+    def _leer(self, posicion):
+        return CONTADOR.unpack_from(self._buf, posicion)[0]
+
+    def _escribir(self, posicion, valor):
+        CONTADOR.pack_into(self._buf, posicion, valor)
+
+    # COPIAR DATOS AL ANILLO, EN DOS PARTES SI DAN LA VUELTA----------------
+    def _copiar(self, contador, datos):
+        inicio = contador % self.capacidad
+        primero = min(len(datos), self.capacidad - inicio)
+        self._buf[INICIO_DATOS + inicio:INICIO_DATOS + inicio + primero] = datos[:primero]
+        if primero < len(datos):
+            self._buf[INICIO_DATOS:INICIO_DATOS + len(datos) - primero] = datos[primero:]
+
+    def _extraer(self, contador, largo):
+        inicio = contador % self.capacidad
+        primero = min(largo, self.capacidad - inicio)
+        datos = bytes(self._buf[INICIO_DATOS + inicio:INICIO_DATOS + inicio + primero])
+        if primero < largo:
+            datos += bytes(self._buf[INICIO_DATOS:INICIO_DATOS + largo - primero])
+        return datos
+
+    def _soltar(self):
+        if self._segmento is None:
+            return
+        self._buf = None
+        try:
+            self._segmento.close()
+        except BufferError:
+            # OTRO HILO AÚN TIENE UNA VISTA DEL SEGMENTO; SE LIBERA AL SALIR
+            pass
+        self._segmento = None
+
+#CLASE EMISOR DE MEMORIA COMPARTIDA-----------------------------------------
+#     Esta clase reemplaza al pool de conexiones TCP cuando los servicios
+#     corren como procesos separados en la misma máquina: enviar() escribe
+#     las tramas en el anillo del servicio siguiente, sin llamadas al
+#     sistema, y solo toca el timbre (un datagrama de un byte a un socket
+#     Unix) si el receptor está dormido. Como un flujo TCP, un mensaje más
+#     grande que el anillo se escribe por partes a medida que el receptor
+#     libera espacio; con el anillo lleno el emisor espera. Los hilos del
+#     servicio comparten el emisor, así que los envíos se serializan.
+#
+#     PARÁMETROS:
+#          port = puerto del servicio de destino (identifica su anillo)
+#          directorio = directorio del socket del timbre
+#          plazo_conexion = segundos que se espera a que el anillo exista
+#---------------------------------------------------------------------------
+
+class EmisorCompartido(ExtremoAnillo):
+    def __init__(self, port, directorio=DIRECTORIO_SOCKETS, plazo_conexion=PLAZO_SONDEO):
+        self.nombre = nombre_anillo(port)
+        self.ruta_timbre = ruta_timbre(port, directorio)
+        self.plazo_conexion = plazo_conexion
+        self._lock = threading.Lock()
+        self._segmento = None
+        self._escrito = 0
+        self._cerrado = False
+        self._timbre = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._timbre.setblocking(False)
+
+    # ABRIR EL ANILLO DEL RECEPTOR (SE LLAMA CON EL LOCK TOMADO)------------
+    # Se reintenta hasta que el receptor lo crea, como conectar() con un
+    # servicio que aún no escucha.
+    def _conectar(self, plazo):
+        limite = time.monotonic() + plazo
+        espera = ESPERA_SONDEO_INICIAL
+        while True:
+            try:
+                segmento = shared_memory.SharedMemory(self.nombre)
+                if self.nombre not in anillos_propios:
+                    # EL SEGMENTO ES DEL RECEPTOR: ESTE PROCESO NO LO BORRA AL SALIR
+                    resource_tracker.unregister(segmento._name, "shared_memory")
+                if CONTADOR.unpack_from(segmento.buf, POS_CAPACIDAD)[0]:
+                    break
+                segmento.close()
+            except FileNotFoundError:
+                pass
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                raise ConnectionRefusedError(f"El anillo {self.nombre} no existe")
+            time.sleep(min(espera, restante))
+            espera = min(2 * espera, ESPERA_SONDEO_MAXIMA)
+        self._usar(segmento)
+        self._escrito = self._leer(POS_ESCRITO)
+
+    # COMPROBAR QUE EL RECEPTOR YA CREÓ SU ANILLO---------------------------
+    def esperar(self, plazo=PLAZO_SONDEO):
+        with self._lock:
+            try:
+                if self._segmento is None:
+                    self._conectar(plazo)
+                return True
+            except OSError:
+                return False
+
+    def enviar(self, datos):
+        with self._lock:
+            if self._cerrado:
+                raise OSError(f"El emisor del anillo {self.nombre} está cerrado")
+            if self._segmento is None:
+                self._conectar(self.plazo_conexion)
+            vista = memoryview(datos)
+            enviados = 0
+            espera = ESPERA_LLENO_INICIAL
+            while enviados < len(vista):
+                libre = self.capacidad - (self._escrito - self._leer(POS_LEIDO))
+                if libre == 0:
+                    # ANILLO LLENO: ESPERAR A QUE EL RECEPTOR AVANCE--------
+                    if self._cerrado:
+                        raise OSError(f"El emisor del anillo {self.nombre} está cerrado")
+                    time.sleep(espera)
+                    espera = min(2 * espera, ESPERA_LLENO_MAXIMA)
+                    continue
+                parte = min(libre, len(vista) - enviados)
+                self._copiar(self._escrito, vista[enviados:enviados + parte])
+                self._escrito += parte
+                self._escribir(POS_ESCRITO, self._escrito)
+                enviados += parte
+                espera = ESPERA_LLENO_INICIAL
+                self._tocar_timbre()
+
+    # DESPERTAR AL RECEPTOR SI ESTÁ ESPERANDO DATOS-------------------------
+    def _tocar_timbre(self):
+        barrera()
+        if not self._leer(POS_DURMIENDO):
+            return
+        try:
+            self._timbre.sendto(b"\0", self.ruta_timbre)
+        except BlockingIOError:
+            # EL RECEPTOR TIENE AVISOS SIN LEER: IGUAL VA A DESPERTAR
+            pass
+        except (ConnectionRefusedError, FileNotFoundError):
+            # EL RECEPTOR TERMINÓ; SI SE REINICIA, CREA UN ANILLO NUEVO
+            self._soltar()
+            raise ConnectionError(f"El receptor del anillo {self.nombre} no está activo")
+
+    def cerrar(self):
+        self._cerrado = True
+        with self._lock:
+            self._soltar()
+            self._timbre.close()
+
+#CLASE EMISOR DE DATAGRAMAS DE MEMORIA COMPARTIDA---------------------------
+#     Reemplaza al emisor UDP confiable: cada datagrama se escribe con su
+#     largo delante, para que el receptor lo separe sin interpretarlo. El
+#     anillo ya es confiable y ordenado, así que no lleva ACK.
+#---------------------------------------------------------------------------
+
+class EmisorDatagramasCompartido(EmisorCompartido):
+    def enviar(self, datagrama):
+        super().enviar(CABECERA.pack(len(datagrama)) + datagrama)
+
+#CLASE EMISOR HTTP DE MEMORIA COMPARTIDA------------------------------------
+#     Reemplaza al cliente HTTP persistente: escribe el mensaje como una
+#     trama y retorna la misma tupla que una respuesta 200, ya que queda
+#     aceptado apenas está en el anillo.
+#---------------------------------------------------------------------------
+
+class EmisorHTTPCompartido(EmisorCompartido):
+    def enviar(self, mensaje):
+        super().enviar(empaquetar_trama(mensaje))
+        return RESPUESTA_ACEPTADA
+
+#CLASE RECEPTOR DE MEMORIA COMPARTIDA---------------------------------------
+#     Esta clase crea el anillo de un servicio y el socket de su timbre, y
+#     entrega los mensajes que escribe el servicio anterior. Sin datos,
+#     primero revisa el anillo durante ESPERA_ACTIVA, si hay más de una
+#     CPU (los mensajes seguidos no pagan el timbre); después marca en el
+#     segmento que va a dormir, vuelve a mirar el contador de escritura y
+#     espera el timbre junto con la señal de apagado, sin plazo. El emisor
+#     publica el contador antes de mirar la marca, y ambos pasan por una
+#     barrera entre su escritura y su lectura, así que al menos uno ve la
+#     escritura del otro: o el receptor encuentra los datos, o el emisor
+#     toca el timbre. Un receptor ocioso no despierta hasta que llegan datos
+#     o se apaga el servicio. Un anillo que quedó de una ejecución anterior
+#     se descarta al iniciar.
+#
+#     PARÁMETROS:
+#          port = puerto del servicio (identifica su anillo)
+#          directorio = directorio del socket del timbre
+#          capacidad = bytes del buffer circular
+#          decodificar = False entrega los datagramas como bytes, sin
+#                        interpretarlos como mensajes
+#---------------------------------------------------------------------------
+
+class ReceptorCompartido(ExtremoAnillo):
+    def __init__(self, port, directorio=DIRECTORIO_SOCKETS, capacidad=CAPACIDAD_ANILLO, decodificar=True):
+        self.nombre = nombre_anillo(port)
+        self.ruta_timbre = ruta_timbre(port, directorio)
+        self._lector = LectorTramas(decodificar=decodificar)
+        self._timbre = crear_socket_servidor(self.ruta_timbre, socket.SOCK_DGRAM)
+        self._timbre.setblocking(False)
+        try:
+            segmento = shared_memory.SharedMemory(self.nombre, create=True, size=INICIO_DATOS + capacidad)
+        except FileExistsError:
+            anterior = shared_memory.SharedMemory(self.nombre)
+            anterior.unlink()
+            anterior.close()
+            segmento = shared_memory.SharedMemory(self.nombre, create=True, size=INICIO_DATOS + capacidad)
+        CONTADOR.pack_into(segmento.buf, POS_CAPACIDAD, capacidad)
+        anillos_propios.add(self.nombre)
+        self._usar(segmento)
+        self._leido = 0
+
+    # ENTREGAR LOS MENSAJES HASTA QUE SE ACTIVE EL APAGADO------------------
+    def recibir(self, apagado):
+        while True:
+            disponibles = self._disponibles()
+            if disponibles:
+                datos = self._extraer(self._leido, disponibles)
+                self._leido += disponibles
+                self._escribir(POS_LEIDO, self._leido)
+                yield from self._lector.alimentar(datos)
+                continue
+
+            # MARCAR QUE SE VA A DORMIR Y VOLVER A MIRAR ANTES DE ESPERAR---
+            self._escribir(POS_DURMIENDO, 1)
+            barrera()
+            if self._leer(POS_ESCRITO) == self._leido:
+                if not apagado.esperar_legible(self._timbre):
+                    return
+                self._vaciar_timbre()
+            self._escribir(POS_DURMIENDO, 0)
+
+    # REVISAR EL ANILLO DURANTE ESPERA_ACTIVA ANTES DE IR A DORMIR-----------
+    def _disponibles(self):
+        limite = None
+        while True:
+            disponibles = self._leer(POS_ESCRITO) - self._leido
+            if disponibles:
+                return disponibles
+            ahora = time.perf_counter()
+            if limite is None:
+                limite = ahora + ESPERA_ACTIVA
+            elif ahora >= limite:
+                return 0
+
+    # UN AVISO QUE QUEDE SIN LEER SOLO ADELANTA LA PRÓXIMA REVISIÓN-----------
+    def _vaciar_timbre(self):
+        try:
+            self._timbre.recv(64)
+        except BlockingIOError:
+            pass
+
+    # BORRAR EL ANILLO Y EL TIMBRE------------------------------------------
+    def cerrar(self):
+        self._timbre.close()
+        eliminar_socket(self.ruta_timbre)
+        segmento = self._segmento
+        self._soltar()
+        if segmento is not None:
+            segmento.unlink()
+            anillos_propios.discard(self.nombre)
@@ -0,0 +1,471 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import datetime
+import re
+import struct
+import time
+from collections import namedtuple
+import compresion
+from compresion import TextoComprimido, MARCA_COMPRIMIDA
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+FORMATO_TIMESTAMP = "%Y-%m-%d %H:%M:%S"
+TIPO_FIN = "FIN"
+TIPO_COMPLETA = "COMPLETA"
+TIPO_DELTA = "DELTA"
+TIPO_COMPLETO = "COMPLETO"
+CODEC_TEXTO = "texto"
+CODEC_BINARIO = "binario"
+PROTOCOLO_COMPLETO = "completo"  # cada salto reenvía todo el texto
+PROTOCOLO_DELTA = "delta"  # cada salto envía solo las palabras nuevas
+PROTOCOLOS = (PROTOCOLO_COMPLETO, PROTOCOLO_DELTA)
+
+# CODEC BINARIO: MARCA, TIPO, TIMESTAMP EN NANOSEGUNDOS, ID (6 BYTES),------
+# LARGO MÍNIMO, LARGO (ACTUAL, O "DESDE" EN DELTA), SECUENCIA, CANTIDAD DE
+# CORTES Y LARGO DE LAS PALABRAS EN BYTES. 0xA1 nunca inicia un texto UTF-8.
+MARCA_BINARIA = 0xA1
+CABECERA_BINARIA = struct.Struct('!BBQ6sIIIBI')
+CODIGOS_TIPO = {TIPO_FIN: 0, TIPO_COMPLETO: 1, TIPO_DELTA: 2, TIPO_COMPLETA: 3}
+TIPOS_POR_CODIGO = {codigo: tipo for tipo, codigo in CODIGOS_TIPO.items()}
+ID_VACIO = bytes(6)
+LARGO_CABECERA = 1024
+
+# SOBRE DE LOS MENSAJES COMPRIMIDOS: MARCA, UMBRAL DE LA COLA, DICCIONARIO--
+# Y LARGO DE LA PARTE COMPRIMIDA. LO SIGUE LA CABECERA DEL MENSAJE EN SU
+# CODEC, SIN CAMBIOS, Y EL TEXTO: LA PARTE COMPRIMIDA Y LUEGO LA COLA.
+CABECERA_COMPRIMIDA = struct.Struct('!BIII')
+PATRON_COMPRIMIDO = re.compile(rb'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})-([0-9a-f]+)-(\d+)-(\d+)-')
+
+# SOLO SE RECORRE LA CABECERA; EL TEXTO DE LA CADENA NO SE VUELVE A LEER---
+PATRON_CABECERA = re.compile(
+    r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})-'
+    r'(?:(FIN)'
+    r'|COMPLETA-([0-9a-f]+)$'
+    r'|D-([0-9a-f]+)-(\d+)-(\d+)-(\d+)-(\d+(?:,\d+)*)-'
+    r'|([0-9a-f]+)-(\d+)-(\d+)-(?=.))'
+)
+
+MensajeCompleto = namedtuple(
+    'MensajeCompleto',
+    ['timestamp', 'id_cadena', 'largo_minimo', 'largo_actual', 'texto'],
+)
+MensajeDelta = namedtuple(
+    'MensajeDelta',
+    ['timestamp', 'id_cadena', 'secuencia', 'largo_minimo', 'desde', 'cortes', 'palabras'],
+)
+
+#FUNCIÓN OBTENER TIMESTAMP ACTUAL-------------------------------------------
+
+def timestamp_actual():
+    return datetime.datetime.now().strftime(FORMATO_TIMESTAMP)
+
+#FUNCIÓN FORMATEAR TIMESTAMP------------------------------------------------
+#     Los mensajes de texto llevan el timestamp como cadena con resolución
+#     de un segundo; los binarios, como entero en nanosegundos desde epoch.
+#     Estas funciones entregan ambos en formato legible o en nanosegundos.
+#---------------------------------------------------------------------------
+
+def formatear_timestamp(timestamp):
+    if isinstance(timestamp, int):
+        return datetime.datetime.fromtimestamp(timestamp / 1e9).strftime(FORMATO_TIMESTAMP + ".%f")
+    return timestamp
+
+def timestamp_a_ns(timestamp):
+    if isinstance(timestamp, int):
+        return timestamp
+    return int(datetime.datetime.strptime(timestamp, FORMATO_TIMESTAMP).timestamp()) * 1_000_000_000
+
+#FUNCIÓN INTERPRETAR MENSAJE------------------------------------------------
+#     Esta función clasifica y separa un mensaje del anillo en una sola
+#     pasada sobre su cabecera. Una misma expresión regular reconoce la
+#     señal de finalización, el aviso de cadena completa, el modo delta y
+#     el modo completo, así que no hace falta probar un patrón distinto por
+#     cada tipo. En el modo completo el texto acumulado no se recorre: se
+#     toma tal cual a partir del final de la cabecera y su largo se lee del
+#     campo largo_actual, por lo que el costo no crece con la cadena.
+#
+#     Si el mensaje llega como bytes, se interpreta con el codec binario o,
+#     si trae el sobre de compresión, con interpretar_comprimido().
+#
+#     PARÁMETROS:
+#          mensaje = cadena de texto recibida, o bytes de un mensaje binario
+#
+#     RETORNA:
+#          tupla (tipo, contenido), donde contenido es:
+#               TIPO_FIN      -> timestamp de la señal
+#               TIPO_COMPLETA -> identificador de la cadena completada
+#               TIPO_DELTA    -> MensajeDelta
+#               TIPO_COMPLETO -> MensajeCompleto
+#          o (None, None) si el mensaje no tiene un formato válido
+#---------------------------------------------------------------------------
+
+def interpretar_mensaje(mensaje):
+    if not isinstance(mensaje, str):
+        if mensaje[:1] == bytes((MARCA_COMPRIMIDA,)):
+            return interpretar_comprimido(mensaje)
+        return interpretar_binario(mensaje)
+    match = PATRON_CABECERA.match(mensaje)
+    if not match:
+        return None, None
+    (timestamp, fin, id_completa,
+     id_delta, secuencia, largo_minimo_delta, desde, cortes,
+     id_cadena, largo_minimo, largo_actual) = match.groups()
+
+    if fin:
+        return TIPO_FIN, timestamp
+    if id_completa:
+        return TIPO_COMPLETA, id_completa
+    if id_delta:
+        return TIPO_DELTA, MensajeDelta(
+            timestamp,
+            id_delta,
+            int(secuencia),
+            int(largo_minimo_delta),
+            int(desde),
+            [int(corte) for corte in cortes.split(",")],
+            mensaje[match.end():].split(),
+        )
+    return TIPO_COMPLETO, MensajeCompleto(
+        timestamp,
+        id_cadena,
+        int(largo_minimo),
+        int(largo_actual),
+        mensaje[match.end():],
+    )
+
+#FUNCIÓN NUEVO MENSAJE COMPLETO---------------------------------------------
+#     Esta función crea el primer mensaje del modo completo de una cadena.
+#     Con un umbral de compresión, el texto viaja en el sobre comprimido y
+#     se comprime cuando supera esa cantidad de bytes.
+#
+#     PARÁMETROS:
+#          id_cadena = identificador de la cadena
+#          largo_minimo = largo mínimo del mensaje final
+#          texto = palabra (o palabras) inicial de la cadena
+#          umbral_compresion = bytes a partir de los cuales se comprime
+#                              (0 para no comprimir)
+#
+#     RETORNA:
+#          MensajeCompleto listo para serializar
+#---------------------------------------------------------------------------
+
+def nuevo_mensaje_completo(id_cadena, largo_minimo, texto, umbral_compresion=0):
+    largo = len(texto.split())
+    if umbral_compresion > 0:
+        texto = TextoComprimido(b"", texto, umbral_compresion, compresion.diccionario_activo)
+    return MensajeCompleto(timestamp_actual(), id_cadena, largo_minimo, largo, texto)
+
+#FUNCIÓN EXTENDER MENSAJE COMPLETO------------------------------------------
+#     Esta función agrega una palabra a un mensaje ya interpretado y lo deja
+#     listo para el siguiente salto. La cabecera recibida se reutiliza y el
+#     largo se actualiza sumando solo las palabras nuevas, en lugar de volver
+#     a contar las palabras de todo el texto acumulado. Un texto comprimido
+#     no se descomprime: la palabra se agrega a su cola.
+#
+#     PARÁMETROS:
+#          mensaje = MensajeCompleto recibido
+#          nueva_palabra = palabra (o palabras) que aporta este servicio
+#
+#     RETORNA:
+#          MensajeCompleto con el texto, el largo y el timestamp actualizados
+#---------------------------------------------------------------------------
+
+def extender_mensaje(mensaje, nueva_palabra):
+    if isinstance(mensaje.texto, TextoComprimido):
+        texto = mensaje.texto.extender(nueva_palabra)
+    else:
+        texto = f"{mensaje.texto} {nueva_palabra}"
+    return mensaje._replace(
+        timestamp=timestamp_actual(),
+        largo_actual=mensaje.largo_actual + len(nueva_palabra.split()),
+        texto=texto,
+    )
+
+#FUNCIÓN SERIALIZAR MENSAJE COMPLETO----------------------------------------
+#     Construye el texto timestamp-id_cadena-largo_minimo-largo_actual-mensaje.
+#     Un texto comprimido se envía en el sobre de compresión.
+#---------------------------------------------------------------------------
+
+def serializar_mensaje(mensaje, codec=CODEC_TEXTO):
+    if isinstance(mensaje.texto, TextoComprimido):
+        return serializar_comprimido(mensaje, codec)
+    if codec == CODEC_BINARIO:
+        return codificar_binario(TIPO_COMPLETO, mensaje.id_cadena, mensaje.largo_minimo, mensaje.largo_actual, texto=mensaje.texto)
+    return f"{mensaje.timestamp}-{mensaje.id_cadena}-{mensaje.largo_minimo}-{mensaje.largo_actual}-{mensaje.texto}"
+
+#FUNCIÓN CONSTRUIR SEÑAL DE FINALIZACIÓN------------------------------------
+
+def construir_senal_fin(codec=CODEC_TEXTO):
+    if codec == CODEC_BINARIO:
+        return codificar_binario(TIPO_FIN)
+    return f"{timestamp_actual()}-FIN_CADENA"
+
+#FUNCIÓN CONSTRUIR MENSAJE DELTA--------------------------------------------
+#     Esta función construye un mensaje del modo delta. En lugar del texto
+#     acumulado completo, el mensaje lleva el identificador de la cadena,
+#     el número de salto y solo las palabras que el siguiente servicio aún
+#     no conoce, agrupadas por salto. El formato es:
+#          timestamp-D-id_cadena-secuencia-largo_minimo-desde-cortes-palabras
+#     donde "desde" es la posición de la primera palabra incluida y
+#     "cortes" la cantidad de palabras aportada por cada salto.
+#
+#     PARÁMETROS:
+#          id_cadena = identificador hexadecimal de la cadena
+#          secuencia = cantidad total de saltos de la cadena
+#          largo_minimo = largo mínimo del mensaje final
+#          desde = posición de la primera palabra incluida
+#          cortes = lista con la cantidad de palabras de cada salto incluido
+#          palabras = lista de palabras incluidas
+#          codec = CODEC_TEXTO o CODEC_BINARIO
+#
+#     RETORNA:
+#          str (o bytes en el codec binario) = mensaje delta listo para enviar
+#---------------------------------------------------------------------------
+
+def construir_mensaje_delta(id_cadena, secuencia, largo_minimo, desde, cortes, palabras, codec=CODEC_TEXTO):
+    if codec == CODEC_BINARIO:
+        return codificar_binario(TIPO_DELTA, id_cadena, largo_minimo, desde, secuencia, cortes, ' '.join(palabras))
+    lista_cortes = ",".join(str(corte) for corte in cortes)
+    return f"{timestamp_actual()}-D-{id_cadena}-{secuencia}-{largo_minimo}-{desde}-{lista_cortes}-{' '.join(palabras)}"
+
+#FUNCIÓN CONSTRUIR AVISO DE CADENA COMPLETA---------------------------------
+#     Esta función construye el aviso que el Servicio 4 envía al Servicio 1
+#     cuando una cadena alcanza su largo mínimo. Con formato
+#     timestamp-COMPLETA-id_cadena, permite que el Servicio 1 sepa cuántas
+#     cadenas siguen en circulación.
+#
+#     PARÁMETROS:
+#          id_cadena = identificador de la cadena completada
+#          codec = CODEC_TEXTO o CODEC_BINARIO
+#
+#     RETORNA:
+#          str (o bytes en el codec binario) = aviso listo para enviar
+#---------------------------------------------------------------------------
+
+def construir_aviso_completa(id_cadena, codec=CODEC_TEXTO):
+    if codec == CODEC_BINARIO:
+        return codificar_binario(TIPO_COMPLETA, id_cadena)
+    return f"{timestamp_actual()}-COMPLETA-{id_cadena}"
+
+#FUNCIÓN CODIFICAR MENSAJE BINARIO------------------------------------------
+#     Esta función construye un mensaje del codec binario: una cabecera fija
+#     empaquetada con struct, seguida de los cortes del modo delta (enteros
+#     de 4 bytes) y de las palabras en UTF-8. El timestamp se toma al
+#     codificar, en nanosegundos desde epoch, por lo que sirve para medir
+#     la latencia de cada salto. No hay que formatear fechas ni números.
+#
+#     PARÁMETROS:
+#          tipo = TIPO_FIN, TIPO_COMPLETA, TIPO_DELTA o TIPO_COMPLETO
+#          id_cadena = identificador hexadecimal de la cadena (12 dígitos)
+#          largo_minimo = largo mínimo del mensaje final
+#          largo = largo actual, o posición "desde" en el modo delta
+#          secuencia = cantidad de saltos (solo modo delta)
+#          cortes = palabras aportadas por cada salto (solo modo delta)
+#          texto = palabras del mensaje separadas por espacios (o sus bytes)
+#
+#     RETORNA:
+#          bytes = mensaje binario listo para enviar
+#---------------------------------------------------------------------------
+
+def codificar_binario(tipo, id_cadena=None, largo_minimo=0, largo=0, secuencia=0, cortes=(), texto=""):
+    datos = texto.encode('utf-8') if isinstance(texto, str) else texto
+    cabecera = CABECERA_BINARIA.pack(
+        MARCA_BINARIA,
+        CODIGOS_TIPO[tipo],
+        time.time_ns(),
+        bytes.fromhex(id_cadena) if id_cadena else ID_VACIO,
+        largo_minimo,
+        largo,
+        secuencia,
+        len(cortes),
+        len(datos),
+    )
+    if cortes:
+        cabecera += struct.pack(f'!{len(cortes)}I', *cortes)
+    return cabecera + datos
+
+#FUNCIÓN INTERPRETAR MENSAJE BINARIO----------------------------------------
+#     Esta función lee la cabecera fija de un mensaje binario y entrega el
+#     mismo resultado que interpretar_mensaje, con el timestamp como entero
+#     en nanosegundos.
+#
+#     PARÁMETROS:
+#          datos = bytes del mensaje binario
+#
+#     RETORNA:
+#          tupla (tipo, contenido), o (None, None) si el mensaje no es válido
+#---------------------------------------------------------------------------
+
+def interpretar_binario(datos):
+    if len(datos) < CABECERA_BINARIA.size or datos[0] != MARCA_BINARIA:
+        return None, None
+    (_, codigo, timestamp, id_bytes, largo_minimo, largo,
+     secuencia, cantidad_cortes, largo_texto) = CABECERA_BINARIA.unpack_from(datos)
+    tipo = TIPOS_POR_CODIGO.get(codigo)
+    inicio = CABECERA_BINARIA.size + 4 * cantidad_cortes
+    if tipo is None or len(datos) != inicio + largo_texto:
+        return None, None
+
+    id_cadena = id_bytes.hex()
+    if tipo == TIPO_FIN:
+        return TIPO_FIN, timestamp
+    if tipo == TIPO_COMPLETA:
+        return TIPO_COMPLETA, id_cadena
+    texto = bytes(datos[inicio:]).decode('utf-8')
+    if tipo == TIPO_DELTA:
+        cortes = list(struct.unpack_from(f'!{cantidad_cortes}I', datos, CABECERA_BINARIA.size))
+        return TIPO_DELTA, MensajeDelta(timestamp, id_cadena, secuencia, largo_minimo, largo, cortes, texto.split())
+    return TIPO_COMPLETO, MensajeCompleto(timestamp, id_cadena, largo_minimo, largo, texto)
+
+#FUNCIÓN SERIALIZAR MENSAJE COMPRIMIDO--------------------------------------
+#     Esta función construye un mensaje del modo completo dentro del sobre
+#     de compresión: la cabecera del sobre (umbral, diccionario y largo de
+#     la parte comprimida) seguida del mensaje en su codec, cuyo texto es la
+#     parte comprimida más la cola sin comprimir. Solo cuando la cola supera
+#     el umbral se comprime; en los demás saltos la parte comprimida se
+#     copia tal como llegó.
+#
+#     PARÁMETROS:
+#          mensaje = MensajeCompleto con un TextoComprimido
+#          codec = CODEC_TEXTO o CODEC_BINARIO
+#
+#     RETORNA:
+#          bytes = mensaje comprimido listo para enviar
+#---------------------------------------------------------------------------
+
+def serializar_comprimido(mensaje, codec=CODEC_TEXTO):
+    comprimido, cola = mensaje.texto.empaquetar()
+    sobre = CABECERA_COMPRIMIDA.pack(MARCA_COMPRIMIDA, mensaje.texto.umbral, mensaje.texto.diccionario, len(comprimido))
+    if codec == CODEC_BINARIO:
+        return sobre + codificar_binario(TIPO_COMPLETO, mensaje.id_cadena, mensaje.largo_minimo, mensaje.largo_actual, texto=comprimido + cola)
+    cabecera = f"{mensaje.timestamp}-{mensaje.id_cadena}-{mensaje.largo_minimo}-{mensaje.largo_actual}-"
+    return sobre + cabecera.encode('ascii') + comprimido + cola
+
+#FUNCIÓN INTERPRETAR MENSAJE COMPRIMIDO-------------------------------------
+#     Esta función lee el sobre de compresión y la cabecera del mensaje que
+#     contiene, sin descomprimir el texto: el MensajeCompleto resultante
+#     lleva un TextoComprimido que se descomprime solo si se pide el texto.
+#
+#     PARÁMETROS:
+#          datos = bytes del mensaje comprimido
+#
+#     RETORNA:
+#          tupla (TIPO_COMPLETO, MensajeCompleto), o (None, None) si el
+#          mensaje no es válido
+#---------------------------------------------------------------------------
+
+def interpretar_comprimido(datos):
+    if len(datos) < CABECERA_COMPRIMIDA.size:
+        return None, None
+    _, umbral, diccionario, largo_comprimido = CABECERA_COMPRIMIDA.unpack_from(datos)
+    inicio = CABECERA_COMPRIMIDA.size
+    if datos[inicio:inicio + 1] == bytes((MARCA_BINARIA,)):
+        if len(datos) < inicio + CABECERA_BINARIA.size:
+            return None, None
+        (_, codigo, timestamp, id_bytes, largo_minimo, largo_actual,
+         _, cantidad_cortes, largo_texto) = CABECERA_BINARIA.unpack_from(datos, inicio)
+        id_cadena = id_bytes.hex()
+        inicio += CABECERA_BINARIA.size
+        if codigo != CODIGOS_TIPO[TIPO_COMPLETO] or cantidad_cortes or len(datos) != inicio + largo_texto:
+            return None, None
+    else:
+        match = PATRON_COMPRIMIDO.match(datos, inicio)
+        if not match:
+            return None, None
+        timestamp = match.group(1).decode('ascii')
+        id_cadena = match.group(2).decode('ascii')
+        largo_minimo, largo_actual = int(match.group(3)), int(match.group(4))
+        inicio = match.end()
+    if len(datos) < inicio + largo_comprimido:
+        return None, None
+    fin_comprimido = inicio + largo_comprimido
+    texto = TextoComprimido(
+        bytes(datos[inicio:fin_comprimido]),
+        bytes(datos[fin_comprimido:]).decode('utf-8'),
+        umbral,
+        diccionario,
+    )
+    return TIPO_COMPLETO, MensajeCompleto(timestamp, id_cadena, largo_minimo, largo_actual, texto)
+
+#FUNCIÓN CABECERA DE UN MENSAJE--------------------------------------------
+#     Esta función lee solo la cabecera de un mensaje, en cualquier codec,
+#     para saber de qué tipo es y a qué cadena pertenece sin interpretar ni
+#     descomprimir el texto. La usan los grupos de procesos, para entregar
+#     cada mensaje al proceso que guarda el estado de su cadena, y el
+#     control de carga, que nunca descarta las señales de finalización ni
+#     los avisos de cadena completa.
+#
+#     PARÁMETROS:
+#          mensaje = mensaje como str o bytes, tal como llega del transporte
+#
+#     RETORNA:
+#          tupla (tipo, identificador de la cadena); el identificador es
+#          None en la señal de finalización, y ambos en un mensaje inválido
+#---------------------------------------------------------------------------
+
+def cabecera_de(mensaje):
+    if isinstance(mensaje, str):
+        match = PATRON_CABECERA.match(mensaje)
+        if not match:
+            return None, None
+        if match.group(2):
+            return TIPO_FIN, None
+        if match.group(3):
+            return TIPO_COMPLETA, match.group(3)
+        if match.group(4):
+            return TIPO_DELTA, match.group(4)
+        return TIPO_COMPLETO, match.group(9)
+    inicio = CABECERA_COMPRIMIDA.size if mensaje[:1] == bytes((MARCA_COMPRIMIDA,)) else 0
+    if mensaje[inicio:inicio + 1] == bytes((MARCA_BINARIA,)):
+        if len(mensaje) < inicio + CABECERA_BINARIA.size:
+            return None, None
+        _, codigo, _, id_bytes, *_ = CABECERA_BINARIA.unpack_from(mensaje, inicio)
+        tipo = TIPOS_POR_CODIGO.get(codigo)
+        return tipo, (None if tipo in (None, TIPO_FIN) else id_bytes.hex())
+    if inicio:
+        match = PATRON_COMPRIMIDO.match(mensaje, inicio)
+        return (TIPO_COMPLETO, match.group(2).decode('ascii')) if match else (None, None)
+    # LA CABECERA DE TEXTO CABE EN EL PRINCIPIO DEL MENSAJE-----------------
+    return cabecera_de(bytes(mensaje[:LARGO_CABECERA]).decode('utf-8', errors='replace'))
+
+#FUNCIONES DE APOYO PARA LOS TRANSPORTES------------------------------------
+#     El codec de cada mensaje se reconoce por su primer byte, así que cada
+#     servicio responde con el mismo codec con que recibió el mensaje y los
+#     transportes entregan los mensajes binarios como bytes y los de texto
+#     como str. Un mensaje que ya llega como str se entrega tal cual. Los
+#     mensajes comprimidos siempre son bytes y su codec es el del mensaje
+#     que va dentro del sobre.
+#---------------------------------------------------------------------------
+
+def codec_de(mensaje):
+    if isinstance(mensaje, str):
+        return CODEC_TEXTO
+    if mensaje[:1] == bytes((MARCA_COMPRIMIDA,)):
+        interno = mensaje[CABECERA_COMPRIMIDA.size:CABECERA_COMPRIMIDA.size + 1]
+        return CODEC_BINARIO if interno == bytes((MARCA_BINARIA,)) else CODEC_TEXTO
+    return CODEC_BINARIO
+
+def decodificar_datos(datos):
+    if isinstance(datos, str):
+        return datos
+    if datos and datos[0] in (MARCA_BINARIA, MARCA_COMPRIMIDA):
+        return bytes(datos)
+    return datos.decode('utf-8')
+
+def codificar_datos(mensaje):
+    return mensaje.encode('utf-8') if isinstance(mensaje, str) else mensaje
+
+def mostrar_texto(texto):
+    return texto if isinstance(texto, str) else repr(texto)
+
+def mostrar_mensaje(mensaje):
+    if isinstance(mensaje, str):
+        return mensaje
+    tipo, contenido = interpretar_mensaje(mensaje)
+    if tipo == TIPO_COMPLETO:
+        contenido = contenido._replace(timestamp=formatear_timestamp(contenido.timestamp))
+    elif tipo == TIPO_FIN:
+        contenido = formatear_timestamp(contenido)
+    formato = "comprimido" if mensaje[0] == MARCA_COMPRIMIDA else "binario"
+    return f"[{formato} {len(mensaje)} bytes] {tipo}: {contenido}"
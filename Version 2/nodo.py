@@ -0,0 +1,241 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import argparse
+import importlib
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from topologia import (generar_topologia, cargar_topologia, guardar_topologia, describir_topologia,
+                       buscar_nodo, opciones_nodo, HOST, PUERTO_BASE, ROL_ORIGEN)
+from transporte import TRANSPORTES, TRANSPORTE_INET
+from mensajes import PROTOCOLOS
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+DIRECTORIO = "anillos"
+ARCHIVO_TOPOLOGIA = "topologia.json"
+PALABRAS = "aleatorio"
+PLAZO_FIN = 10.0  # segundos que se espera a los demás nodos tras los Servicio 1
+CONEXIONES_POR_PROCESO = 4  # el kernel reparte las conexiones por hash, no por turno
+PATRON_COMPLETADA = re.compile(r"^Cadena \S+ completada", re.MULTILINE)
+
+#FUNCIÓN REPARTIR CADENAS---------------------------------------------------
+#     Reparte las cadenas entre los anillos lo más parejo posible: los
+#     primeros anillos reciben una cadena más cuando no alcanza la división.
+#
+#     PARÁMETROS:
+#          total = cantidad total de cadenas
+#          anillos = cantidad de anillos
+#
+#     RETORNA:
+#          lista con la cantidad de cadenas de cada anillo
+#---------------------------------------------------------------------------
+
+def repartir_cadenas(total, anillos):
+    return [total // anillos + (numero < total % anillos) for numero in range(anillos)]
+
+#FUNCIÓN OPCIONES DE ROL----------------------------------------------------
+#     Retorna las opciones de los servicios que este programa interpreta
+#     por su cuenta, para agregarlas a las del nodo solo si se indicaron:
+#     el origen de las palabras, que usan todos los roles; las cadenas
+#     que inicia, su largo, cuántas circulan a la vez y el modo de
+#     protocolo, que solo usa el Servicio 1 (el resto del anillo responde
+#     en el mismo modo); y los procesos por servicio, que no usa el
+#     Servicio 1, junto con las conexiones hacia el nodo siguiente. El
+#     kernel asigna cada conexión a un proceso según un hash de sus
+#     direcciones, así que por defecto se abren CONEXIONES_POR_PROCESO por
+#     proceso, para que las cadenas se repartan parejas entre ellos.
+#---------------------------------------------------------------------------
+
+def opciones_rol(rol, cadenas, largo_minimo, palabras, en_vuelo=None, protocolo=None, procesos=None, conexiones_destino=None):
+    if conexiones_destino is None and procesos is not None and procesos > 1:
+        conexiones_destino = CONEXIONES_POR_PROCESO * procesos
+    valores = (('--palabras', palabras), ('--conexiones-destino', conexiones_destino))
+    if rol == ROL_ORIGEN:
+        valores += (('--cadenas', cadenas), ('--largo-minimo', largo_minimo), ('--en-vuelo', en_vuelo), ('--protocolo', protocolo))
+    else:
+        valores += (('--procesos', procesos),)
+    opciones = []
+    for opcion, valor in valores:
+        if valor is not None:
+            opciones += [opcion, str(valor)]
+    return opciones
+
+#FUNCIÓN EJECUTAR NODO------------------------------------------------------
+#     Esta función cumple el papel de un nodo de la topología en este
+#     proceso: importa el módulo de su rol y lo ejecuta con la línea de
+#     comandos que le corresponde según su lugar en el anillo, seguida de
+#     las opciones adicionales recibidas.
+#
+#     PARÁMETROS:
+#          anillo = Anillo del nodo
+#          indice = posición del nodo en el anillo
+#          directorio = directorio de los WAL y bitácoras
+#          adicionales = opciones que se agregan a las del nodo
+#---------------------------------------------------------------------------
+
+def ejecutar_nodo(anillo, indice, directorio, adicionales):
+    nodo = anillo.nodos[indice]
+    os.makedirs(directorio, exist_ok=True)
+    print(f"=== NODO {nodo.nombre} ({nodo.rol}) - ANILLO {anillo.nombre}, POSICIÓN {indice + 1}/{len(anillo.nodos)} ===")
+    importlib.import_module(nodo.rol).main(opciones_nodo(anillo, indice, directorio) + adicionales)
+
+#FUNCIÓN LANZAR TOPOLOGÍA---------------------------------------------------
+#     Esta función ejecuta cada nodo de la topología en su propio proceso,
+#     con la salida en <directorio>/<nombre>.out, y espera a que terminen.
+#     Los Servicio 1 se lanzan al final, cuando los demás nodos ya están
+#     levantando sus servidores, y cada uno inicia la parte de las cadenas
+#     que le toca a su anillo. Cada anillo termina por su cuenta con su
+#     cadena de finalización.
+#
+#     PARÁMETROS:
+#          topologia = lista de Anillo
+#          args = opciones interpretadas por main()
+#          adicionales = opciones que se agregan a las de todos los nodos
+#
+#     RETORNA:
+#          int = 0 si todos los anillos completaron sus cadenas
+#---------------------------------------------------------------------------
+
+def lanzar_topologia(topologia, args, adicionales):
+    os.makedirs(args.directorio, exist_ok=True)
+    ruta = os.path.join(args.directorio, ARCHIVO_TOPOLOGIA)
+    guardar_topologia(topologia, ruta)
+    reparto = repartir_cadenas(args.cadenas, len(topologia))
+
+    # LOS SERVICIO 1 AL FINAL DE LA LISTA-----------------------------------
+    nodos = sorted(
+        ((anillo, numero, nodo) for numero, anillo in enumerate(topologia) for nodo in anillo.nodos),
+        key=lambda entrada: entrada[2].rol == ROL_ORIGEN,
+    )
+    procesos = []
+    inicio = time.perf_counter()
+    try:
+        for anillo, numero, nodo in nodos:
+            comando = [sys.executable, '-u', os.path.abspath(__file__), '--topologia', ruta,
+                       '--directorio', args.directorio, nodo.nombre] + adicionales
+            comando += opciones_rol(nodo.rol, reparto[numero], args.largo_minimo, args.palabras or PALABRAS, args.en_vuelo, args.protocolo, args.procesos, args.conexiones_destino)
+            salida = open(os.path.join(args.directorio, f"{nodo.nombre}.out"), 'w')
+            procesos.append((anillo, numero, nodo, salida, subprocess.Popen(comando, stdout=salida, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)))
+            print(f"Nodo {nodo.nombre} ({nodo.rol}) en {nodo.host}:{nodo.puerto}, salida en {salida.name}")
+        # CADA ANILLO TERMINA CON SU CADENA DE FINALIZACIÓN; SI UN SERVICIO--
+        # 1 FALLA ANTES, LOS DEMÁS NODOS DE SU ANILLO NO RECIBEN EL AVISO----
+        for _, _, nodo, _, proceso in procesos:
+            if nodo.rol == ROL_ORIGEN:
+                proceso.wait()
+        limite = time.monotonic() + PLAZO_FIN
+        for _, _, nodo, _, proceso in procesos:
+            try:
+                proceso.wait(max(0.0, limite - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                print(f"El nodo {nodo.nombre} no terminó; deteniéndolo...")
+                proceso.terminate()
+                proceso.wait()
+    except KeyboardInterrupt:
+        print("\nInterrupción detectada. Deteniendo los nodos...")
+        for *_, proceso in procesos:
+            proceso.terminate()
+        for *_, proceso in procesos:
+            proceso.wait()
+    finally:
+        for *_, salida, _ in procesos:
+            salida.close()
+    transcurrido = time.perf_counter() - inicio
+
+    # RESUMEN DE LA EJECUCIÓN-----------------------------------------------
+    completos = True
+    for anillo, numero, nodo, salida, proceso in procesos:
+        if nodo.rol != ROL_ORIGEN:
+            continue
+        with open(salida.name, 'r', encoding='utf-8', errors='replace') as archivo:
+            completadas = len(PATRON_COMPLETADA.findall(archivo.read()))
+        completos = completos and completadas == reparto[numero]
+        print(f"Anillo {anillo.nombre}: {completadas}/{reparto[numero]} cadenas completadas")
+    fallidos = [nodo.nombre for _, _, nodo, _, proceso in procesos if proceso.returncode != 0]
+    if fallidos:
+        print(f"Nodos terminados con error: {', '.join(fallidos)}")
+    print(f"Tiempo total: {transcurrido * 1000:.1f} ms")
+    return 0 if completos and not fallidos else 1
+
+#FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ejecuta un nodo de una topología de anillos, o todos los nodos en procesos separados",
+        epilog="Las opciones que no reconoce este programa se agregan a la línea de comandos de cada nodo.",
+    )
+    parser.add_argument('nombre', nargs='?', default=None,
+                        help="nombre del nodo que se ejecuta en este proceso")
+    parser.add_argument('--todos', action='store_true',
+                        help="ejecutar todos los nodos, cada uno en su propio proceso")
+    parser.add_argument('--mostrar', action='store_true',
+                        help="mostrar la topología en JSON y terminar")
+    parser.add_argument('--topologia', default=None,
+                        help="archivo JSON con la topología (si se omite, se genera con --anillos y --etapas)")
+    parser.add_argument('--anillos', type=int, default=1,
+                        help="cantidad de anillos independientes de la topología generada")
+    parser.add_argument('--etapas', type=int, default=1,
+                        help="cantidad de etapas Servicio 2 -> 3 -> 4 de cada anillo generado")
+    parser.add_argument('--puerto-base', type=int, default=PUERTO_BASE,
+                        help="puerto del primer nodo de la topología generada")
+    parser.add_argument('--transporte', choices=TRANSPORTES, default=TRANSPORTE_INET,
+                        help="transporte de todos los saltos de la topología generada")
+    parser.add_argument('--host', default=HOST,
+                        help="dirección de todos los nodos de la topología generada")
+    parser.add_argument('--directorio', default=DIRECTORIO,
+                        help="directorio de la topología, los WAL, las bitácoras y las salidas de los nodos")
+    parser.add_argument('--cadenas', type=int, default=None,
+                        help="cadenas que inicia el Servicio 1; con --todos, el total, repartido entre los anillos")
+    parser.add_argument('--largo-minimo', type=int, default=None,
+                        help="largo mínimo del mensaje final de cada cadena (requerido con --todos)")
+    parser.add_argument('--palabras', default=None,
+                        help=f"origen de las palabras de los nodos (con --todos, por defecto {PALABRAS})")
+    parser.add_argument('--en-vuelo', type=int, default=None,
+                        help="cadenas que cada Servicio 1 mantiene en circulación a la vez")
+    parser.add_argument('--protocolo', choices=PROTOCOLOS, default=None,
+                        help="modo de protocolo de las cadenas que inician los Servicio 1 (completo o delta)")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="procesos de cada nodo Servicio 2, 3 y 4, que comparten su puerto con SO_REUSEPORT")
+    parser.add_argument('--conexiones-destino', type=int, default=None,
+                        help=f"conexiones de cada nodo hacia el siguiente, entre las que reparte las cadenas (por defecto, {CONEXIONES_POR_PROCESO} por cada uno de --procesos)")
+    args, adicionales = parser.parse_known_args()
+
+    try:
+        if args.topologia is not None:
+            topologia = cargar_topologia(args.topologia)
+        else:
+            if args.anillos <= 0 or args.etapas <= 0:
+                parser.error("la cantidad de anillos y de etapas debe ser mayor a 0")
+            topologia = generar_topologia(args.anillos, args.etapas, args.puerto_base, args.transporte, args.host)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error al cargar la topología: {e}")
+        return 1
+
+    if args.mostrar:
+        print(json.dumps(describir_topologia(topologia), indent=2, ensure_ascii=False))
+        return 0
+    if args.todos:
+        args.cadenas = args.cadenas or len(topologia)
+        if args.cadenas < len(topologia):
+            parser.error("se necesita al menos una cadena por anillo")
+        if args.largo_minimo is None:
+            parser.error("--todos requiere --largo-minimo, porque los nodos no leen la terminal")
+        return lanzar_topologia(topologia, args, adicionales)
+    if args.nombre is None:
+        parser.error("indique el nombre de un nodo, --todos o --mostrar")
+    try:
+        anillo, indice = buscar_nodo(topologia, args.nombre)
+    except ValueError as e:
+        print(f"Error al ejecutar el nodo: {e}")
+        return 1
+    adicionales = opciones_rol(anillo.nodos[indice].rol, args.cadenas, args.largo_minimo, args.palabras, args.en_vuelo, args.protocolo, args.procesos, args.conexiones_destino) + adicionales
+    ejecutar_nodo(anillo, indice, args.directorio, adicionales)
+    return 0
+
+#EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import random
+import sys
+import threading
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+VOCABULARIO = (
+    "hola", "como", "estas", "red", "paquete", "socket", "puerto", "mensaje",
+    "cadena", "servicio", "cliente", "servidor", "datagrama", "trama", "ruta",
+    "enlace", "nodo", "anillo", "latencia", "ancho", "banda", "protocolo",
+    "capa", "transporte", "aplicacion", "conexion", "flujo", "ventana",
+)
+
+#CLASE PROVEEDOR INTERACTIVO------------------------------------------------
+#     Esta clase entrega palabras pidiéndolas al usuario por la terminal,
+#     que es el comportamiento original de los servicios. Vuelve a pedir
+#     la palabra mientras el usuario ingrese algo vacío.
+#---------------------------------------------------------------------------
+
+class ProveedorInteractivo:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def siguiente(self, descripcion="una nueva palabra"):
+        with self._lock:
+            palabra = input(f"Ingrese {descripcion}: ").strip()
+            while not palabra:
+                palabra = input(f"La palabra no puede estar vacía. Ingrese {descripcion}: ").strip()
+            return palabra
+
+#CLASE PROVEEDOR DE ARCHIVO-------------------------------------------------
+#     Esta clase entrega las palabras de un archivo de texto, una por línea,
+#     leyéndolo a medida que se necesitan en lugar de cargarlo completo.
+#     Las líneas vacías se ignoran y al llegar al final vuelve a empezar.
+#
+#     PARÁMETROS:
+#          ruta = ruta del archivo de palabras
+#---------------------------------------------------------------------------
+
+class ProveedorArchivo:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._archivo = None
+        self._lock = threading.Lock()
+
+    def siguiente(self, descripcion="una nueva palabra"):
+        with self._lock:
+            if self._archivo is None:
+                self._archivo = open(self.ruta, 'r', encoding='utf-8')
+            vueltas = 0
+            while True:
+                linea = self._archivo.readline()
+                if not linea:
+                    vueltas += 1
+                    if vueltas > 1:
+                        raise ValueError(f"El archivo {self.ruta} no contiene palabras")
+                    self._archivo.seek(0)
+                    continue
+                palabra = linea.strip()
+                if palabra:
+                    return palabra
+
+#CLASE PROVEEDOR ALEATORIO--------------------------------------------------
+#     Esta clase genera palabras al azar a partir de un vocabulario. Con la
+#     misma semilla produce siempre la misma secuencia, lo que permite
+#     repetir pruebas de carga en forma reproducible.
+#
+#     PARÁMETROS:
+#          semilla = semilla del generador (None para una secuencia distinta)
+#          vocabulario = palabras posibles
+#---------------------------------------------------------------------------
+
+class ProveedorAleatorio:
+    def __init__(self, semilla=None, vocabulario=VOCABULARIO):
+        self.vocabulario = vocabulario
+        self._generador = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    def siguiente(self, descripcion="una nueva palabra"):
+        with self._lock:
+            return self._generador.choice(self.vocabulario)
+
+#CLASE PROVEEDOR DE TUBERÍA-------------------------------------------------
+#     Esta clase lee las palabras de una tubería (la entrada estándar o un
+#     FIFO con nombre), una por línea y sin mostrar mensajes en pantalla,
+#     para que otro programa alimente el servicio. Si la tubería se cierra
+#     lanza EOFError, igual que input().
+#
+#     PARÁMETROS:
+#          ruta = ruta del FIFO, o "-" para la entrada estándar
+#---------------------------------------------------------------------------
+
+class ProveedorTuberia:
+    def __init__(self, ruta="-"):
+        self.ruta = ruta
+        self._flujo = None
+        self._lock = threading.Lock()
+
+    def siguiente(self, descripcion="una nueva palabra"):
+        with self._lock:
+            if self._flujo is None:
+                self._flujo = sys.stdin if self.ruta == "-" else open(self.ruta, 'r', encoding='utf-8')
+            while True:
+                linea = self._flujo.readline()
+                if not linea:
+                    raise EOFError(f"La tubería {self.ruta} se cerró")
+                palabra = linea.strip()
+                if palabra:
+                    return palabra
+
+#FUNCIÓN CREAR PROVEEDOR DE PALABRAS----------------------------------------
+#     Esta función crea el proveedor de palabras indicado en la línea de
+#     comandos. Las especificaciones válidas son:
+#          interactivo          pide las palabras por la terminal
+#          archivo:RUTA         lee las palabras de un archivo
+#          aleatorio[:SEMILLA]  genera palabras al azar
+#          tuberia[:RUTA]       lee de un FIFO o de la entrada estándar
+#
+#     Una especificación inválida lanza ValueError, que configurar()
+#     informa como error de la línea de comandos.
+#
+#     PARÁMETROS:
+#          especificacion = cadena con el tipo de proveedor y su argumento
+#
+#     RETORNA:
+#          objeto con el método siguiente(descripcion) que entrega palabras
+#---------------------------------------------------------------------------
+
+def crear_proveedor(especificacion):
+    tipo, _, argumento = especificacion.partition(":")
+    if tipo == "interactivo":
+        return ProveedorInteractivo()
+    if tipo == "archivo" and argumento:
+        return ProveedorArchivo(argumento)
+    if tipo == "aleatorio":
+        try:
+            semilla = int(argumento) if argumento else None
+        except ValueError:
+            raise ValueError(f"Semilla inválida para el proveedor aleatorio: {argumento}") from None
+        return ProveedorAleatorio(semilla)
+    if tipo == "tuberia":
+        return ProveedorTuberia(argumento or "-")
+    raise ValueError(f"Proveedor de palabras inválido: {especificacion}")
@@ -0,0 +1,281 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import zlib
+from mensajes import cabecera_de
+from transporte import crear_socket_servidor, sockets_heredados, TRANSPORTE_INET, TRANSPORTE_COMPARTIDA
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+APAGAR = None  # aviso que un proceso deja en la cola de los demás al terminar
+SIN_DUENO = -1
+# GRUPOS DE CADENAS CON DUEÑO PROPIO; 5040 ES DIVISIBLE POR CASI TODAS LAS
+# CANTIDADES DE CONEXIONES DE ENTRADA (1 A 10, 12, 14, 15, 16...), Y ASÍ CADA
+# GRUPO LLEGA POR UNA SOLA
+GRUPOS_CADENAS = 5040
+
+#FUNCIÓN GRUPO DE CADENA----------------------------------------------------
+#     Retorna el número de grupo, entre 0 y cantidad - 1, de una cadena. Si
+#     una cantidad divide a otra, las cadenas de un mismo grupo de la mayor
+#     caen también en un mismo grupo de la menor.
+#---------------------------------------------------------------------------
+
+def grupo_de_cadena(id_cadena, cantidad):
+    return zlib.crc32(id_cadena.encode('ascii')) % cantidad
+
+#FUNCIÓN AGREGAR OPCIÓN DE PROCESOS-----------------------------------------
+
+def agregar_opcion_procesos(parser):
+    parser.add_argument('--procesos', type=int, default=1,
+                        help="cantidad de procesos que atienden el mismo puerto con SO_REUSEPORT; los mensajes de cada cadena se procesan siempre en el mismo proceso")
+
+#FUNCIÓN INICIAR PROCESOS---------------------------------------------------
+#     Con --procesos N mayor a 1, esta función divide el servicio en N
+#     procesos, cada uno con su propio GIL, sus trabajadores y su WAL. Los
+#     sockets de todos se enlazan al mismo puerto con SO_REUSEPORT antes de
+#     bifurcar, así el kernel los reparte entre los procesos desde el
+#     primer mensaje: cada conexión TCP o flujo de datagramas de un emisor
+#     queda en un mismo proceso. Para que la carga se reparta, el servicio
+#     anterior debe abrir varias conexiones (--conexiones-destino); con una
+#     sola, todo llegaría al mismo proceso.
+#
+#     El proceso original solo espera a los hijos y termina con el peor de
+#     sus códigos de salida; cada hijo retorna de esta función y sigue
+#     configurando el servicio. Se ejecuta antes de crear hilos, sockets de
+#     salida y archivos, para que cada hijo cree los suyos.
+#
+#     PARÁMETROS:
+#          parser = argparse.ArgumentParser del servicio, para los errores
+#          args = opciones interpretadas
+#          nombre = nombre del servicio
+#          direcciones = lista de (dirección, tipo) en que escucha
+#          apagado = SenalApagado del servicio
+#
+#     RETORNA:
+#          GrupoProcesos de este hijo, o None con un solo proceso
+#---------------------------------------------------------------------------
+
+def iniciar_procesos(parser, args, nombre, direcciones, apagado):
+    if args.procesos < 1:
+        parser.error("la cantidad de procesos debe ser mayor a 0")
+    if args.procesos == 1:
+        return None
+    if not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("--procesos requiere SO_REUSEPORT, que este sistema no tiene")
+    if args.transporte != TRANSPORTE_INET:
+        parser.error("--procesos requiere --transporte inet: SO_REUSEPORT solo reparte sockets INET")
+    if (args.transporte_destino or args.transporte) == TRANSPORTE_COMPARTIDA:
+        parser.error("--procesos no se puede combinar con un salto de salida compartida: cada anillo tiene un solo emisor")
+    if args.asincrono:
+        parser.error("--procesos no se puede combinar con --async")
+    if args.palabras == "interactivo":
+        parser.error("--procesos requiere un origen de palabras que no sea interactivo")
+
+    # ENLAZAR LOS SOCKETS DE TODOS LOS PROCESOS ANTES DE BIFURCAR-----------
+    sockets = [
+        [crear_socket_servidor(direccion, tipo, args.backlog, reusar_puerto=True) for direccion, tipo in direcciones]
+        for _ in range(args.procesos)
+    ]
+    contexto = multiprocessing.get_context("fork")
+    colas = [contexto.SimpleQueue() for _ in range(args.procesos)]
+    duenos = contexto.Array('i', [SIN_DUENO] * GRUPOS_CADENAS)
+    sys.stdout.flush()
+    hijos = []
+    for indice in range(args.procesos):
+        pid = os.fork()
+        if pid == 0:
+            for numero, propios in enumerate(sockets):
+                for (direccion, tipo), sock in zip(direcciones, propios):
+                    if numero == indice:
+                        sockets_heredados[(direccion, tipo)] = sock
+                    else:
+                        sock.close()
+            apagado.renovar()
+            return GrupoProcesos(nombre, indice, colas, duenos, apagado)
+        hijos.append(pid)
+    for propios in sockets:
+        for sock in propios:
+            sock.close()
+    sys.exit(esperar_procesos(nombre, hijos))
+
+#FUNCIÓN ESPERAR PROCESOS---------------------------------------------------
+#     El proceso original espera a los hijos. Ctrl+C ya llega a todos desde
+#     la terminal, así que aquí se ignora; un SIGTERM (por ejemplo de
+#     nodo.py) se reenvía a los hijos como SIGINT, para que terminen en
+#     orden.
+#
+#     PARÁMETROS:
+#          nombre = nombre del servicio
+#          hijos = lista de PID de los hijos
+#
+#     RETORNA:
+#          int = el mayor código de salida de los hijos
+#---------------------------------------------------------------------------
+
+def esperar_procesos(nombre, hijos):
+    pendientes = set(hijos)
+
+    def detener(*_):
+        for pid in list(pendientes):
+            try:
+                os.kill(pid, signal.SIGINT)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, detener)
+    print(f"{nombre}: {len(hijos)} procesos en el mismo puerto (SO_REUSEPORT), PID {', '.join(map(str, hijos))}")
+    codigo = 0
+    for pid in hijos:
+        _, estado = os.waitpid(pid, 0)
+        pendientes.discard(pid)
+        salida = os.waitstatus_to_exitcode(estado)
+        codigo = max(codigo, salida if salida >= 0 else 128 - salida)
+    return codigo
+
+#CLASE GRUPO DE PROCESOS----------------------------------------------------
+#     Esta clase representa, dentro de un hijo, al grupo de procesos de un
+#     servicio. El kernel reparte las conexiones sin mirar su contenido, y
+#     la tabla de cadenas (la copia del modo delta, o el último largo que
+#     descarta duplicados) vive en un solo proceso, así que cada cadena
+#     tiene un dueño. Las cadenas se dividen en GRUPOS_CADENAS grupos según
+#     el CRC32 de su identificador, y el dueño de cada grupo es el primer
+#     proceso que recibe una de sus cadenas, anotado en una tabla en memoria
+#     compartida que no cambia después. Como el servicio anterior envía
+#     cada cadena siempre por la misma conexión (--conexiones-destino), los
+#     mensajes llegan casi siempre al dueño y se procesan donde llegan; solo
+#     si una conexión se reabre en otro proceso, este deriva el mensaje por
+#     una cola al dueño, que lo registra en su WAL y lo procesa. La señal de
+#     finalización se procesa donde llega; al terminar, el proceso avisa a
+#     los demás.
+#
+#     PARÁMETROS:
+#          nombre = nombre del servicio
+#          indice = número de este proceso dentro del grupo
+#          colas = una multiprocessing.SimpleQueue por proceso
+#          duenos = multiprocessing.Array con el dueño de cada grupo
+#          apagado = SenalApagado del servicio
+#---------------------------------------------------------------------------
+
+class GrupoProcesos:
+    def __init__(self, nombre, indice, colas, duenos, apagado):
+        self.nombre = nombre
+        self.indice = indice
+        self.cantidad = len(colas)
+        self._colas = colas
+        self._duenos = duenos
+        self._apagado = apagado
+        self._lock = threading.Lock()
+        self._derivados = 0
+        self._recibidos = 0
+
+    # ARCHIVO PROPIO DE ESTE PROCESO: servicio2.wal -> servicio2-1.wal-------
+    def ruta(self, ruta):
+        base, extension = os.path.splitext(ruta)
+        return f"{base}-{self.indice}{extension}"
+
+    # DUEÑO DEL GRUPO DE LA CADENA; SI NO TIENE, LO PASA A SER ESTE PROCESO-
+    # Un dueño anotado no cambia, así que se lee sin el lock.
+    def dueno(self, id_cadena):
+        grupo = grupo_de_cadena(id_cadena, GRUPOS_CADENAS)
+        dueno = self._duenos[grupo]
+        if dueno != SIN_DUENO:
+            return dueno
+        with self._duenos.get_lock():
+            if self._duenos[grupo] == SIN_DUENO:
+                self._duenos[grupo] = self.indice
+            return self._duenos[grupo]
+
+    # LOS MENSAJES RECUPERADOS DEL WAL SON DE GRUPOS DE ESTE PROCESO---------
+    # Se reclaman antes de atender conexiones, para que sigan siendo suyos.
+    def reclamar(self, recuperados):
+        for _, mensaje in recuperados:
+            _, id_cadena = cabecera_de(mensaje)
+            if id_cadena is not None:
+                self.dueno(id_cadena)
+
+    #MÉTODO DERIVAR----------------------------------------------------------
+    #     Retorna True si el mensaje pertenece a una cadena de otro proceso
+    #     y se le entregó; False si este proceso debe procesarlo.
+    #
+    #     PARÁMETROS:
+    #          mensaje = mensaje recibido, tal como llega del transporte
+    #          *args = argumentos adicionales para la función de entrega
+    #-----------------------------------------------------------------------
+
+    def derivar(self, mensaje, *args):
+        _, id_cadena = cabecera_de(mensaje)
+        if id_cadena is None:
+            return False
+        dueno = self.dueno(id_cadena)
+        if dueno == self.indice:
+            return False
+        self._colas[dueno].put((mensaje, args))
+        with self._lock:
+            self._derivados += 1
+        return True
+
+    # RECIBIR EN UN HILO LOS MENSAJES QUE DERIVAN LOS DEMÁS PROCESOS-------
+    def escuchar(self, entregar):
+        hilo = threading.Thread(target=self._recibir, args=(entregar,), name=f"{self.nombre}-derivados")
+        hilo.daemon = True
+        hilo.start()
+
+    def _recibir(self, entregar):
+        cola = self._colas[self.indice]
+        while True:
+            elemento = cola.get()
+            if elemento is APAGAR:
+                self._apagado.activar()
+                return
+            mensaje, args = elemento
+            with self._lock:
+                self._recibidos += 1
+            entregar(mensaje, *args)
+
+    def cerrar(self):
+        for indice, cola in enumerate(self._colas):
+            if indice != self.indice:
+                cola.put(APAGAR)
+
+    def resumen(self):
+        with self._duenos.get_lock():
+            propios = sum(1 for dueno in self._duenos if dueno == self.indice)
+        with self._lock:
+            return (f"{self.nombre} (proceso {self.indice + 1}/{self.cantidad}): "
+                    f"dueño de {propios} grupos de cadenas, "
+                    f"{self._derivados} mensajes derivados a otros procesos, {self._recibidos} recibidos de ellos")
+
+#CLASE ENLACES POR CADENA---------------------------------------------------
+#     Esta clase reparte los envíos hacia el servicio siguiente entre varios
+#     enlaces independientes (conexiones TCP, clientes HTTP o emisores UDP,
+#     cada uno con su propio puerto de origen), según el grupo de la cadena
+#     de cada mensaje. Cada cadena sale siempre por el mismo enlace, y el
+#     kernel reparte los enlaces entre los procesos del servicio siguiente
+#     con SO_REUSEPORT, así que los mensajes de una cadena llegan siempre al
+#     mismo proceso. Los mensajes sin cadena (la señal de finalización) van
+#     por el primero.
+#
+#     PARÁMETROS:
+#          enlaces = lista de enlaces, cada uno con su propio socket
+#---------------------------------------------------------------------------
+
+class EnlacesPorCadena:
+    def __init__(self, enlaces):
+        self.enlaces = list(enlaces)
+
+    def elegir(self, mensaje):
+        if len(self.enlaces) == 1:
+            return self.enlaces[0]
+        _, id_cadena = cabecera_de(mensaje)
+        if id_cadena is None:
+            return self.enlaces[0]
+        return self.enlaces[grupo_de_cadena(id_cadena, len(self.enlaces))]
+
+    def __iter__(self):
+        return iter(self.enlaces)
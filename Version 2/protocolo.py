@@ -0,0 +1,93 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import struct
+from mensajes import codificar_datos, decodificar_datos
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+CABECERA = struct.Struct('!I')
+TAMANO_BLOQUE = 65536
+LARGO_MAXIMO_TRAMA = 64 * 1024 * 1024
+
+#FUNCIÓN EMPAQUETAR TRAMA---------------------------------------------------
+#     Esta función construye una trama del protocolo de los saltos TCP:
+#     una cabecera de 4 bytes con el largo del contenido (big endian)
+#     seguida del mensaje codificado en UTF-8. Así el receptor sabe
+#     exactamente cuántos bytes leer, sin límite de tamaño por mensaje.
+#
+#     PARÁMETROS:
+#          mensaje = cadena de texto que se desea enviar
+#
+#     RETORNA:
+#          bytes = trama lista para escribir en el socket
+#---------------------------------------------------------------------------
+
+def empaquetar_trama(mensaje):
+    datos = codificar_datos(mensaje)
+    return CABECERA.pack(len(datos)) + datos
+
+#CLASE LECTOR DE TRAMAS-----------------------------------------------------
+#     Esta clase reconstruye los mensajes a partir de los bytes que llegan
+#     por un flujo TCP. Acepta bloques de cualquier tamaño: guarda las
+#     lecturas parciales hasta completar una trama y separa varias tramas
+#     que lleguen en un mismo bloque. Cada byte se copia una sola vez al
+#     buffer y no se vuelve a recorrer para buscar delimitadores.
+#
+#     PARÁMETROS:
+#          largo_maximo = tamaño máximo aceptado para una trama
+#          decodificar = False entrega el contenido como bytes, sin
+#                        interpretarlo como mensaje (p. ej. datagramas)
+#---------------------------------------------------------------------------
+
+class LectorTramas:
+    def __init__(self, largo_maximo=LARGO_MAXIMO_TRAMA, decodificar=True):
+        self.largo_maximo = largo_maximo
+        self._decodificar = decodificar_datos if decodificar else bytes
+        self._buffer = bytearray()
+
+    def alimentar(self, datos):
+        self._buffer += datos
+        mensajes = []
+        inicio = 0
+        while True:
+            disponibles = len(self._buffer) - inicio
+            if disponibles < CABECERA.size:
+                break
+            (largo,) = CABECERA.unpack_from(self._buffer, inicio)
+            if largo > self.largo_maximo:
+                raise ValueError(f"Trama de {largo} bytes excede el máximo permitido")
+            if disponibles < CABECERA.size + largo:
+                break
+            desde = inicio + CABECERA.size
+            mensajes.append(self._decodificar(self._buffer[desde:desde + largo]))
+            inicio = desde + largo
+
+        # DESCARTAR LOS BYTES YA CONSUMIDOS--------------------------------
+        if inicio:
+            del self._buffer[:inicio]
+        return mensajes
+
+    def pendiente(self):
+        return len(self._buffer)
+
+#FUNCIÓN RECIBIR TRAMAS-----------------------------------------------------
+#     Esta función lee continuamente de una conexión TCP y entrega cada
+#     mensaje completo a medida que llega. Termina cuando el otro extremo
+#     cierra la conexión.
+#
+#     PARÁMETROS:
+#          conn = socket TCP conectado
+#
+#     RETORNA:
+#          generador de cadenas de texto, una por mensaje recibido
+#---------------------------------------------------------------------------
+
+def recibir_tramas(conn):
+    lector = LectorTramas()
+    while True:
+        datos = conn.recv(TAMANO_BLOQUE)
+        if not datos:
+            if lector.pendiente():
+                print("Conexión cerrada con una trama incompleta")
+            return
+        yield from lector.alimentar(datos)
@@ -0,0 +1,340 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import asyncio
+import functools
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from transporte import familia, eliminar_socket, mostrar_direccion
+from trabajadores import marcas_por_defecto, CANTIDAD_TRABAJADORES, CAPACIDAD_COLA, PLAZO_DRENAJE
+from contrapresion import RETRY_AFTER
+from protocolo import LectorTramas, TAMANO_BLOQUE
+from mensajes import decodificar_datos, mostrar_mensaje
+from compresion import decodificar_contenido
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+RAZONES_HTTP = {200: 'OK', 405: 'Method Not Allowed', 415: 'Unsupported Media Type', 503: 'Service Unavailable'}
+
+#CLASE RUNTIME ASYNCIO------------------------------------------------------
+#     Esta clase ejecuta el servidor de un servicio sobre asyncio en lugar
+#     de crear un hilo por conexión o datagrama. Un solo bucle de eventos
+#     atiende todas las conexiones; las funciones de procesamiento de cada
+#     servicio (que piden palabras y envían al siguiente salto) se ejecutan
+#     en un executor propio con tantos hilos como --trabajadores. Cuando el
+#     servicio activa su señal de apagado, el runtime deja de aceptar
+#     mensajes, espera los que ya aceptó y se detiene, sin esperar timeouts.
+#
+#     Igual que PoolTrabajadores, admite a lo sumo --cola mensajes en
+#     espera de un hilo, con las mismas marcas alta y baja, y hace de pool
+#     del ControlCarga del servicio: con la cola saturada aplica la misma
+#     política que el modo con hilos. Una conexión deja de leer mientras
+#     espera un lugar o mientras la política la pausa, y el servidor UDP
+#     deja de leer su socket; como el bucle nunca se bloquea, las demás
+#     conexiones siguen atendidas.
+#
+#     Con un WAL, cada mensaje aceptado se registra en el bucle, antes de
+#     encolarlo y de responder al emisor, igual que en el modo con hilos;
+#     la función de procesamiento (la de wal.proteger) recibe el número
+#     de la entrada y la confirma al reenviar el mensaje.
+#
+#     PARÁMETROS:
+#          esta_activo = función que indica si el servicio sigue activo
+#          control = ControlCarga del servicio (None no aplica políticas)
+#          trabajadores = hilos que procesan mensajes
+#          cola = cantidad máxima de mensajes en espera de un hilo
+#          marca_alta, marca_baja = marcas de la cola (ver PoolTrabajadores)
+#          wal = WALMensajes del servicio (None no registra los mensajes)
+#---------------------------------------------------------------------------
+
+class RuntimeAsync:
+    def __init__(self, esta_activo, control=None, trabajadores=CANTIDAD_TRABAJADORES, cola=CAPACIDAD_COLA, marca_alta=None, marca_baja=None, wal=None):
+        self.esta_activo = esta_activo
+        self.control = control
+        self.wal = wal
+        self.trabajadores = trabajadores
+        self.capacidad = cola
+        self.marca_alta, self.marca_baja = marcas_por_defecto(cola, marca_alta, marca_baja)
+        self._executor = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix="async")
+        self._detener = None
+        self._espacio = None
+        self._tareas = set()
+        self._en_curso = 0
+        self._saturado = False
+        self._saturaciones = 0
+        self._procesadas = 0
+        self._profundidad_maxima = 0
+        self._lecturas_pausadas = []
+        if control is not None:
+            control.pool = self
+
+    # MENSAJES ACEPTADOS QUE AÚN ESPERAN UN HILO-----------------------------
+    def _profundidad(self):
+        return max(0, self._en_curso - self.trabajadores)
+
+    def saturado(self):
+        return self._saturado
+
+    # ESPERAR (SIN BLOQUEAR EL BUCLE) A QUE SE CUMPLA LA CONDICIÓN-----------
+    async def _esperar(self, condicion):
+        async with self._espacio:
+            await self._espacio.wait_for(condicion)
+
+    async def _esperar_lugar(self):
+        await self._esperar(lambda: self._profundidad() < self.capacidad)
+
+    # PAUSAR LA LECTURA DE UNA CONEXIÓN MIENTRAS LA POLÍTICA LO PIDA--------
+    async def _pausar(self, rechaza=False):
+        if self.control is None or not self.control.debe_pausar(rechaza):
+            return
+        inicio = time.monotonic()
+        await self._esperar(lambda: not self._saturado)
+        self.control.anotar_pausa(time.monotonic() - inicio)
+
+    # EN UDP NO SE PUEDE ESPERAR: SE DEJA DE LEER EL SOCKET HASTA QUE-------
+    # LA COLA BAJE A LA MARCA BAJA (UN LOTE YA LEÍDO SE ENCOLA ENTERO)
+    def _pausar_lectura(self, transporte):
+        if self.control is None or not self.control.debe_pausar(rechaza=True):
+            return
+        transporte.pause_reading()
+        self._lecturas_pausadas.append((transporte, time.monotonic()))
+
+    # False SI LA POLÍTICA DESCARTA EL MENSAJE-------------------------------
+    def _admitir(self, mensaje):
+        return self.control is None or self.control.admitir(mensaje)
+
+    # ACEPTAR UN MENSAJE Y PROCESARLO EN EL EXECUTOR, SIN ESPERARLO---------
+    # El mensaje se registra en el WAL aquí, antes de que espere un hilo.
+    def _encolar(self, funcion, mensaje, *args):
+        if self.wal is not None:
+            tarea = self.wal.tarea(funcion, mensaje, *args)
+        else:
+            tarea = functools.partial(funcion, mensaje, *args)
+        self._en_curso += 1
+        profundidad = self._profundidad()
+        self._profundidad_maxima = max(self._profundidad_maxima, profundidad)
+        if profundidad >= self.marca_alta and not self._saturado:
+            self._saturado = True
+            self._saturaciones += 1
+        self._lanzar(self._procesar(tarea))
+
+    async def _procesar(self, tarea):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, tarea)
+        except Exception as e:
+            print(f"Error en trabajador asyncio: {e}")
+        finally:
+            self._procesadas += 1
+            self._en_curso -= 1
+            if self._saturado and self._profundidad() <= self.marca_baja:
+                self._saturado = False
+                self._reanudar_lecturas()
+            async with self._espacio:
+                self._espacio.notify_all()
+        if not self.esta_activo():
+            self._detener.set()
+
+    def _reanudar_lecturas(self):
+        ahora = time.monotonic()
+        for transporte, inicio in self._lecturas_pausadas:
+            if not transporte.is_closing():
+                transporte.resume_reading()
+            self.control.anotar_pausa(ahora - inicio)
+        self._lecturas_pausadas = []
+
+    # EJECUTAR UNA CORRUTINA SIN ESPERARLA (GUARDANDO SU REFERENCIA)-------
+    def _lanzar(self, corrutina):
+        tarea = asyncio.ensure_future(corrutina)
+        self._tareas.add(tarea)
+        tarea.add_done_callback(self._tareas.discard)
+
+    # SERVIDOR TCP CON TRAMAS (SERVICIOS 1 Y 2)------------------------------
+    async def _manejar_tcp(self, reader, writer, procesar):
+        lector = LectorTramas()
+        try:
+            while not self._detener.is_set():
+                datos = await reader.read(TAMANO_BLOQUE)
+                if not datos:
+                    break
+                for mensaje in lector.alimentar(datos):
+                    await self._esperar_lugar()
+                    if self._admitir(mensaje):
+                        self._encolar(procesar, mensaje)
+                    await self._pausar()
+        except asyncio.CancelledError:
+            # CONEXIÓN PERSISTENTE ABIERTA AL DETENER EL RUNTIME
+            pass
+        except Exception as e:
+            print(f"Error manejando cliente: {e}")
+        finally:
+            writer.close()
+
+    async def servir_tcp(self, direccion, procesar):
+        servidor = await self._iniciar_servidor_flujo(
+            lambda reader, writer: self._manejar_tcp(reader, writer, procesar),
+            direccion,
+        )
+        print(f"Escuchando en {mostrar_direccion(direccion)} (flujo, asyncio)")
+        return servidor
+
+    # SERVIDOR DE FLUJO TCP O UNIX SEGÚN LA DIRECCIÓN-------------------------
+    async def _iniciar_servidor_flujo(self, manejar, direccion):
+        if familia(direccion) == socket.AF_UNIX:
+            eliminar_socket(direccion)
+            return await asyncio.start_unix_server(manejar, path=direccion)
+        return await asyncio.start_server(manejar, *direccion)
+
+    # SERVIDOR UDP (SERVICIO 3)----------------------------------------------
+    # El filtro opcional recibe (datos, dirección, responder) y retorna la
+    # lista de mensajes a procesar (vacía para descartar o rechazar el
+    # datagrama). Con la cola saturada se deja de leer el socket.
+    async def servir_udp(self, direccion, procesar, filtro=None):
+        runtime = self
+
+        class ProtocoloUDP(asyncio.DatagramProtocol):
+            def connection_made(self, transporte):
+                self.transporte = transporte
+
+            def datagram_received(self, data, addr):
+                mensajes = [data] if filtro is None else filtro(data, addr, self.transporte.sendto)
+                for mensaje in mensajes:
+                    if runtime._admitir(mensaje):
+                        runtime._encolar(procesar, mensaje, addr)
+                runtime._pausar_lectura(self.transporte)
+
+        loop = asyncio.get_running_loop()
+        transporte, _ = await loop.create_datagram_endpoint(ProtocoloUDP, local_addr=direccion, family=familia(direccion))
+        print(f"Escuchando en {mostrar_direccion(direccion)} (datagramas, asyncio)")
+        return transporte
+
+    # SERVIDOR HTTP/1.1 CON KEEP-ALIVE (SERVICIO 4)--------------------------
+    # El mensaje se registra y se encola antes de responder 200, pero su
+    # procesamiento no se espera, para que la conexión siga leyendo
+    # peticiones mientras tanto. Con la
+    # cola saturada, la política decide igual que en el modo con hilos:
+    # retener la respuesta, responder 503 con Retry-After o descartar.
+    async def _manejar_http(self, reader, writer, procesar):
+        try:
+            while not self._detener.is_set():
+                try:
+                    cabecera = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+
+                lineas = cabecera.decode('latin-1').split("\r\n")
+                metodo, _, version = lineas[0].split(" ", 2)
+                headers = {}
+                for linea in lineas[1:]:
+                    if ":" in linea:
+                        nombre, valor = linea.split(":", 1)
+                        headers[nombre.strip().lower()] = valor.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                conexion = headers.get('connection', '').lower()
+                mantener = conexion == 'keep-alive' or (version == 'HTTP/1.1' and conexion != 'close')
+
+                if metodo != 'POST':
+                    writer.write(self._respuesta_http(405, b'Metodo no permitido', mantener))
+                    await writer.drain()
+                else:
+                    # LOS MENSAJES COMPRIMIDOS SE RECIBEN SIN DESCOMPRIMIR---
+                    try:
+                        mensaje = decodificar_datos(decodificar_contenido(body, headers.get('content-encoding')))
+                        print(f"Mensaje HTTP recibido: {mostrar_mensaje(mensaje)}")
+                        respuesta = self._respuesta_http(200, b'Mensaje recibido correctamente', mantener)
+                    except ValueError as e:
+                        print(f"Error en servidor HTTP: {e}")
+                        mensaje = None
+                        respuesta = self._respuesta_http(415, b'Codificacion no soportada', mantener)
+                    if mensaje is not None and self.control is not None and self.control.rechazar(mensaje):
+                        # SERVICIO SATURADO: EL SERVICIO 3 REINTENTA MÁS TARDE----
+                        mensaje = None
+                        respuesta = self._respuesta_http(503, b'', mantener, {'Retry-After': RETRY_AFTER})
+                    elif mensaje is not None and not self._admitir(mensaje):
+                        mensaje = None
+                    if mensaje is not None:
+                        await self._esperar_lugar()
+                        self._encolar(procesar, mensaje)
+                        await self._pausar(rechaza=True)
+                    writer.write(respuesta)
+                    await writer.drain()
+
+                if not mantener:
+                    break
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Error en servidor HTTP: {e}")
+        finally:
+            writer.close()
+
+    def _respuesta_http(self, codigo, cuerpo, mantener, extra=None):
+        razon = RAZONES_HTTP[codigo]
+        cabeceras = "".join(f"{nombre}: {valor}\r\n" for nombre, valor in (extra or {}).items())
+        return (
+            f"HTTP/1.1 {codigo} {razon}\r\n"
+            f"Content-Type: text/plain\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if mantener else 'close'}\r\n"
+            f"{cabeceras}"
+            f"\r\n"
+        ).encode('latin-1') + cuerpo
+
+    async def servir_http(self, direccion, procesar):
+        servidor = await self._iniciar_servidor_flujo(
+            lambda reader, writer: self._manejar_http(reader, writer, procesar),
+            direccion,
+        )
+        print(f"Escuchando en {mostrar_direccion(direccion)} (HTTP, asyncio)")
+        return servidor
+
+    # VARIOS SERVIDORES EN EL MISMO RUNTIME (SE CIERRAN JUNTOS)--------------
+    async def servir_varios(self, *servicios):
+        servidores = [await servicio for servicio in servicios]
+
+        class Conjunto:
+            def close(self):
+                for servidor in servidores:
+                    servidor.close()
+
+        return Conjunto()
+
+    def resumen(self):
+        return (
+            f"{self._procesadas} tareas, cola actual {self._profundidad()} (máx. {self._profundidad_maxima}), "
+            f"saturada {self._saturaciones} veces (marcas {self.marca_alta}/{self.marca_baja})"
+        )
+
+    # EJECUCIÓN DEL RUNTIME--------------------------------------------------
+    # al_iniciar (la interacción del Servicio 1) corre en el executor por
+    # defecto: puede esperar a que se procesen otros mensajes, y no debe
+    # ocupar uno de los hilos trabajadores.
+    async def _principal(self, servir, al_iniciar):
+        self._detener = asyncio.Event()
+        self._espacio = asyncio.Condition()
+        servidor = await servir()
+        try:
+            if al_iniciar is not None:
+                await asyncio.get_running_loop().run_in_executor(None, al_iniciar)
+                if not self.esta_activo():
+                    self._detener.set()
+            await self._detener.wait()
+        finally:
+            servidor.close()
+            
+            # TERMINAR LOS MENSAJES YA ACEPTADOS (CON PLAZO)-----------------
+            pendientes = [tarea for tarea in self._tareas if tarea is not asyncio.current_task()]
+            if pendientes:
+                _, sin_terminar = await asyncio.wait(pendientes, timeout=PLAZO_DRENAJE)
+                if sin_terminar:
+                    print(f"Runtime asyncio: {len(sin_terminar)} tareas sin procesar al vencer el plazo de detención")
+
+    def ejecutar(self, servir, al_iniciar=None):
+        try:
+            asyncio.run(self._principal(servir, al_iniciar))
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            print(f"Métricas del runtime asyncio: {self.resumen()}")
+            if self.control is not None:
+                print(f"Métricas del control de carga: {self.control.resumen()}")
@@ -1,85 +1,179 @@
 #LIBRERÍAS NECESARIAS-------------------------------------------------------
 
-import socket
-import datetime
+import argparse
 import threading
-import time
-import re
+from conexiones import PoolConexiones, esperar_servicio, PLAZO_SONDEO
+from protocolo import empaquetar_trama, recibir_tramas
+from mensajes import interpretar_mensaje, nuevo_mensaje_completo, extender_mensaje, serializar_mensaje, construir_senal_fin, codec_de, mostrar_mensaje, TIPO_FIN, TIPO_COMPLETA, TIPO_DELTA, TIPO_COMPLETO, CODEC_TEXTO, CODEC_BINARIO, PROTOCOLOS, PROTOCOLO_COMPLETO, PROTOCOLO_DELTA
+from cadenas import TablaCadenas, nuevo_id_cadena
+from runtime_async import RuntimeAsync
+from apagado import SenalApagado
+from trabajadores import PoolTrabajadores, CANTIDAD_TRABAJADORES, CAPACIDAD_COLA
+from palabras import ProveedorInteractivo, crear_proveedor
+from wal import WALMensajes
+from topologia import agregar_opciones_nodo
+from compresion import cargar_diccionario
+from contrapresion import agregar_opciones_contrapresion, validar_contrapresion, capacidad_anillo, ControlCarga, Cupos, MAX_CONEXIONES
+from transporte import direccion_servicio, crear_socket_servidor, eliminar_socket, mostrar_direccion, TRANSPORTES, TRANSPORTE_INET, TRANSPORTE_COMPARTIDA, DIRECTORIO_SOCKETS, BACKLOG
+from memoria_compartida import EmisorCompartido, ReceptorCompartido
+from procesos import EnlacesPorCadena
 
 #VARIABLES NECESARIAS-------------------------------------------------------
 
 HOST = 'localhost'
 PORT_SERVIDOR = 8001  
 PORT_DESTINO = 8002   
-servidor_activo = True
+MODO_PROTOCOLO = PROTOCOLO_COMPLETO  # completo reenvía todo el texto, delta solo las palabras nuevas
+CODEC = CODEC_TEXTO  # codec de los mensajes que inicia este servicio
+UMBRAL_COMPRESION = 0  # bytes de texto a partir de los cuales se comprime (0 no comprime)
+apagado = SenalApagado()
+servidor_listo = threading.Event()
+proveedor_palabras = ProveedorInteractivo()
+pool_trabajadores = None
+tabla_cadenas = TablaCadenas()
+total_cadenas = None
+cadenas_completadas = set()
+lock_completadas = threading.Lock()
+direccion_servidor = (HOST, PORT_SERVIDOR)
+direccion_destino = (HOST, PORT_DESTINO)
+enlaces_servicio2 = None
+receptor_compartido = None
+control = ControlCarga("Servicio 1")
+conexiones = Cupos(MAX_CONEXIONES)
+cadenas_en_vuelo = Cupos(0)
+backlog = BACKLOG
+ARCHIVO_WAL = "servicio1.wal"
+ARCHIVO_WAL_CADENAS = "servicio1_cadenas.wal"
+wal = None
+wal_cadenas = None
+procesar_con_wal = None
+cadenas_en_curso = {}
 
 #FUNCIÓN ENVIAR MENSAJE AL SERVICIO 2---------------------------------------
-#     Esta función se encarga de establecer una conexión TCP con el Servicio 2
-#     y enviar el mensaje correspondiente. Maneja los errores de conexión
-#     que puedan ocurrir durante el proceso de envío.
+#     Esta función envía el mensaje al Servicio 2 utilizando una conexión
+#     TCP persistente del pool, empaquetado como trama con largo para que el
+#     receptor pueda separar varios mensajes en la misma conexión. Con
+#     --conexiones-destino, cada cadena sale siempre por la misma de ellas.
+#     Maneja los errores de conexión que puedan ocurrir durante el envío.
 #
 #     PARÁMETROS:
 #          mensaje = cadena de texto que será enviada al Servicio 2
+#
+#     RETORNA:
+#          True si el mensaje se envió y False si hubo un error
 #---------------------------------------------------------------------------
 
 def enviar_a_servicio2(mensaje):
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.connect((HOST, PORT_DESTINO))
-            sock.send(mensaje.encode('utf-8'))
-            print(f"Mensaje enviado al Servicio 2: {mensaje}")
+        enlaces_servicio2.elegir(mensaje).enviar(empaquetar_trama(mensaje))
+        print(f"Mensaje enviado al Servicio 2: {mostrar_mensaje(mensaje)}")
+        return True
     except Exception as e:
         print(f"Error enviando mensaje al Servicio 2: {e}")
+        return False
+
+#FUNCIÓN ESPERAR DESTINO----------------------------------------------------
+#     Esta función comprueba que el Servicio 2 ya acepta mensajes: que
+#     escucha en su dirección o, en memoria compartida, que creó su anillo.
+#
+#     PARÁMETROS:
+#          plazo = segundos máximos de espera
+#
+#     RETORNA:
+#          True si el Servicio 2 está listo
+#---------------------------------------------------------------------------
+
+def esperar_destino(plazo):
+    enlace = enlaces_servicio2.enlaces[0]
+    if isinstance(enlace, EmisorCompartido):
+        return enlace.esperar(plazo)
+    return esperar_servicio(direccion_destino, plazo)
 
 #FUNCIÓN INICIALIZAR INTERACCIÓN--------------------------------------------
 #     Esta función se encarga de inicializar la interacción del sistema,
-#     solicitando al usuario el largo mínimo del mensaje final y la palabra
-#     inicial. Valida las entradas y construye el mensaje inicial con
-#     formato timestamp-largo_minimo-largo_actual-palabra_inicial.
+#     solicitando al usuario el largo mínimo del mensaje final (salvo que
+#     venga indicado por línea de comandos) y pidiendo al proveedor de
+#     palabras una palabra inicial por cada cadena. Cada cadena recibe un
+#     identificador propio y todas se envían de inmediato, de modo que
+#     circulan por el anillo al mismo tiempo, hasta --en-vuelo a la vez:
+#     cada cadena que se completa deja lugar a la siguiente, así el anillo
+#     cerrado nunca tiene más mensajes de los que caben en sus colas y no
+#     se traba (contrapresion.capacidad_anillo). El mensaje inicial tiene
+#     formato timestamp-id_cadena-largo_minimo-largo_actual-palabra_inicial,
+#     o bien es el primer mensaje delta con --protocolo delta. El
+#     resto de los servicios responde en el mismo modo. Antes de enviar se
+#     comprueba que el Servicio 2 ya acepta conexiones. Cada mensaje inicial
+#     se registra en el WAL de cadenas, donde queda hasta que llega el aviso
+#     de que la cadena se completó.
 #
 #     PARÁMETROS:
-#          Ninguno (interactúa directamente con el usuario)
+#          largo_minimo = largo mínimo del mensaje final, o None para pedirlo
+#          cantidad_cadenas = cantidad de cadenas que se inician en paralelo
+#          plazo_destino = segundos que se espera al Servicio 2 (0 no espera)
 #---------------------------------------------------------------------------
 
-def iniciar_interaccion():
+def iniciar_interaccion(largo_minimo=None, cantidad_cadenas=1, plazo_destino=PLAZO_SONDEO):
+    global total_cadenas
     print("=== SERVICIO 1 - INICIO DE INTERACCIÓN ===")
     
-    while True:
+    while largo_minimo is None:
         try:
             largo_minimo = int(input("Ingrese el largo mínimo del mensaje final: "))
-            if largo_minimo > 0:
-                break
-            else:
+            if largo_minimo <= 0:
                 print("El largo mínimo debe ser mayor a 0")
+                largo_minimo = None
         except ValueError:
             print("Por favor, ingrese un número válido")
     
-    palabra_inicial = input("Ingrese la palabra inicial: ").strip()
-    while not palabra_inicial:
-        palabra_inicial = input("La palabra no puede estar vacía. Ingrese la palabra inicial: ").strip()
+    total_cadenas = cantidad_cadenas
     
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    largo_actual = len(palabra_inicial.split())
-    mensaje = f"{timestamp}-{largo_minimo}-{largo_actual}-{palabra_inicial}"
+    # ESPERAR A QUE EL SERVICIO 2 ESTÉ ESCUCHANDO----------------------------
+    if plazo_destino > 0 and not esperar_destino(plazo_destino):
+        print(f"Error: el Servicio 2 no respondió en {plazo_destino} s, se envía de todas formas")
     
-    print(f"Enviando mensaje inicial: {mensaje}")
-    enviar_a_servicio2(mensaje)
+    for _ in range(cantidad_cadenas):
+        if not cadenas_en_vuelo.ocupar():
+            return
+        palabra_inicial = proveedor_palabras.siguiente("la palabra inicial")
+        id_cadena = nuevo_id_cadena()
+        
+        if MODO_PROTOCOLO == PROTOCOLO_DELTA:
+            estado = tabla_cadenas.crear(id_cadena, largo_minimo)
+            tabla_cadenas.agregar_palabras(estado, palabra_inicial)
+            mensaje = tabla_cadenas.construir_delta(estado, CODEC)
+        else:
+            mensaje = serializar_mensaje(nuevo_mensaje_completo(id_cadena, largo_minimo, palabra_inicial, UMBRAL_COMPRESION), CODEC)
+        
+        with lock_completadas:
+            cadenas_en_curso[id_cadena] = wal_cadenas.registrar(mensaje)
+        
+        print(f"Enviando mensaje inicial: {mostrar_mensaje(mensaje)}")
+        enviar_a_servicio2(mensaje)
 
-#FUNCIÓN VERIFICAR MENSAJE DE FINALIZACIÓN----------------------------------
-#     Esta función utiliza expresiones regulares para verificar si un mensaje
-#     recibido corresponde a una señal de finalización del sistema. El patrón
-#     esperado es: YYYY-MM-DD HH:MM:SS-FIN
+#FUNCIÓN REANUDAR CADENAS---------------------------------------------------
+#     Esta función reemplaza a iniciar_interaccion cuando el WAL de cadenas
+#     tiene cadenas que no se completaron antes de que el servicio se
+#     detuviera. En lugar de iniciar cadenas nuevas, vuelve a esperar el
+#     aviso de esas cadenas, que siguen en circulación o pendientes en el
+#     WAL de algún servicio, y la finalización ocurre cuando se completan.
 #
 #     PARÁMETROS:
-#          mensaje = cadena de texto a verificar
-#     
-#     RETORNA:
-#          bool = True si es mensaje de finalización, False en caso contrario
+#          plazo_destino = segundos que se espera al Servicio 2 (0 no espera)
 #---------------------------------------------------------------------------
 
-def es_mensaje_finalizacion(mensaje):
-    patron = r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}-FIN'
-    return bool(re.match(patron, mensaje))
+def reanudar_cadenas(plazo_destino=PLAZO_SONDEO):
+    global total_cadenas
+    print("=== SERVICIO 1 - REANUDACIÓN DE CADENAS ===")
+    
+    with lock_completadas:
+        for numero, mensaje in wal_cadenas.recuperados:
+            cadenas_en_curso[interpretar_mensaje(mensaje)[1].id_cadena] = numero
+        total_cadenas = len(cadenas_en_curso)
+    print(f"Reanudando {total_cadenas} cadenas sin completar: {', '.join(cadenas_en_curso)}")
+    
+    # ESPERAR A QUE EL SERVICIO 2 ESTÉ ESCUCHANDO----------------------------
+    if plazo_destino > 0 and not esperar_destino(plazo_destino):
+        print(f"Error: el Servicio 2 no respondió en {plazo_destino} s")
 
 #FUNCIÓN ENVIAR FINALIZACIÓN AL SIGUIENTE SERVICIO-------------------------
 #     Esta función construye y envía la señal de finalización al siguiente
@@ -87,99 +181,174 @@ def es_mensaje_finalizacion(mensaje):
 #     mensaje con formato timestamp-FIN_CADENA.
 #
 #     PARÁMETROS:
-#          Ninguno
+#          codec = codec con que se envía la señal (el del mensaje recibido)
 #---------------------------------------------------------------------------
 
-def enviar_finalizacion_siguiente():
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    mensaje_fin = f"{timestamp}-FIN_CADENA"
+def enviar_finalizacion_siguiente(codec=CODEC_TEXTO):
+    mensaje_fin = construir_senal_fin(codec)
     
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.connect((HOST, PORT_DESTINO))
-            sock.send(mensaje_fin.encode('utf-8'))
-            print(f"Señal de finalización enviada al Servicio 2: {mensaje_fin}")
+        enlaces_servicio2.elegir(mensaje_fin).enviar(empaquetar_trama(mensaje_fin))
+        print(f"Señal de finalización enviada al Servicio 2: {mostrar_mensaje(mensaje_fin)}")
+        return True
     except Exception as e:
         print(f"Error enviando señal de finalización: {e}")
+        return False
 
-#FUNCIÓN MANEJAR CLIENTE----------------------------------------------------
-#     Esta función se ejecuta en un hilo separado para manejar cada conexión
-#     de cliente que llega al servidor. Procesa los mensajes recibidos,
-#     verifica si son señales de finalización y, en caso contrario,
-#     solicita una nueva palabra al usuario para continuar la cadena.
+#FUNCIÓN PROCESAR MENSAJE TCP-----------------------------------------------
+#     Esta función procesa un mensaje individual recibido del Servicio 4.
+#     Verifica si es una señal de finalización o el aviso de una cadena
+#     completa; en caso contrario, solicita una nueva palabra al proveedor
+#     para continuar la cadena.
 #
 #     PARÁMETROS:
-#          conn = objeto de conexión del socket cliente
-#          addr = dirección del cliente conectado
+#          data = mensaje recibido, ya separado del resto del flujo TCP
+#
+#     RETORNA:
+#          False si no se pudo reenviar el mensaje (queda pendiente en el WAL)
 #---------------------------------------------------------------------------
 
-def manejar_cliente(conn, addr):
-    global servidor_activo
+def procesar_mensaje_tcp(data):
     try:
-        data = conn.recv(1024).decode('utf-8')
-        if not data:
-            return
-            
-        print(f"Mensaje recibido de Servicio 4: {data}")
+        print(f"Mensaje recibido de Servicio 4: {mostrar_mensaje(data)}")
+        tipo, contenido = interpretar_mensaje(data)
+        codec = codec_de(data)
         
         # VERIFICAR SI ES SEÑAL DE FINALIZACIÓN------------------------------
-        if es_mensaje_finalizacion(data):
+        if tipo == TIPO_FIN:
             print("Señal de finalización recibida del Servicio 4")
-            enviar_finalizacion_siguiente()
-            servidor_activo = False
+            tabla_cadenas.limpiar()
+            enviado = enviar_finalizacion_siguiente(codec)
+            apagado.activar()
+            return enviado
+        
+        # VERIFICAR SI ES AVISO DE CADENA COMPLETA---------------------------
+        if tipo == TIPO_COMPLETA:
+            id_completada = contenido
+            tabla_cadenas.eliminar(id_completada)
+            with lock_completadas:
+                cadenas_completadas.add(id_completada)
+                todas = total_cadenas is not None and len(cadenas_completadas) >= total_cadenas
+                numero = cadenas_en_curso.pop(id_completada, None)
+            if numero is not None:
+                wal_cadenas.confirmar(numero)
+                cadenas_en_vuelo.liberar()
+            print(f"Cadena {id_completada} completada ({len(cadenas_completadas)}/{total_cadenas})")
+            
+            # INICIAR FINALIZACIÓN CUANDO TERMINAN TODAS LAS CADENAS---------
+            if todas:
+                print("Todas las cadenas completadas. Iniciando cadena de finalización...")
+                enviado = enviar_finalizacion_siguiente(codec)
+                apagado.activar()
+                return enviado
             return
         
-        # PROCESAR MENSAJE NORMAL CON EXPRESIONES REGULARES------------------
-        patron = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})-(\d+)-(\d+)-(.+)$'
-        match = re.match(patron, data)
+        # PROCESAR MENSAJE EN MODO DELTA-------------------------------------
+        if tipo == TIPO_DELTA:
+            delta = contenido
+            estado = tabla_cadenas.aplicar_delta(delta)
+            if estado is None:
+                print(f"Mensaje duplicado de la cadena {delta.id_cadena}, se ignora")
+                return
+            
+            nueva_palabra = proveedor_palabras.siguiente()
+            
+            tabla_cadenas.agregar_palabras(estado, nueva_palabra)
+            mensaje_delta = tabla_cadenas.construir_delta(estado, codec)
+            print(f"Mensaje delta: {mostrar_mensaje(mensaje_delta)}")
+            
+            return enviar_a_servicio2(mensaje_delta)
         
-        if match:
-            timestamp, largo_minimo, largo_actual, mensaje_actual = match.groups()
+        # PROCESAR MENSAJE EN MODO COMPLETO----------------------------------
+        if tipo == TIPO_COMPLETO:
+            recibido = contenido
             
-            nueva_palabra = input("Ingrese una nueva palabra: ").strip()
-            while not nueva_palabra:
-                nueva_palabra = input("La palabra no puede estar vacía. Ingrese una nueva palabra: ").strip()
+            if not tabla_cadenas.registrar_salto(recibido.id_cadena, recibido.largo_minimo, recibido.largo_actual):
+                print(f"Mensaje duplicado de la cadena {recibido.id_cadena}, se ignora")
+                return
             
-            # CONSTRUIR MENSAJE ACTUALIZADO----------------------------------
-            mensaje_actualizado = f"{mensaje_actual} {nueva_palabra}"
-            nuevo_largo = len(mensaje_actualizado.split())
-            nuevo_timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            nueva_palabra = proveedor_palabras.siguiente()
             
-            mensaje_completo = f"{nuevo_timestamp}-{largo_minimo}-{nuevo_largo}-{mensaje_actualizado}"
+            # CONSTRUIR MENSAJE ACTUALIZADO (SIN RECONTAR EL TEXTO)----------
+            mensaje_completo = serializar_mensaje(extender_mensaje(recibido, nueva_palabra), codec)
             
-            print(f"Mensaje actualizado: {mensaje_completo}")
+            print(f"Mensaje actualizado: {mostrar_mensaje(mensaje_completo)}")
             
-            time.sleep(1)  
-            enviar_a_servicio2(mensaje_completo)
+            return enviar_a_servicio2(mensaje_completo)
         else:
             print("Error: Formato de mensaje inválido en Servicio 1")
             
+    except Exception as e:
+        print(f"Error procesando mensaje TCP: {e}")
+
+#FUNCIÓN ENCOLAR MENSAJE---------------------------------------------------
+#     Esta función registra un mensaje recibido del Servicio 4 en el WAL y
+#     lo encola en el pool de trabajadores. La usan el servidor TCP y el
+#     lanzador de un solo proceso. Con --politica descartar, los mensajes
+#     que llegan con la cola saturada se pierden.
+#
+#     PARÁMETROS:
+#          data = mensaje recibido, ya separado del resto del flujo TCP
+#---------------------------------------------------------------------------
+
+def encolar_mensaje(data):
+    if not control.admitir(data):
+        return
+    pool_trabajadores.enviar(wal.tarea(procesar_con_wal, data))
+
+#FUNCIÓN MANEJAR CLIENTE TCP------------------------------------------------
+#     Esta función se ejecuta en un hilo separado para manejar cada conexión
+#     TCP que llega al servidor. Como el Servicio 4 mantiene la conexión
+#     abierta, se leen todas las tramas que lleguen por ella, sin importar
+#     su tamaño, hasta que el cliente la cierre o llegue la señal de
+#     finalización. Si la cola del pool llega a la marca alta, la lectura
+#     se pausa hasta que baje a la marca baja y TCP frena al emisor.
+#
+#     PARÁMETROS:
+#          conn = objeto de conexión del socket cliente
+#          addr = dirección del cliente conectado
+#---------------------------------------------------------------------------
+
+def manejar_cliente(conn, addr):
+    try:
+        for data in recibir_tramas(conn):
+            encolar_mensaje(data)
+            if not apagado.activo():
+                break
+            control.pausar()
     except Exception as e:
         print(f"Error manejando cliente: {e}")
     finally:
         conn.close()
+        conexiones.liberar()
 
 #FUNCIÓN EJECUTAR SERVIDOR TCP----------------------------------------------
 #     Esta función ejecuta el servidor TCP que escucha conexiones entrantes
 #     en el puerto especificado. Utiliza threading para manejar múltiples
-#     conexiones simultáneas y mantiene un timeout para permitir verificar
-#     el estado del servidor periódicamente.
+#     conexiones simultáneas, hasta --max-conexiones a la vez (las demás
+#     esperan en el backlog), y espera cada conexión con select(), junto
+#     con la señal de apagado, para terminar apenas esta se activa. Marca
+#     servidor_listo apenas el socket queda escuchando (o si no se pudo
+#     abrir el puerto).
 #
 #     PARÁMETROS:
 #          Ninguno (utiliza variables globales)
 #---------------------------------------------------------------------------
 
 def ejecutar_servidor():
-    global servidor_activo
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_sock:
-        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_sock.bind((HOST, PORT_SERVIDOR))
-        server_sock.listen(5)
-        server_sock.settimeout(1.0)
-        
-        print(f"Servicio 1 escuchando en {HOST}:{PORT_SERVIDOR}")
+    try:
+        server_sock = crear_socket_servidor(direccion_servidor, backlog=backlog)
+    except OSError as e:
+        print(f"Error iniciando servidor: {e}")
+        apagado.activar()
+        return
+    finally:
+        servidor_listo.set()
+    
+    with server_sock:
+        print(f"Servicio 1 escuchando en {mostrar_direccion(direccion_servidor)}")
         
-        while servidor_activo:
+        while conexiones.ocupar() and apagado.esperar_legible(server_sock):
             try:
                 conn, addr = server_sock.accept()
                 print(f"Conexión recibida de {addr}")
@@ -187,39 +356,233 @@ def ejecutar_servidor():
                     target=manejar_cliente, 
                     args=(conn, addr)
                 )
+                client_thread.daemon = True
                 client_thread.start()
-            except socket.timeout:
-                continue
             except Exception as e:
-                if servidor_activo:
+                conexiones.liberar()
+                if apagado.activo():
                     print(f"Error en servidor: {e}")
                 break
 
+#FUNCIÓN EJECUTAR RECEPTOR DE MEMORIA COMPARTIDA----------------------------
+#     Con --transporte compartida, esta función reemplaza al servidor TCP:
+#     lee del anillo en memoria compartida las tramas que escribe el
+#     Servicio 4 y las encola igual que las de una conexión. El anillo ya
+#     existe desde configurar(), así que el servicio queda listo de
+#     inmediato.
+#
+#     PARÁMETROS:
+#          Ninguno (utiliza variables globales)
+#---------------------------------------------------------------------------
+
+def ejecutar_receptor_compartido():
+    servidor_listo.set()
+    print(f"Servicio 1 leyendo el anillo {receptor_compartido.nombre} (memoria compartida)")
+    try:
+        for data in receptor_compartido.recibir(apagado):
+            encolar_mensaje(data)
+            control.pausar()
+    except Exception as e:
+        if apagado.activo():
+            print(f"Error en el receptor de memoria compartida: {e}")
+
+#FUNCIÓN CONFIGURAR SERVICIO------------------------------------------------
+#     Esta función interpreta las opciones de línea de comandos y prepara el
+#     estado del servicio: proveedor de palabras, codec, WAL, direcciones
+#     según el transporte y enlace hacia el Servicio 2. La usan main() y el
+#     lanzador de un solo proceso, que entrega un enlace en memoria en
+#     lugar del pool de conexiones TCP. Con --transporte compartida el
+#     receptor, y con --transporte-destino compartida el enlace, son
+#     anillos en memoria compartida. nodo.py usa las opciones de puertos y
+#     transportes para ubicar el servicio en cualquier lugar de un anillo.
+#
+#     PARÁMETROS:
+#          argv = lista de opciones, o None para usar las de la terminal
+#          enlace = objeto con enviar(trama) y cerrar() hacia el Servicio 2,
+#                   o None para usar el transporte elegido
+#
+#     RETORNA:
+#          las opciones interpretadas
+#---------------------------------------------------------------------------
+
+def configurar(argv=None, enlace=None):
+    global proveedor_palabras, wal, wal_cadenas, procesar_con_wal, enlaces_servicio2, receptor_compartido, direccion_servidor, direccion_destino, CODEC, UMBRAL_COMPRESION, MODO_PROTOCOLO
+    global control, conexiones, cadenas_en_vuelo, backlog
+    parser = argparse.ArgumentParser(description="Servicio 1")
+    parser.add_argument('--async', dest='asincrono', action='store_true',
+                        help="ejecutar el servidor sobre asyncio en lugar de un hilo por mensaje")
+    parser.add_argument('--trabajadores', type=int, default=CANTIDAD_TRABAJADORES,
+                        help="cantidad de hilos trabajadores que procesan mensajes")
+    parser.add_argument('--cola', type=int, default=CAPACIDAD_COLA,
+                        help="cantidad máxima de mensajes en espera de un trabajador")
+    parser.add_argument('--palabras', default="interactivo",
+                        help="origen de las palabras: interactivo, archivo:RUTA, aleatorio[:SEMILLA] o tuberia[:RUTA]")
+    parser.add_argument('--largo-minimo', type=int, default=None,
+                        help="largo mínimo del mensaje final (si se omite, se pide por la terminal)")
+    parser.add_argument('--cadenas', type=int, default=1,
+                        help="cantidad de cadenas que circulan en paralelo por el anillo")
+    parser.add_argument('--en-vuelo', type=int, default=None,
+                        help="cantidad máxima de cadenas en circulación a la vez; las demás se inician a medida que se completan (por defecto, lo que cabe en las colas del anillo sin trabarlo: --nodos * (--marca-baja + --trabajadores))")
+    parser.add_argument('--protocolo', choices=PROTOCOLOS, default=MODO_PROTOCOLO,
+                        help="completo reenvía en cada salto todo el texto; delta solo las palabras nuevas; el resto del anillo responde igual")
+    parser.add_argument('--codec', choices=[CODEC_TEXTO, CODEC_BINARIO], default=CODEC,
+                        help="formato de los mensajes; el resto del anillo responde con el mismo")
+    parser.add_argument('--esperar-destino', type=float, default=PLAZO_SONDEO,
+                        help="segundos que se espera a que el Servicio 2 acepte conexiones antes de enviar (0 no espera)")
+    parser.add_argument('--wal', default=ARCHIVO_WAL,
+                        help="archivo del WAL con los mensajes aún no reenviados al Servicio 2")
+    parser.add_argument('--wal-cadenas', default=ARCHIVO_WAL_CADENAS,
+                        help="archivo del WAL con las cadenas iniciadas que aún no se completan")
+    parser.add_argument('--transporte', choices=TRANSPORTES, default=TRANSPORTE_INET,
+                        help="inet usa TCP sobre localhost; unix usa sockets de dominio Unix; compartida usa anillos en memoria compartida, solo en el modo con hilos (todos los servicios deben usar el mismo)")
+    parser.add_argument('--directorio-sockets', default=DIRECTORIO_SOCKETS,
+                        help="directorio de los sockets Unix")
+    parser.add_argument('--comprimir', type=int, default=UMBRAL_COMPRESION, metavar='UMBRAL',
+                        help="comprimir con zlib el texto de las cadenas que superen UMBRAL bytes (0 no comprime); el resto del anillo responde igual")
+    agregar_opciones_nodo(parser, PORT_SERVIDOR, PORT_DESTINO)
+    agregar_opciones_contrapresion(parser)
+    parser.add_argument('--diccionario', default=None,
+                        help="archivo de texto con cuyas palabras más recientes se entrena un diccionario de compresión (todos los servicios deben usar el mismo)")
+    args = parser.parse_args(argv)
+    if args.asincrono and args.transporte == TRANSPORTE_COMPARTIDA:
+        parser.error("--transporte compartida no se puede combinar con --async")
+    if args.largo_minimo is not None and args.largo_minimo <= 0:
+        parser.error("el largo mínimo debe ser mayor a 0")
+    if args.cadenas <= 0:
+        parser.error("la cantidad de cadenas debe ser mayor a 0")
+    if args.conexiones_destino <= 0:
+        parser.error("la cantidad de conexiones hacia el destino debe ser mayor a 0")
+    if args.en_vuelo is not None and args.en_vuelo <= 0:
+        parser.error("la cantidad de cadenas en vuelo debe ser mayor a 0")
+    if args.comprimir < 0:
+        parser.error("el umbral de compresión no puede ser negativo")
+    if args.comprimir and args.protocolo == PROTOCOLO_DELTA:
+        parser.error("--comprimir solo se aplica con --protocolo completo")
+    validar_contrapresion(parser, args)
+    if args.en_vuelo is None:
+        args.en_vuelo = capacidad_anillo(args.nodos, args.trabajadores, args.marca_baja)
+    control = ControlCarga("Servicio 1", args.politica)
+    conexiones = Cupos(args.max_conexiones)
+    cadenas_en_vuelo = Cupos(args.en_vuelo)
+    backlog = args.backlog
+    try:
+        proveedor_palabras = crear_proveedor(args.palabras)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.diccionario:
+        cargar_diccionario(args.diccionario)
+    CODEC = args.codec
+    MODO_PROTOCOLO = args.protocolo
+    UMBRAL_COMPRESION = args.comprimir
+    wal = WALMensajes(args.wal)
+    wal_cadenas = WALMensajes(args.wal_cadenas)
+    procesar_con_wal = wal.proteger(procesar_mensaje_tcp)
+    transporte_destino = args.transporte_destino or args.transporte
+    tabla_cadenas.nodos = args.nodos
+    direccion_servidor = direccion_servicio(args.transporte, args.host, args.puerto, directorio=args.directorio_sockets)
+    direccion_destino = direccion_servicio(transporte_destino, args.host_destino, args.puerto_destino, directorio=args.directorio_sockets)
+    if args.transporte == TRANSPORTE_COMPARTIDA:
+        receptor_compartido = ReceptorCompartido(args.puerto, args.directorio_sockets)
+    if enlace is None and transporte_destino == TRANSPORTE_COMPARTIDA:
+        enlace = EmisorCompartido(args.puerto_destino, args.directorio_sockets)
+    if enlace is not None:
+        enlaces_servicio2 = EnlacesPorCadena([enlace])
+    else:
+        exclusiva = args.conexiones_destino > 1
+        enlaces_servicio2 = EnlacesPorCadena(PoolConexiones(direccion_destino, exclusiva=exclusiva) for _ in range(args.conexiones_destino))
+    return args
+
+#FUNCIÓN INICIAR O REANUDAR CADENAS-----------------------------------------
+#     Esta función inicia las cadenas o, si el WAL de cadenas tiene cadenas
+#     sin completar, las reanuda en lugar de iniciar otras.
+#
+#     PARÁMETROS:
+#          args = opciones interpretadas por configurar()
+#
+#     RETORNA:
+#          lista de tareas que reprocesan los mensajes recuperados del WAL
+#---------------------------------------------------------------------------
+
+def iniciar_o_reanudar(args):
+    if wal_cadenas.recuperados:
+        reanudar_cadenas(args.esperar_destino)
+        return wal.reprocesar(procesar_con_wal)
+    iniciar_interaccion(args.largo_minimo, args.cadenas, args.esperar_destino)
+    return []
+
+#FUNCIÓN INICIAR TRABAJADORES-----------------------------------------------
+#     Esta función crea el pool de trabajadores con cola acotada.
+#
+#     PARÁMETROS:
+#          args = opciones interpretadas por configurar()
+#---------------------------------------------------------------------------
+
+def iniciar_trabajadores(args):
+    global pool_trabajadores
+    pool_trabajadores = PoolTrabajadores(f"Servicio 1", args.trabajadores, args.cola, args.marca_alta, args.marca_baja)
+    control.pool = pool_trabajadores
+
+#FUNCIÓN FINALIZAR SERVICIO-------------------------------------------------
+#     Esta función activa el apagado, espera a que los trabajadores terminen
+#     las tareas encoladas, muestra sus métricas y cierra el enlace y los WAL.
+#---------------------------------------------------------------------------
+
+def finalizar():
+    print("Finalizando Servicio 1...")
+    apagado.activar()
+    conexiones.cerrar()
+    cadenas_en_vuelo.cerrar()
+    if pool_trabajadores is not None:
+        pool_trabajadores.detener()
+        print(f"Métricas del pool de trabajadores: {pool_trabajadores.resumen()}")
+        print(f"Métricas del control de carga: {control.resumen()}")
+    for pool in enlaces_servicio2:
+        pool.cerrar()
+    wal.cerrar()
+    wal_cadenas.cerrar()
+    eliminar_socket(direccion_servidor)
+    if receptor_compartido is not None:
+        receptor_compartido.cerrar()
+
 #FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
 
-def main():
-    global servidor_activo
-    
-    # INICIAR SERVIDOR EN HILO SEPARADO-------------------------------------
-    servidor_thread = threading.Thread(target=ejecutar_servidor)
-    servidor_thread.daemon = True
-    servidor_thread.start()
-    time.sleep(1.5)
-    
-    # INICIALIZAR LA INTERACCIÓN CON EL USUARIO-----------------------------
-    iniciar_interaccion()
+def main(argv=None):
+    args = configurar(argv)
     
-    # MANTENER EL SERVICIO ACTIVO-------------------------------------------
     try:
-        while servidor_activo:
-            time.sleep(1)
+        if args.asincrono:
+            # EJECUTAR EL SERVIDOR SOBRE ASYNCIO----------------------------
+            runtime = RuntimeAsync(apagado.activo, control, args.trabajadores, args.cola, args.marca_alta, args.marca_baja, wal)
+            runtime.ejecutar(
+                lambda: runtime.servir_tcp(direccion_servidor, procesar_con_wal),
+                lambda: [tarea() for tarea in iniciar_o_reanudar(args)],
+            )
+        else:
+            # CREAR POOL DE TRABAJADORES CON COLA ACOTADA-------------------
+            iniciar_trabajadores(args)
+            
+            # INICIAR SERVIDOR EN HILO SEPARADO-----------------------------
+            servidor_thread = threading.Thread(target=ejecutar_servidor if receptor_compartido is None else ejecutar_receptor_compartido)
+            servidor_thread.daemon = True
+            servidor_thread.start()
+            
+            # ESPERAR A QUE EL SERVIDOR ESTÉ ESCUCHANDO---------------------
+            servidor_listo.wait()
+            if not apagado.activo():
+                return
+            
+            # INICIALIZAR LA INTERACCIÓN O REANUDAR LAS CADENAS PENDIENTES-
+            for tarea in iniciar_o_reanudar(args):
+                pool_trabajadores.enviar(tarea)
+            
+            # ESPERAR LA SEÑAL DE APAGADO, SIN REVISAR PERIÓDICAMENTE------
+            apagado.esperar()
     except KeyboardInterrupt:
         print("\nInterrupción detectada. Finalizando...")
     finally:
-        print("Finalizando Servicio 1...")
-        servidor_activo = False
+        finalizar()
 
 #EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
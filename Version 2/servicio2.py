@@ -1,50 +1,98 @@
 #LIBRERÍAS NECESARIAS-------------------------------------------------------
 
+import argparse
 import socket
-import datetime
 import threading
-import time
-import re
+from conexiones import PoolConexiones
+from protocolo import recibir_tramas, empaquetar_trama, LARGO_MAXIMO_TRAMA
+from mensajes import interpretar_mensaje, extender_mensaje, serializar_mensaje, construir_senal_fin, codec_de, codificar_datos, mostrar_mensaje, TIPO_FIN, TIPO_COMPLETA, TIPO_DELTA, TIPO_COMPLETO, CODEC_TEXTO
+from cadenas import TablaCadenas
+from runtime_async import RuntimeAsync
+from apagado import SenalApagado
+from trabajadores import PoolTrabajadores, CANTIDAD_TRABAJADORES, CAPACIDAD_COLA
+from udp_confiable import EmisorUDPConfiable
+from fragmentacion import Fragmentador, MTU, UMBRAL_FLUJO
+from lotes import AgrupadorDatagramas, DEMORA_LOTE, confirmar_al_completar
+from palabras import ProveedorInteractivo, crear_proveedor
+from wal import WALMensajes, DIFERIDA
+from topologia import agregar_opciones_nodo
+from procesos import agregar_opcion_procesos, iniciar_procesos, EnlacesPorCadena
+from contrapresion import agregar_opciones_contrapresion, validar_contrapresion, ControlCarga, Cupos, MAX_CONEXIONES
+from compresion import cargar_diccionario
+from transporte import direccion_servicio, crear_socket_servidor, eliminar_socket, mostrar_direccion, TRANSPORTES, TRANSPORTE_INET, TRANSPORTE_COMPARTIDA, DIRECTORIO_SOCKETS, BACKLOG
+from memoria_compartida import EmisorDatagramasCompartido, ReceptorCompartido
 
 #VARIABLES NECESARIAS-------------------------------------------------------
 
 HOST = 'localhost'
 PORT_SERVIDOR = 8002  
 PORT_DESTINO = 8003   
-servidor_activo = True
+apagado = SenalApagado()
+proveedor_palabras = ProveedorInteractivo()
+pool_trabajadores = None
+tabla_cadenas = TablaCadenas()
+emisores_servicio3 = None
+agrupadores_servicio3 = None
+fragmentador = Fragmentador()
+umbral_flujo = UMBRAL_FLUJO
+direccion_servidor = (HOST, PORT_SERVIDOR)
+direccion_destino = (HOST, PORT_DESTINO)
+flujos_servicio3 = None
+receptor_compartido = None
+grupo = None
+control = ControlCarga("Servicio 2")
+conexiones = Cupos(MAX_CONEXIONES)
+backlog = BACKLOG
+ARCHIVO_WAL = "servicio2.wal"
+wal = None
+procesar_con_wal = None
 
 #FUNCIÓN ENVIAR MENSAJE AL SERVICIO 3 VÍA UDP-------------------------------
-#     Esta función se encarga de establecer una conexión UDP con el Servicio 3
-#     y enviar el mensaje correspondiente. UDP es un protocolo sin conexión
-#     que no garantiza la entrega, pero es más rápido que TCP.
+#     Esta función envía el mensaje al Servicio 3 por UDP. UDP es un
+#     protocolo sin conexión que no garantiza la entrega, pero es más rápido
+#     que TCP; por eso el envío pasa por el emisor UDP confiable, que numera
+#     los datagramas, espera el ACK del Servicio 3 y retransmite los que se
+#     pierdan, para que una cadena no quede detenida por un datagrama perdido.
+#     Los mensajes más grandes que la MTU se dividen en fragmentos que el
+#     Servicio 3 reensambla, y los que superan umbral_flujo se envían por
+#     una conexión TCP al mismo puerto, donde la fragmentación ya no conviene.
+#     Los mensajes pequeños pasan por el agrupador, que junta en un solo
+#     datagrama los que están listos casi al mismo tiempo. Con
+#     --conexiones-destino, cada cadena sale siempre por el mismo emisor
+#     (y la misma conexión de flujo), con su propio puerto de origen.
+#     Un mensaje por datagramas se confirma en el WAL recién cuando el
+#     Servicio 3 envió el ACK de todos sus fragmentos.
 #
 #     PARÁMETROS:
 #          mensaje = cadena de texto que será enviada al Servicio 3 vía UDP
+#          confirmar = función que confirma el mensaje en el WAL
+#
+#     RETORNA:
+#          True si ya se envió, DIFERIDA si se confirmará con el ACK, o
+#          False si no se pudo enviar
 #---------------------------------------------------------------------------
 
-def enviar_a_servicio3_udp(mensaje):
+def enviar_a_servicio3_udp(mensaje, confirmar=None):
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.sendto(mensaje.encode('utf-8'), (HOST, PORT_DESTINO))
-            print(f"Mensaje enviado al Servicio 3 (UDP): {mensaje}")
+        datos = codificar_datos(mensaje)
+        
+        # MENSAJES MUY GRANDES: FLUJO TCP EN LUGAR DE DATAGRAMAS-------------
+        if len(datos) > umbral_flujo:
+            flujos_servicio3.elegir(mensaje).enviar(empaquetar_trama(datos))
+            print(f"Mensaje de {len(datos)} bytes enviado al Servicio 3 por TCP: {mostrar_mensaje(mensaje)}")
+            return True
+        
+        agrupador = agrupadores_servicio3.elegir(mensaje)
+        fragmentos = fragmentador.fragmentar(datos)
+        al_confirmar = confirmar_al_completar(len(fragmentos), confirmar) if confirmar is not None else None
+        for fragmento in fragmentos:
+            agrupador.agregar(fragmento, al_confirmar)
+        detalle = f" en {len(fragmentos)} fragmentos" if len(fragmentos) > 1 else ""
+        print(f"Mensaje enviado al Servicio 3 (UDP){detalle}: {mostrar_mensaje(mensaje)}")
+        return True if confirmar is None else DIFERIDA
     except Exception as e:
         print(f"Error enviando mensaje al Servicio 3: {e}")
-
-#FUNCIÓN VERIFICAR MENSAJE DE FINALIZACIÓN----------------------------------
-#     Esta función utiliza expresiones regulares para verificar si un mensaje
-#     recibido corresponde a una señal de finalización del sistema. El patrón
-#     esperado es: YYYY-MM-DD HH:MM:SS-FIN
-#
-#     PARÁMETROS:
-#          mensaje = cadena de texto a verificar
-#     
-#     RETORNA:
-#          bool = True si es mensaje de finalización, False en caso contrario
-#---------------------------------------------------------------------------
-
-def es_mensaje_finalizacion(mensaje):
-    patron = r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}-FIN'
-    return bool(re.match(patron, mensaje))
+        return False
 
 #FUNCIÓN ENVIAR FINALIZACIÓN AL SIGUIENTE SERVICIO-------------------------
 #     Esta función construye y envía la señal de finalización al siguiente
@@ -52,98 +100,155 @@ def es_mensaje_finalizacion(mensaje):
 #     actual y construye el mensaje con formato timestamp-FIN_CADENA.
 #
 #     PARÁMETROS:
-#          Ninguno
+#          codec = codec con que se envía la señal (el del mensaje recibido)
+#          confirmar = función que confirma la señal recibida en el WAL
+#
+#     RETORNA:
+#          igual que enviar_a_servicio3_udp
 #---------------------------------------------------------------------------
 
-def enviar_finalizacion_siguiente():
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    mensaje_fin = f"{timestamp}-FIN_CADENA"
+def enviar_finalizacion_siguiente(codec=CODEC_TEXTO, confirmar=None):
+    mensaje_fin = construir_senal_fin(codec)
     
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
-            sock.sendto(mensaje_fin.encode('utf-8'), (HOST, PORT_DESTINO))
-            print(f"Señal de finalización enviada al Servicio 3 (UDP): {mensaje_fin}")
+        agrupadores_servicio3.elegir(mensaje_fin).agregar(codificar_datos(mensaje_fin), confirmar)
+        print(f"Señal de finalización enviada al Servicio 3 (UDP): {mostrar_mensaje(mensaje_fin)}")
+        return True if confirmar is None else DIFERIDA
     except Exception as e:
         print(f"Error enviando señal de finalización: {e}")
+        return False
 
-#FUNCIÓN MANEJAR CLIENTE TCP------------------------------------------------
-#     Esta función se ejecuta en un hilo separado para manejar cada conexión
-#     TCP que llega al servidor desde el Servicio 1. Procesa los mensajes,
-#     verifica señales de finalización y solicita nueva palabra al usuario
-#     para continuar la cadena de mensajes.
+#FUNCIÓN PROCESAR MENSAJE TCP-----------------------------------------------
+#     Esta función procesa un mensaje individual recibido del Servicio 1.
+#     Verifica si es una señal de finalización y, en caso contrario,
+#     solicita una nueva palabra al proveedor para continuar la cadena.
 #
 #     PARÁMETROS:
-#          conn = objeto de conexión del socket cliente TCP
-#          addr = dirección del cliente conectado
+#          data = mensaje recibido, ya separado del resto del flujo TCP
+#          confirmar = función que confirma el mensaje en el WAL
+#
+#     RETORNA:
+#          False si no se pudo reenviar el mensaje (queda pendiente en el WAL),
+#          o DIFERIDA si se confirmará al llegar el ACK del Servicio 3
 #---------------------------------------------------------------------------
 
-def manejar_cliente(conn, addr):
-    global servidor_activo
+def procesar_mensaje_tcp(data, confirmar=None):
     try:
-        data = conn.recv(1024).decode('utf-8')
-        if not data:
-            return
-            
-        print(f"Mensaje recibido de Servicio 1: {data}")
+        print(f"Mensaje recibido de Servicio 1: {mostrar_mensaje(data)}")
+        tipo, contenido = interpretar_mensaje(data)
+        codec = codec_de(data)
         
         # VERIFICAR SI ES SEÑAL DE FINALIZACIÓN------------------------------
-        if es_mensaje_finalizacion(data):
+        if tipo == TIPO_FIN:
             print("Señal de finalización recibida del Servicio 1")
-            enviar_finalizacion_siguiente()
-            servidor_activo = False
-            return
+            tabla_cadenas.limpiar()
+            enviado = enviar_finalizacion_siguiente(codec, confirmar)
+            apagado.activar()
+            return enviado
+        
+        # REENVIAR EL AVISO DE UNA CADENA COMPLETADA EN UNA ETAPA ANTERIOR---
+        if tipo == TIPO_COMPLETA:
+            return enviar_a_servicio3_udp(data, confirmar)
         
-        # PROCESAR MENSAJE NORMAL CON EXPRESIONES REGULARES------------------
-        patron = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})-(\d+)-(\d+)-(.+)$'
-        match = re.match(patron, data)
+        # PROCESAR MENSAJE EN MODO DELTA-------------------------------------
+        if tipo == TIPO_DELTA:
+            delta = contenido
+            estado = tabla_cadenas.aplicar_delta(delta)
+            if estado is None:
+                print(f"Mensaje duplicado de la cadena {delta.id_cadena}, se ignora")
+                return
+            
+            nueva_palabra = proveedor_palabras.siguiente()
+            
+            tabla_cadenas.agregar_palabras(estado, nueva_palabra)
+            mensaje_delta = tabla_cadenas.construir_delta(estado, codec)
+            print(f"Mensaje delta: {mostrar_mensaje(mensaje_delta)}")
+            
+            return enviar_a_servicio3_udp(mensaje_delta, confirmar)
         
-        if match:
-            timestamp, largo_minimo, largo_actual, mensaje_actual = match.groups()
+        # PROCESAR MENSAJE EN MODO COMPLETO----------------------------------
+        if tipo == TIPO_COMPLETO:
+            recibido = contenido
             
-            nueva_palabra = input("Ingrese una nueva palabra: ").strip()
-            while not nueva_palabra:
-                nueva_palabra = input("La palabra no puede estar vacía. Ingrese una nueva palabra: ").strip()
+            if not tabla_cadenas.registrar_salto(recibido.id_cadena, recibido.largo_minimo, recibido.largo_actual):
+                print(f"Mensaje duplicado de la cadena {recibido.id_cadena}, se ignora")
+                return
             
-            # CONSTRUIR MENSAJE ACTUALIZADO----------------------------------
-            mensaje_actualizado = f"{mensaje_actual} {nueva_palabra}"
-            nuevo_largo = len(mensaje_actualizado.split())
-            nuevo_timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            nueva_palabra = proveedor_palabras.siguiente()
             
-            mensaje_completo = f"{nuevo_timestamp}-{largo_minimo}-{nuevo_largo}-{mensaje_actualizado}"
+            # CONSTRUIR MENSAJE ACTUALIZADO (SIN RECONTAR EL TEXTO)----------
+            mensaje_completo = serializar_mensaje(extender_mensaje(recibido, nueva_palabra), codec)
             
-            print(f"Mensaje actualizado: {mensaje_completo}")
+            print(f"Mensaje actualizado: {mostrar_mensaje(mensaje_completo)}")
             
             # ENVIAR VÍA UDP AL SERVICIO 3-----------------------------------
-            enviar_a_servicio3_udp(mensaje_completo)
+            return enviar_a_servicio3_udp(mensaje_completo, confirmar)
         else:
             print("Error: Formato de mensaje inválido en Servicio 2")
             
+    except Exception as e:
+        print(f"Error procesando mensaje TCP: {e}")
+
+#FUNCIÓN ENCOLAR MENSAJE---------------------------------------------------
+#     Esta función registra un mensaje recibido del Servicio 1 en el WAL y
+#     lo encola en el pool de trabajadores. La usan el servidor TCP y el
+#     lanzador de un solo proceso. Con --procesos, los mensajes de cadenas
+#     de otro proceso se le derivan. Con --politica descartar, los mensajes
+#     que llegan con la cola saturada se pierden.
+#
+#     PARÁMETROS:
+#          data = mensaje recibido, ya separado del resto del flujo TCP
+#---------------------------------------------------------------------------
+
+def encolar_mensaje(data):
+    if grupo is not None and grupo.derivar(data):
+        return
+    if not control.admitir(data):
+        return
+    pool_trabajadores.enviar(wal.tarea(procesar_con_wal, data))
+
+#FUNCIÓN MANEJAR CLIENTE TCP------------------------------------------------
+#     Esta función se ejecuta en un hilo separado para manejar cada conexión
+#     TCP que llega al servidor. Como el Servicio 1 mantiene la conexión
+#     abierta, se leen todas las tramas que lleguen por ella, sin importar
+#     su tamaño, hasta que el cliente la cierre o llegue la señal de
+#     finalización. Si la cola del pool llega a la marca alta, la lectura
+#     se pausa hasta que baje a la marca baja y TCP frena al emisor.
+#
+#     PARÁMETROS:
+#          conn = objeto de conexión del socket cliente
+#          addr = dirección del cliente conectado
+#---------------------------------------------------------------------------
+
+def manejar_cliente(conn, addr):
+    try:
+        for data in recibir_tramas(conn):
+            encolar_mensaje(data)
+            if not apagado.activo():
+                break
+            control.pausar()
     except Exception as e:
         print(f"Error manejando cliente: {e}")
     finally:
         conn.close()
+        conexiones.liberar()
 
 #FUNCIÓN EJECUTAR SERVIDOR TCP----------------------------------------------
 #     Esta función ejecuta el servidor TCP que recibe conexiones del
 #     Servicio 1. Utiliza threading para manejar múltiples conexiones
-#     simultáneas y mantiene un timeout para verificar periódicamente
-#     el estado del servidor.
+#     simultáneas, hasta --max-conexiones a la vez (las demás esperan en
+#     el backlog), y espera cada conexión con select(), junto con la señal
+#     de apagado, para terminar apenas esta se activa.
 #
 #     PARÁMETROS:
 #          Ninguno (utiliza variables globales)
 #---------------------------------------------------------------------------
 
 def ejecutar_servidor():
-    global servidor_activo
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server_sock:
-        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_sock.bind((HOST, PORT_SERVIDOR))
-        server_sock.listen(5)
-        server_sock.settimeout(1.0)  
+    with crear_socket_servidor(direccion_servidor, backlog=backlog) as server_sock:
+        print(f"Servicio 2 escuchando en {mostrar_direccion(direccion_servidor)}")
         
-        print(f"Servicio 2 escuchando en {HOST}:{PORT_SERVIDOR}")
-        
-        while servidor_activo:
+        while conexiones.ocupar() and apagado.esperar_legible(server_sock):
             try:
                 conn, addr = server_sock.accept()
                 print(f"Conexión recibida de {addr}")
@@ -151,36 +256,213 @@ def ejecutar_servidor():
                     target=manejar_cliente, 
                     args=(conn, addr)
                 )
+                client_thread.daemon = True
                 client_thread.start()
-            except socket.timeout:
-                continue
             except Exception as e:
-                if servidor_activo:
+                conexiones.liberar()
+                if apagado.activo():
                     print(f"Error en servidor: {e}")
                 break
 
+#FUNCIÓN EJECUTAR RECEPTOR DE MEMORIA COMPARTIDA----------------------------
+#     Con --transporte compartida, esta función reemplaza al servidor TCP:
+#     lee del anillo en memoria compartida las tramas que escribe el
+#     Servicio 1 y las encola igual que las de una conexión.
+#
+#     PARÁMETROS:
+#          Ninguno (utiliza variables globales)
+#---------------------------------------------------------------------------
+
+def ejecutar_receptor_compartido():
+    print(f"Servicio 2 leyendo el anillo {receptor_compartido.nombre} (memoria compartida)")
+    try:
+        for data in receptor_compartido.recibir(apagado):
+            encolar_mensaje(data)
+            control.pausar()
+    except Exception as e:
+        if apagado.activo():
+            print(f"Error en el receptor de memoria compartida: {e}")
+
+#FUNCIÓN CONFIGURAR SERVICIO------------------------------------------------
+#     Esta función interpreta las opciones de línea de comandos y prepara el
+#     estado del servicio: proveedor de palabras, WAL, fragmentación,
+#     direcciones según el transporte y enlaces hacia el Servicio 3. La usan
+#     main() y el lanzador de un solo proceso, que entrega un enlace en
+#     memoria en lugar del emisor UDP confiable. En memoria compartida el
+#     anillo no limita el tamaño de los mensajes, así que no se fragmentan
+#     ni se envían por el flujo TCP. Los saltos de entrada y de salida
+#     pueden usar transportes distintos (--transporte-destino). Con
+#     --procesos, el servicio se divide antes de crear los enlaces, y cada
+#     proceso crea los suyos y su propio WAL.
+#
+#     PARÁMETROS:
+#          argv = lista de opciones, o None para usar las de la terminal
+#          enlace = objeto con enviar(datagrama) y cerrar() hacia el
+#                   Servicio 3, o None para usar el transporte elegido
+#
+#     RETORNA:
+#          las opciones interpretadas
+#---------------------------------------------------------------------------
+
+def configurar(argv=None, enlace=None):
+    global proveedor_palabras, wal, procesar_con_wal, emisores_servicio3, agrupadores_servicio3, flujos_servicio3, fragmentador, umbral_flujo
+    global direccion_servidor, direccion_destino, receptor_compartido, grupo, control, conexiones, backlog
+    parser = argparse.ArgumentParser(description="Servicio 2")
+    parser.add_argument('--async', dest='asincrono', action='store_true',
+                        help="ejecutar el servidor sobre asyncio en lugar de un hilo por mensaje")
+    parser.add_argument('--trabajadores', type=int, default=CANTIDAD_TRABAJADORES,
+                        help="cantidad de hilos trabajadores que procesan mensajes")
+    parser.add_argument('--cola', type=int, default=CAPACIDAD_COLA,
+                        help="cantidad máxima de mensajes en espera de un trabajador")
+    parser.add_argument('--palabras', default="interactivo",
+                        help="origen de las palabras: interactivo, archivo:RUTA, aleatorio[:SEMILLA] o tuberia[:RUTA]")
+    parser.add_argument('--perdida', type=float, default=0.0,
+                        help="probabilidad de descartar un datagrama hacia el Servicio 3, para probar la entrega confiable")
+    parser.add_argument('--mtu', type=int, default=MTU,
+                        help="MTU del enlace hacia el Servicio 3; los mensajes más grandes se fragmentan")
+    parser.add_argument('--umbral-flujo', type=int, default=UMBRAL_FLUJO,
+                        help="tamaño en bytes sobre el cual los mensajes se envían al Servicio 3 por TCP")
+    parser.add_argument('--demora-lote', type=float, default=DEMORA_LOTE * 1000,
+                        help="milisegundos que un mensaje puede esperar para agruparse con otros en un datagrama (0 desactiva)")
+    parser.add_argument('--wal', default=ARCHIVO_WAL,
+                        help="archivo del WAL con los mensajes aún no reenviados al Servicio 3")
+    parser.add_argument('--transporte', choices=TRANSPORTES, default=TRANSPORTE_INET,
+                        help="inet usa TCP/UDP sobre localhost; unix usa sockets de dominio Unix de flujo y de datagramas; compartida usa anillos en memoria compartida, solo en el modo con hilos (todos los servicios deben usar el mismo)")
+    parser.add_argument('--directorio-sockets', default=DIRECTORIO_SOCKETS,
+                        help="directorio de los sockets Unix")
+    agregar_opciones_nodo(parser, PORT_SERVIDOR, PORT_DESTINO)
+    agregar_opcion_procesos(parser)
+    agregar_opciones_contrapresion(parser)
+    parser.add_argument('--diccionario', default=None,
+                        help="archivo de texto con cuyas palabras más recientes se entrena un diccionario de compresión (todos los servicios deben usar el mismo)")
+    args = parser.parse_args(argv)
+    if args.asincrono and args.transporte == TRANSPORTE_COMPARTIDA:
+        parser.error("--transporte compartida no se puede combinar con --async")
+    if args.conexiones_destino <= 0:
+        parser.error("la cantidad de conexiones hacia el destino debe ser mayor a 0")
+    validar_contrapresion(parser, args)
+    control = ControlCarga("Servicio 2", args.politica)
+    conexiones = Cupos(args.max_conexiones)
+    backlog = args.backlog
+    direccion_servidor = direccion_servicio(args.transporte, args.host, args.puerto, directorio=args.directorio_sockets)
+    grupo = iniciar_procesos(parser, args, "Servicio 2", [(direccion_servidor, socket.SOCK_STREAM)], apagado)
+    try:
+        proveedor_palabras = crear_proveedor(args.palabras)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.diccionario:
+        cargar_diccionario(args.diccionario)
+    wal = WALMensajes(args.wal if grupo is None else grupo.ruta(args.wal))
+    if grupo is not None:
+        grupo.reclamar(wal.recuperados)
+    procesar_con_wal = wal.proteger(procesar_mensaje_tcp, diferida=True)
+    transporte_destino = args.transporte_destino or args.transporte
+    tabla_cadenas.nodos = args.nodos
+    direccion_destino = direccion_servicio(transporte_destino, args.host_destino, args.puerto_destino, socket.SOCK_DGRAM, args.directorio_sockets)
+    direccion_flujo = direccion_servicio(transporte_destino, args.host_destino, args.puerto_destino, directorio=args.directorio_sockets)
+    exclusiva = args.conexiones_destino > 1
+    flujos_servicio3 = EnlacesPorCadena(PoolConexiones(direccion_flujo, exclusiva=exclusiva) for _ in range(args.conexiones_destino))
+    if args.transporte == TRANSPORTE_COMPARTIDA:
+        receptor_compartido = ReceptorCompartido(args.puerto, args.directorio_sockets)
+    if enlace is None and transporte_destino == TRANSPORTE_COMPARTIDA:
+        enlace = EmisorDatagramasCompartido(args.puerto_destino, args.directorio_sockets)
+        # EL ANILLO NO TIENE MTU; SIN AGRUPAR, PORQUE UN LOTE SOLO-----------
+        # REGISTRA LARGOS DE 16 BITS (IGUAL QUE EL LANZADOR)
+        args.mtu = args.umbral_flujo = LARGO_MAXIMO_TRAMA
+        args.demora_lote = 0
+    if enlace is not None:
+        emisores_servicio3 = EnlacesPorCadena([enlace])
+    else:
+        emisores_servicio3 = EnlacesPorCadena(EmisorUDPConfiable(direccion_destino, perdida=args.perdida) for _ in range(args.conexiones_destino))
+    agrupadores_servicio3 = EnlacesPorCadena(AgrupadorDatagramas(emisor.enviar, args.mtu, args.demora_lote / 1000, isinstance(emisor, EmisorUDPConfiable)) for emisor in emisores_servicio3)
+    fragmentador = Fragmentador(args.mtu)
+    umbral_flujo = args.umbral_flujo
+    return args
+
+#FUNCIÓN INICIAR TRABAJADORES-----------------------------------------------
+#     Esta función crea el pool de trabajadores con cola acotada y le
+#     entrega los mensajes que quedaron sin reenviar en el WAL. Con
+#     --procesos, también recibe los mensajes que derivan los demás.
+#
+#     PARÁMETROS:
+#          args = opciones interpretadas por configurar()
+#---------------------------------------------------------------------------
+
+def iniciar_trabajadores(args):
+    global pool_trabajadores
+    pool_trabajadores = PoolTrabajadores(f"Servicio 2", args.trabajadores, args.cola, args.marca_alta, args.marca_baja)
+    control.pool = pool_trabajadores
+    for tarea in wal.reprocesar(procesar_con_wal):
+        pool_trabajadores.enviar(tarea)
+    if grupo is not None:
+        grupo.escuchar(encolar_mensaje)
+
+#FUNCIÓN FINALIZAR SERVICIO-------------------------------------------------
+#     Esta función activa el apagado, espera a que los trabajadores terminen
+#     las tareas encoladas, envía el último lote, espera los ACK pendientes
+#     y muestra las métricas antes de cerrar los enlaces y el WAL.
+#---------------------------------------------------------------------------
+
+def finalizar():
+    print("Finalizando Servicio 2...")
+    apagado.activar()
+    conexiones.cerrar()
+    if pool_trabajadores is not None:
+        pool_trabajadores.detener()
+        print(f"Métricas del pool de trabajadores: {pool_trabajadores.resumen()}")
+        print(f"Métricas del control de carga: {control.resumen()}")
+    
+    # ENVIAR EL ÚLTIMO LOTE Y ESPERAR LOS ACK PENDIENTES--------------------
+    for agrupador in agrupadores_servicio3:
+        agrupador.cerrar()
+        lotes = agrupador.metricas()
+        print(f"Métricas del agrupador: {lotes['mensajes']} mensajes en {lotes['datagramas']} datagramas")
+    for emisor in emisores_servicio3:
+        emisor.cerrar()
+        if isinstance(emisor, EmisorUDPConfiable):
+            metricas = emisor.metricas()
+            print(f"Métricas del emisor UDP confiable: {metricas['retransmisiones']} retransmisiones, RTO {metricas['rto_ms']:.1f} ms")
+    for pool in flujos_servicio3:
+        pool.cerrar()
+    wal.cerrar()
+    if grupo is not None:
+        grupo.cerrar()
+        print(f"Métricas del grupo de procesos: {grupo.resumen()}")
+    eliminar_socket(direccion_servidor)
+    if receptor_compartido is not None:
+        receptor_compartido.cerrar()
+
 #FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
 
-def main():
-    global servidor_activo
+def main(argv=None):
     print("=== SERVICIO 2 - TCP SERVER / UDP CLIENT ===")
+    args = configurar(argv)
     
-    # INICIAR SERVIDOR TCP EN HILO SEPARADO---------------------------------
-    servidor_thread = threading.Thread(target=ejecutar_servidor)
-    servidor_thread.daemon = True
-    servidor_thread.start()
-    
-    # MANTENER EL SERVICIO ACTIVO-------------------------------------------
     try:
-        while servidor_activo:
-            time.sleep(1)
+        if args.asincrono:
+            # EJECUTAR EL SERVIDOR SOBRE ASYNCIO----------------------------
+            runtime = RuntimeAsync(apagado.activo, control, args.trabajadores, args.cola, args.marca_alta, args.marca_baja, wal)
+            runtime.ejecutar(
+                lambda: runtime.servir_tcp(direccion_servidor, procesar_con_wal),
+                lambda: [tarea() for tarea in wal.reprocesar(procesar_con_wal)],
+            )
+        else:
+            # CREAR POOL DE TRABAJADORES Y REPROCESAR EL WAL----------------
+            iniciar_trabajadores(args)
+            
+            # INICIAR SERVIDOR TCP EN HILO SEPARADO-------------------------
+            servidor_thread = threading.Thread(target=ejecutar_servidor if receptor_compartido is None else ejecutar_receptor_compartido)
+            servidor_thread.daemon = True
+            servidor_thread.start()
+            
+            # ESPERAR LA SEÑAL DE APAGADO, SIN REVISAR PERIÓDICAMENTE------
+            apagado.esperar()
     except KeyboardInterrupt:
         print("\nInterrupción detectada. Finalizando...")
     finally:
-        print("Finalizando Servicio 2...")
-        servidor_activo = False
+        finalizar()
 
 #EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
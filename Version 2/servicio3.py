@@ -1,22 +1,63 @@
 #LIBRERÍAS NECESARIAS-------------------------------------------------------
 
+import argparse
 import socket
-import datetime
 import threading
-import time
-import re
+from conexiones import ClienteHTTP
+from mensajes import interpretar_mensaje, extender_mensaje, serializar_mensaje, construir_senal_fin, codec_de, decodificar_datos, mostrar_mensaje, TIPO_FIN, TIPO_COMPLETA, TIPO_DELTA, TIPO_COMPLETO, CODEC_TEXTO
+from cadenas import TablaCadenas
+from runtime_async import RuntimeAsync
+from apagado import SenalApagado
+from trabajadores import PoolTrabajadores, CANTIDAD_TRABAJADORES, CAPACIDAD_COLA
+from palabras import ProveedorInteractivo, crear_proveedor
+from udp_confiable import ReceptorUDPConfiable
+from fragmentacion import Reensamblador
+from lotes import separar_lote
+from protocolo import recibir_tramas
+from wal import WALMensajes
+from topologia import agregar_opciones_nodo
+from procesos import agregar_opcion_procesos, iniciar_procesos, EnlacesPorCadena
+from contrapresion import agregar_opciones_contrapresion, validar_contrapresion, segundos_reintento, ControlCarga, Cupos, MAX_CONEXIONES
+from compresion import cargar_diccionario
+from transporte import direccion_servicio, crear_socket_servidor, eliminar_socket, mostrar_direccion, TRANSPORTES, TRANSPORTE_INET, TRANSPORTE_COMPARTIDA, DIRECTORIO_SOCKETS, BACKLOG
+from memoria_compartida import EmisorHTTPCompartido, ReceptorCompartido
+from memoria import responder_nulo
 
 #VARIABLES NECESARIAS-------------------------------------------------------
 
 HOST = 'localhost'
 PORT_SERVIDOR = 8003  
 PORT_DESTINO = 8004   
-servidor_activo = True
+TAMANO_MAXIMO_DATAGRAMA = 65535
+apagado = SenalApagado()
+proveedor_palabras = ProveedorInteractivo()
+pool_trabajadores = None
+tabla_cadenas = TablaCadenas()
+direccion_servidor = (HOST, PORT_SERVIDOR)
+direccion_flujo = (HOST, PORT_SERVIDOR)
+direccion_destino = (HOST, PORT_DESTINO)
+clientes_servicio4 = None
+receptor_compartido = None
+grupo = None
+control = ControlCarga("Servicio 3")
+conexiones = Cupos(MAX_CONEXIONES)
+backlog = BACKLOG
+receptor_confiable = ReceptorUDPConfiable()
+reensamblador = Reensamblador()
+ARCHIVO_WAL = "servicio3.wal"
+wal = None
+procesar_con_wal = None
 
 #FUNCIÓN ENVIAR MENSAJE HTTP AL SERVICIO 4----------------------------------
-#     Esta función construye una petición HTTP POST completa con headers
-#     apropiados y envía el mensaje al Servicio 4. Utiliza el protocolo
-#     HTTP/1.1 con Content-Type text/plain y maneja la respuesta del servidor.
+#     Esta función envía el mensaje al Servicio 4 como body de una petición
+#     HTTP/1.1 POST con Content-Type text/plain. Usa el cliente HTTP
+#     persistente, que mantiene la conexión abierta entre mensajes, permite
+#     que varios trabajadores envíen en pipelining y se reconecta si el
+#     servidor cierra la conexión. Muestra la línea de estado de la respuesta.
+#     Si el Servicio 4 está saturado y responde 503, el mensaje se reintenta
+#     tras los segundos que indica su Retry-After; mientras tanto este
+#     trabajador no toma otros mensajes, y la saturación llega al Servicio 2.
+#     Con --conexiones-destino, cada cadena sale siempre por el mismo cliente.
 #
 #     PARÁMETROS:
 #          mensaje = cadena de texto que será enviada como body de la petición HTTP
@@ -24,46 +65,20 @@ servidor_activo = True
 
 def enviar_http_a_servicio4(mensaje):
     try:
-        body = mensaje
-        content_length = len(body.encode('utf-8'))
-        
-        # CONSTRUIR PETICIÓN HTTP POST COMPLETA------------------------------
-        http_request = (
-            f"POST /mensaje HTTP/1.1\r\n"
-            f"Host: {HOST}:{PORT_DESTINO}\r\n"
-            f"Content-Type: text/plain; charset=utf-8\r\n"
-            f"Content-Length: {content_length}\r\n"
-            f"Connection: close\r\n"
-            f"\r\n"
-            f"{body}"
-        )
-        
-        # ENVIAR PETICIÓN Y RECIBIR RESPUESTA--------------------------------
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.connect((HOST, PORT_DESTINO))
-            sock.send(http_request.encode('utf-8'))
-            
-            response = sock.recv(1024).decode('utf-8')
-            print(f"Mensaje HTTP enviado al Servicio 4. Respuesta: {response.split('\\r\\n')[0]}")
+        cliente = clientes_servicio4.elegir(mensaje)
+        codigo, razon, cabeceras, _ = cliente.enviar(mensaje)
+        while codigo == 503 and apagado.activo():
+            espera = segundos_reintento(cabeceras)
+            print(f"Servicio 4 saturado ({codigo} {razon}), reintento en {espera} s")
+            if apagado.esperar(espera):
+                break
+            codigo, razon, cabeceras, _ = cliente.enviar(mensaje)
+        print(f"Mensaje HTTP enviado al Servicio 4. Respuesta: {codigo} {razon}")
+        return codigo == 200
             
     except Exception as e:
         print(f"Error enviando mensaje HTTP al Servicio 4: {e}")
-
-#FUNCIÓN VERIFICAR MENSAJE DE FINALIZACIÓN----------------------------------
-#     Esta función utiliza expresiones regulares para verificar si un mensaje
-#     recibido corresponde a una señal de finalización del sistema. El patrón
-#     esperado es: YYYY-MM-DD HH:MM:SS-FIN
-#
-#     PARÁMETROS:
-#          mensaje = cadena de texto a verificar
-#     
-#     RETORNA:
-#          bool = True si es mensaje de finalización, False en caso contrario
-#---------------------------------------------------------------------------
-
-def es_mensaje_finalizacion(mensaje):
-    patron = r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}-FIN'
-    return bool(re.match(patron, mensaje))
+        return False
 
 #FUNCIÓN ENVIAR FINALIZACIÓN AL SIGUIENTE SERVICIO-------------------------
 #     Esta función construye y envía la señal de finalización al siguiente
@@ -71,130 +86,446 @@ def es_mensaje_finalizacion(mensaje):
 #     actual y construye el mensaje con formato timestamp-FIN_CADENA.
 #
 #     PARÁMETROS:
-#          Ninguno
+#          codec = codec con que se envía la señal (el del mensaje recibido)
 #---------------------------------------------------------------------------
 
-def enviar_finalizacion_siguiente():
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    mensaje_fin = f"{timestamp}-FIN_CADENA"
+def enviar_finalizacion_siguiente(codec=CODEC_TEXTO):
+    mensaje_fin = construir_senal_fin(codec)
     
     try:
-        enviar_http_a_servicio4(mensaje_fin)
-        print(f"Señal de finalización enviada al Servicio 4 (HTTP): {mensaje_fin}")
+        if not enviar_http_a_servicio4(mensaje_fin):
+            return False
+        print(f"Señal de finalización enviada al Servicio 4 (HTTP): {mostrar_mensaje(mensaje_fin)}")
+        return True
     except Exception as e:
         print(f"Error enviando señal de finalización: {e}")
+        return False
 
 #FUNCIÓN PROCESAR MENSAJE UDP-----------------------------------------------
-#     Esta función se ejecuta en un hilo separado para procesar cada mensaje
+#     Esta función se ejecuta en un hilo trabajador para procesar cada mensaje
 #     UDP recibido del Servicio 2. Maneja tanto mensajes normales como
-#     señales de finalización, solicita nueva palabra al usuario y
+#     señales de finalización, solicita nueva palabra al proveedor y
 #     construye el mensaje actualizado para enviar al siguiente servicio.
 #
 #     PARÁMETROS:
 #          data = datos recibidos del socket UDP
 #          addr = dirección del cliente que envió el mensaje UDP
+#
+#     RETORNA:
+#          False si no se pudo reenviar el mensaje (queda pendiente en el WAL)
 #---------------------------------------------------------------------------
 
 def procesar_mensaje_udp(data, addr):
-    global servidor_activo
     try:
-        mensaje = data.decode('utf-8')
-        print(f"Mensaje recibido de Servicio 2 (UDP): {mensaje}")
+        mensaje = decodificar_datos(data)
+        print(f"Mensaje recibido de Servicio 2 (UDP): {mostrar_mensaje(mensaje)}")
+        tipo, contenido = interpretar_mensaje(mensaje)
+        codec = codec_de(mensaje)
         
         # VERIFICAR SI ES SEÑAL DE FINALIZACIÓN------------------------------
-        if es_mensaje_finalizacion(mensaje):
+        if tipo == TIPO_FIN:
             print("Señal de finalización recibida del Servicio 2")
-            enviar_finalizacion_siguiente()
-            servidor_activo = False
-            return
+            tabla_cadenas.limpiar()
+            enviado = enviar_finalizacion_siguiente(codec)
+            apagado.activar()
+            return enviado
         
-        # PROCESAR MENSAJE NORMAL CON EXPRESIONES REGULARES------------------
-        patron = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})-(\d+)-(\d+)-(.+)$'
-        match = re.match(patron, mensaje)
+        # REENVIAR EL AVISO DE UNA CADENA COMPLETADA EN UNA ETAPA ANTERIOR---
+        if tipo == TIPO_COMPLETA:
+            return enviar_http_a_servicio4(mensaje)
         
-        if match:
-            timestamp, largo_minimo, largo_actual, mensaje_actual = match.groups()
+        # PROCESAR MENSAJE EN MODO DELTA-------------------------------------
+        if tipo == TIPO_DELTA:
+            delta = contenido
+            estado = tabla_cadenas.aplicar_delta(delta)
+            if estado is None:
+                print(f"Mensaje duplicado de la cadena {delta.id_cadena}, se ignora")
+                return
             
-            nueva_palabra = input("Ingrese una nueva palabra: ").strip()
-            while not nueva_palabra:
-                nueva_palabra = input("La palabra no puede estar vacía. Ingrese una nueva palabra: ").strip()
+            nueva_palabra = proveedor_palabras.siguiente()
             
-            # CONSTRUIR MENSAJE ACTUALIZADO----------------------------------
-            mensaje_actualizado = f"{mensaje_actual} {nueva_palabra}"
-            nuevo_largo = len(mensaje_actualizado.split())
-            nuevo_timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            tabla_cadenas.agregar_palabras(estado, nueva_palabra)
+            mensaje_delta = tabla_cadenas.construir_delta(estado, codec)
+            print(f"Mensaje delta: {mostrar_mensaje(mensaje_delta)}")
             
-            mensaje_completo = f"{nuevo_timestamp}-{largo_minimo}-{nuevo_largo}-{mensaje_actualizado}"
+            return enviar_http_a_servicio4(mensaje_delta)
+        
+        # PROCESAR MENSAJE EN MODO COMPLETO----------------------------------
+        if tipo == TIPO_COMPLETO:
+            recibido = contenido
+            
+            if not tabla_cadenas.registrar_salto(recibido.id_cadena, recibido.largo_minimo, recibido.largo_actual):
+                print(f"Mensaje duplicado de la cadena {recibido.id_cadena}, se ignora")
+                return
+            
+            nueva_palabra = proveedor_palabras.siguiente()
             
-            print(f"Mensaje actualizado: {mensaje_completo}")
+            # CONSTRUIR MENSAJE ACTUALIZADO (SIN RECONTAR EL TEXTO)----------
+            mensaje_completo = serializar_mensaje(extender_mensaje(recibido, nueva_palabra), codec)
+            
+            print(f"Mensaje actualizado: {mostrar_mensaje(mensaje_completo)}")
             
             # ENVIAR VÍA HTTP AL SERVICIO 4-----------------------------------
-            enviar_http_a_servicio4(mensaje_completo)
+            return enviar_http_a_servicio4(mensaje_completo)
         else:
             print("Error: Formato de mensaje inválido en Servicio 3")
             
     except Exception as e:
         print(f"Error procesando mensaje UDP: {e}")
 
+#FUNCIÓN FILTRAR DATAGRAMA--------------------------------------------------
+#     Esta función aplica a cada datagrama recibido las capas que agrega el
+#     Servicio 2: confirma el datagrama con un ACK y descarta duplicados,
+#     separa los mensajes agrupados en un lote y junta los fragmentos de
+#     los mensajes grandes.
+#
+#     PARÁMETROS:
+#          data = bytes recibidos del socket UDP
+#          addr = dirección del emisor
+#          responder = función para enviar el ACK, con firma (datos, addr)
+#
+#     RETORNA:
+#          lista de mensajes completos (vacía si no hay nada que procesar)
+#---------------------------------------------------------------------------
+
+def filtrar_datagrama(data, addr, responder):
+    data = receptor_confiable.recibir(data, addr, responder)
+    if data is None:
+        return []
+    mensajes = []
+    for parte in separar_lote(data):
+        mensaje = reensamblador.agregar(parte, addr)
+        if mensaje is not None:
+            mensajes.append(mensaje)
+    return mensajes
+
+#FUNCIÓN ENCOLAR MENSAJE---------------------------------------------------
+#     Esta función registra un mensaje completo en el WAL y lo encola en el
+#     pool de trabajadores. Con --procesos, los mensajes de cadenas de otro
+#     proceso se le derivan. Con --politica descartar, los mensajes que
+#     llegan con la cola saturada se pierden.
+#
+#     PARÁMETROS:
+#          data = mensaje completo, ya reensamblado
+#          addr = dirección del emisor
+#---------------------------------------------------------------------------
+
+def encolar_mensaje(data, addr):
+    if grupo is not None and grupo.derivar(data, addr):
+        return
+    if not control.admitir(data):
+        return
+    pool_trabajadores.enviar(wal.tarea(procesar_con_wal, data, addr))
+
+#FUNCIÓN ACEPTAR DATAGRAMA--------------------------------------------------
+#     Esta función aplica la política de carga a un datagrama antes de
+#     filtrarlo. Con --politica rechazar y la cola saturada, un datagrama
+#     confiable se ignora sin enviar su ACK: el Servicio 2 lo retransmite
+#     más tarde, con un RTO cada vez mayor, y su ventana llena lo frena.
+#     Antes se miran las cabeceras de los mensajes del lote, y un datagrama
+#     con una señal de finalización o un aviso de cadena completa siempre
+#     se acepta. La usan el servidor UDP con hilos y el de asyncio.
+#
+#     PARÁMETROS:
+#          data = bytes recibidos
+#          addr = dirección del emisor
+#          responder = función para enviar el ACK, con firma (datos, addr)
+#
+#     RETORNA:
+#          lista de mensajes completos (vacía si no hay nada que procesar)
+#---------------------------------------------------------------------------
+
+def aceptar_datagrama(data, addr, responder):
+    if receptor_confiable.es_confiable(data) and control.rechazar(*separar_lote(receptor_confiable.datos(data))):
+        return []
+    return filtrar_datagrama(data, addr, responder)
+
+#FUNCIÓN RECIBIR DATAGRAMA--------------------------------------------------
+#     Esta función acepta un datagrama del Servicio 2 y encola los mensajes
+#     completos que contenga. La usan el servidor UDP y el lanzador de un
+#     solo proceso.
+#
+#     PARÁMETROS:
+#          data = bytes recibidos
+#          addr = dirección del emisor
+#          responder = función para enviar el ACK, con firma (datos, addr)
+#---------------------------------------------------------------------------
+
+def recibir_datagrama(data, addr, responder):
+    # RECHAZAR, CONFIRMAR, DESCARTAR DUPLICADOS, SEPARAR Y REENSAMBLAR-------
+    for mensaje in aceptar_datagrama(data, addr, responder):
+        print(f"Mensaje UDP recibido de {addr}")
+        encolar_mensaje(mensaje, addr)
+
 #FUNCIÓN EJECUTAR SERVIDOR UDP----------------------------------------------
 #     Esta función ejecuta el servidor UDP que recibe mensajes del Servicio 2.
 #     UDP es un protocolo sin conexión, por lo que utiliza recvfrom para
-#     recibir datos. Utiliza threading para procesar cada mensaje en
-#     hilos separados y mantiene un timeout para verificar el estado del servidor.
+#     recibir datos, con un buffer del tamaño máximo de un datagrama para
+#     no truncar mensajes largos. Cada datagrama confiable se confirma con
+#     un ACK al Servicio 2, los duplicados se descartan, los lotes se separan
+#     y los fragmentos se reensamblan antes de procesar el mensaje. Cada
+#     mensaje se encola en un pool fijo de trabajadores con cola acotada, en
+#     lugar de crear un hilo por datagrama, y con la cola saturada se
+#     aplica la política de carga. Cada datagrama se espera junto
+#     con la señal de apagado, para terminar apenas esta se activa.
 #
 #     PARÁMETROS:
 #          Ninguno (utiliza variables globales)
 #---------------------------------------------------------------------------
 
 def ejecutar_servidor_udp():
-    global servidor_activo
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as server_sock:
-        server_sock.bind((HOST, PORT_SERVIDOR))
-        server_sock.settimeout(1.0)
+    with crear_socket_servidor(direccion_servidor, socket.SOCK_DGRAM) as server_sock:
+        print(f"Servicio 3 escuchando en {mostrar_direccion(direccion_servidor)} (datagramas)")
         
-        print(f"Servicio 3 escuchando en {HOST}:{PORT_SERVIDOR} (UDP)")
-        
-        while servidor_activo:
+        while apagado.esperar_legible(server_sock):
             try:
-                data, addr = server_sock.recvfrom(1024)
-                print(f"Mensaje UDP recibido de {addr}")
+                data, addr = server_sock.recvfrom(TAMANO_MAXIMO_DATAGRAMA)
+                
+                recibir_datagrama(data, addr, server_sock.sendto)
                 
-                # PROCESAR MENSAJE EN HILO SEPARADO--------------------------
-                client_thread = threading.Thread(
-                    target=procesar_mensaje_udp, 
-                    args=(data, addr)
-                )
-                client_thread.start()
+                # COLA SATURADA: SIN LEER NI CONFIRMAR, LA VENTANA DEL-------
+                # SERVICIO 2 SE LLENA Y DEJA DE ENVIAR
+                control.pausar(rechaza=True)
                 
-            except socket.timeout:
-                continue
             except Exception as e:
-                if servidor_activo:
+                if apagado.activo():
                     print(f"Error en servidor UDP: {e}")
                 break
 
+#FUNCIÓN MANEJAR CONEXIÓN DE FLUJO------------------------------------------
+#     Esta función atiende una conexión TCP del Servicio 2, que la usa en
+#     lugar de UDP para los mensajes que superan su umbral de flujo. Cada
+#     trama se procesa igual que un datagrama.
+#
+#     PARÁMETROS:
+#          conn = objeto de conexión del socket cliente
+#          addr = dirección del cliente conectado
+#---------------------------------------------------------------------------
+
+def manejar_flujo(conn, addr):
+    try:
+        for data in recibir_tramas(conn):
+            encolar_mensaje(data, addr)
+            if not apagado.activo():
+                break
+            control.pausar()
+    except Exception as e:
+        print(f"Error manejando conexión de flujo: {e}")
+    finally:
+        conn.close()
+        conexiones.liberar()
+
+#FUNCIÓN EJECUTAR SERVIDOR DE FLUJO TCP-------------------------------------
+#     Esta función escucha conexiones TCP en el mismo puerto que el servidor
+#     UDP (o en el socket Unix de flujo del mismo puerto), para recibir los
+#     mensajes grandes que el Servicio 2 no fragmenta, hasta
+#     --max-conexiones a la vez.
+#
+#     PARÁMETROS:
+#          Ninguno (utiliza variables globales)
+#---------------------------------------------------------------------------
+
+def ejecutar_servidor_flujo():
+    with crear_socket_servidor(direccion_flujo, backlog=backlog) as server_sock:
+        while conexiones.ocupar() and apagado.esperar_legible(server_sock):
+            try:
+                conn, addr = server_sock.accept()
+                hilo_flujo = threading.Thread(target=manejar_flujo, args=(conn, addr))
+                hilo_flujo.daemon = True
+                hilo_flujo.start()
+            except Exception as e:
+                conexiones.liberar()
+                if apagado.activo():
+                    print(f"Error en servidor de flujo: {e}")
+                break
+
+#FUNCIÓN EJECUTAR RECEPTOR DE MEMORIA COMPARTIDA----------------------------
+#     Con --transporte compartida, esta función reemplaza a los servidores
+#     UDP y de flujo: lee del anillo en memoria compartida los datagramas
+#     que escribe el Servicio 2 y los separa y reensambla igual que los
+#     datagramas UDP. El anillo es confiable, así que no hay ACK que enviar.
+#
+#     PARÁMETROS:
+#          Ninguno (utiliza variables globales)
+#---------------------------------------------------------------------------
+
+def ejecutar_receptor_compartido():
+    print(f"Servicio 3 leyendo el anillo {receptor_compartido.nombre} (memoria compartida)")
+    try:
+        for data in receptor_compartido.recibir(apagado):
+            recibir_datagrama(data, receptor_compartido.nombre, responder_nulo)
+            control.pausar()
+    except Exception as e:
+        if apagado.activo():
+            print(f"Error en el receptor de memoria compartida: {e}")
+
+#FUNCIÓN CONFIGURAR SERVICIO------------------------------------------------
+#     Esta función interpreta las opciones de línea de comandos y prepara el
+#     estado del servicio: proveedor de palabras, WAL, direcciones según el
+#     transporte y enlace hacia el Servicio 4. La usan main() y el lanzador
+#     de un solo proceso, que entrega un enlace en memoria en lugar del
+#     cliente HTTP. Con --transporte compartida el receptor, y con
+#     --transporte-destino compartida el enlace, son anillos en memoria
+#     compartida. Con --procesos, el servicio se divide antes de crear el
+#     enlace, y cada proceso crea el suyo y su propio WAL; el kernel
+#     mantiene los datagramas de cada emisor en un mismo proceso, así que
+#     los ACK y el reensamblado de fragmentos no cambian.
+#
+#     PARÁMETROS:
+#          argv = lista de opciones, o None para usar las de la terminal
+#          enlace = objeto con enviar(mensaje), que retorna la respuesta
+#                   como el cliente HTTP, y cerrar(); o None para usar el
+#                   transporte elegido
+#
+#     RETORNA:
+#          las opciones interpretadas
+#---------------------------------------------------------------------------
+
+def configurar(argv=None, enlace=None):
+    global proveedor_palabras, wal, procesar_con_wal, clientes_servicio4, receptor_compartido, direccion_servidor, direccion_flujo, direccion_destino, grupo
+    global control, conexiones, backlog
+    parser = argparse.ArgumentParser(description="Servicio 3")
+    parser.add_argument('--async', dest='asincrono', action='store_true',
+                        help="ejecutar el servidor sobre asyncio en lugar de un hilo por mensaje")
+    parser.add_argument('--trabajadores', type=int, default=CANTIDAD_TRABAJADORES,
+                        help="cantidad de hilos trabajadores que procesan mensajes")
+    parser.add_argument('--cola', type=int, default=CAPACIDAD_COLA,
+                        help="cantidad máxima de mensajes en espera de un trabajador")
+    parser.add_argument('--palabras', default="interactivo",
+                        help="origen de las palabras: interactivo, archivo:RUTA, aleatorio[:SEMILLA] o tuberia[:RUTA]")
+    parser.add_argument('--wal', default=ARCHIVO_WAL,
+                        help="archivo del WAL con los mensajes aún no reenviados al Servicio 4")
+    parser.add_argument('--transporte', choices=TRANSPORTES, default=TRANSPORTE_INET,
+                        help="inet usa UDP/TCP/HTTP sobre localhost; unix usa sockets de dominio Unix de datagramas y de flujo; compartida usa anillos en memoria compartida, solo en el modo con hilos (todos los servicios deben usar el mismo)")
+    parser.add_argument('--directorio-sockets', default=DIRECTORIO_SOCKETS,
+                        help="directorio de los sockets Unix")
+    agregar_opciones_nodo(parser, PORT_SERVIDOR, PORT_DESTINO)
+    agregar_opcion_procesos(parser)
+    agregar_opciones_contrapresion(parser)
+    parser.add_argument('--diccionario', default=None,
+                        help="archivo de texto con cuyas palabras más recientes se entrena un diccionario de compresión (todos los servicios deben usar el mismo)")
+    args = parser.parse_args(argv)
+    if args.asincrono and args.transporte == TRANSPORTE_COMPARTIDA:
+        parser.error("--transporte compartida no se puede combinar con --async")
+    if args.conexiones_destino <= 0:
+        parser.error("la cantidad de conexiones hacia el destino debe ser mayor a 0")
+    validar_contrapresion(parser, args)
+    control = ControlCarga("Servicio 3", args.politica)
+    conexiones = Cupos(args.max_conexiones)
+    backlog = args.backlog
+    direccion_servidor = direccion_servicio(args.transporte, args.host, args.puerto, socket.SOCK_DGRAM, args.directorio_sockets)
+    direccion_flujo = direccion_servicio(args.transporte, args.host, args.puerto, directorio=args.directorio_sockets)
+    grupo = iniciar_procesos(parser, args, "Servicio 3", [(direccion_servidor, socket.SOCK_DGRAM), (direccion_flujo, socket.SOCK_STREAM)], apagado)
+    try:
+        proveedor_palabras = crear_proveedor(args.palabras)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.diccionario:
+        cargar_diccionario(args.diccionario)
+    wal = WALMensajes(args.wal if grupo is None else grupo.ruta(args.wal))
+    if grupo is not None:
+        grupo.reclamar(wal.recuperados)
+    procesar_con_wal = wal.proteger(procesar_mensaje_udp)
+    transporte_destino = args.transporte_destino or args.transporte
+    tabla_cadenas.nodos = args.nodos
+    direccion_destino = direccion_servicio(transporte_destino, args.host_destino, args.puerto_destino, directorio=args.directorio_sockets)
+    if args.transporte == TRANSPORTE_COMPARTIDA:
+        receptor_compartido = ReceptorCompartido(args.puerto, args.directorio_sockets, decodificar=False)
+    if enlace is None and transporte_destino == TRANSPORTE_COMPARTIDA:
+        enlace = EmisorHTTPCompartido(args.puerto_destino, args.directorio_sockets)
+    if enlace is not None:
+        clientes_servicio4 = EnlacesPorCadena([enlace])
+    else:
+        clientes_servicio4 = EnlacesPorCadena(ClienteHTTP(direccion_destino) for _ in range(args.conexiones_destino))
+    return args
+
+#FUNCIÓN INICIAR TRABAJADORES-----------------------------------------------
+#     Esta función crea el pool de trabajadores con cola acotada y le
+#     entrega los mensajes que quedaron sin reenviar en el WAL. Con
+#     --procesos, también recibe los mensajes que derivan los demás.
+#
+#     PARÁMETROS:
+#          args = opciones interpretadas por configurar()
+#---------------------------------------------------------------------------
+
+def iniciar_trabajadores(args):
+    global pool_trabajadores
+    pool_trabajadores = PoolTrabajadores(f"Servicio 3", args.trabajadores, args.cola, args.marca_alta, args.marca_baja)
+    control.pool = pool_trabajadores
+    for tarea in wal.reprocesar(procesar_con_wal, None):
+        pool_trabajadores.enviar(tarea)
+    if grupo is not None:
+        grupo.escuchar(encolar_mensaje)
+
+#FUNCIÓN FINALIZAR SERVICIO-------------------------------------------------
+#     Esta función activa el apagado, espera a que los trabajadores terminen
+#     las tareas encoladas, muestra sus métricas y cierra el enlace y el WAL.
+#---------------------------------------------------------------------------
+
+def finalizar():
+    print("Finalizando Servicio 3...")
+    apagado.activar()
+    conexiones.cerrar()
+    if pool_trabajadores is not None:
+        pool_trabajadores.detener()
+        print(f"Métricas del pool de trabajadores: {pool_trabajadores.resumen()}")
+        print(f"Métricas del control de carga: {control.resumen()}")
+    for cliente in clientes_servicio4:
+        cliente.cerrar()
+    wal.cerrar()
+    if grupo is not None:
+        grupo.cerrar()
+        print(f"Métricas del grupo de procesos: {grupo.resumen()}")
+    eliminar_socket(direccion_servidor)
+    eliminar_socket(direccion_flujo)
+    if receptor_compartido is not None:
+        receptor_compartido.cerrar()
+
 #FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
 
-def main():
-    global servidor_activo
+def main(argv=None):
     print("=== SERVICIO 3 - UDP SERVER / HTTP CLIENT ===")
+    args = configurar(argv)
     
-    # INICIAR SERVIDOR UDP EN HILO SEPARADO---------------------------------
-    servidor_thread = threading.Thread(target=ejecutar_servidor_udp)
-    servidor_thread.daemon = True
-    servidor_thread.start()
-    
-    # MANTENER EL SERVICIO ACTIVO-------------------------------------------
     try:
-        while servidor_activo:
-            time.sleep(1)
+        if args.asincrono:
+            # EJECUTAR EL SERVIDOR SOBRE ASYNCIO----------------------------
+            runtime = RuntimeAsync(apagado.activo, control, args.trabajadores, args.cola, args.marca_alta, args.marca_baja, wal)
+            runtime.ejecutar(
+                lambda: runtime.servir_varios(
+                    runtime.servir_udp(direccion_servidor, procesar_con_wal, aceptar_datagrama),
+                    runtime.servir_tcp(direccion_flujo, lambda data, numero=None: procesar_con_wal(data, None, numero=numero)),
+                ),
+                lambda: [tarea() for tarea in wal.reprocesar(procesar_con_wal, None)],
+            )
+        else:
+            # CREAR POOL DE TRABAJADORES Y REPROCESAR EL WAL----------------
+            iniciar_trabajadores(args)
+            
+            if receptor_compartido is not None:
+                # LEER EL ANILLO EN MEMORIA COMPARTIDA EN HILO SEPARADO-----
+                receptor_thread = threading.Thread(target=ejecutar_receptor_compartido)
+                receptor_thread.daemon = True
+                receptor_thread.start()
+            else:
+                # INICIAR SERVIDOR UDP EN HILO SEPARADO---------------------
+                servidor_thread = threading.Thread(target=ejecutar_servidor_udp)
+                servidor_thread.daemon = True
+                servidor_thread.start()
+                
+                # INICIAR SERVIDOR DE FLUJO TCP PARA MENSAJES GRANDES-------
+                flujo_thread = threading.Thread(target=ejecutar_servidor_flujo)
+                flujo_thread.daemon = True
+                flujo_thread.start()
+            
+            # ESPERAR LA SEÑAL DE APAGADO, SIN REVISAR PERIÓDICAMENTE------
+            apagado.esperar()
     except KeyboardInterrupt:
         print("\nInterrupción detectada. Finalizando...")
     finally:
-        print("Finalizando Servicio 3...")
-        servidor_activo = False
+        finalizar()
 
 #EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
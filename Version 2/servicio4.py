@@ -1,248 +1,541 @@
 #LIBRERÍAS NECESARIAS-------------------------------------------------------
 
+import argparse
+import io
 import socket
-import datetime
 import threading
 import time
-import re
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import BaseHTTPRequestHandler
+from conexiones import PoolConexiones
+from protocolo import empaquetar_trama
+from mensajes import interpretar_mensaje, extender_mensaje, serializar_mensaje, construir_aviso_completa, codec_de, decodificar_datos, mostrar_mensaje, mostrar_texto, formatear_timestamp, TIPO_FIN, TIPO_COMPLETA, TIPO_DELTA, TIPO_COMPLETO, CODEC_TEXTO, CODEC_BINARIO
+from cadenas import TablaCadenas
+from bitacora import BitacoraCadenas, ARCHIVO_BITACORA
+from runtime_async import RuntimeAsync
+from palabras import ProveedorInteractivo, crear_proveedor
+from apagado import SenalApagado
+from wal import WALMensajes
+from topologia import agregar_opciones_nodo
+from procesos import agregar_opcion_procesos, iniciar_procesos, EnlacesPorCadena
+from contrapresion import agregar_opciones_contrapresion, validar_contrapresion, ControlCarga, Cupos, MAX_CONEXIONES, RETRY_AFTER
+from compresion import cargar_diccionario, decodificar_contenido
+from transporte import direccion_servicio, crear_servidor_http, eliminar_socket, mostrar_direccion, TRANSPORTES, TRANSPORTE_INET, TRANSPORTE_COMPARTIDA, DIRECTORIO_SOCKETS, BACKLOG
+from memoria_compartida import EmisorCompartido, ReceptorCompartido
+from trabajadores import PoolTrabajadores, CANTIDAD_TRABAJADORES, CAPACIDAD_COLA
 
 #VARIABLES NECESARIAS-------------------------------------------------------
 
 HOST = 'localhost'
 PORT_SERVIDOR = 8004  
 PORT_DESTINO = 8001   
-servidor_activo = True
-ARCHIVO_SALIDA = "mensaje_final.txt"
+apagado = SenalApagado()
+proveedor_palabras = ProveedorInteractivo()
+pool_trabajadores = None
+servidor_http = None
+tabla_cadenas = TablaCadenas()
+bitacora = None
+direccion_servidor = (HOST, PORT_SERVIDOR)
+direccion_destino = (HOST, PORT_DESTINO)
+enlaces_servicio1 = None
+receptor_compartido = None
+grupo = None
+control = ControlCarga("Servicio 4")
+conexiones = Cupos(MAX_CONEXIONES)
+backlog = BACKLOG
+reenviar_fin = False
+ARCHIVO_WAL = "servicio4.wal"
+wal = None
+procesar_con_wal = None
 
 #FUNCIÓN ENVIAR MENSAJE AL SERVICIO 1 VÍA TCP-------------------------------
-#     Esta función se encarga de establecer una conexión TCP con el Servicio 1
-#     para enviar mensajes o señales de finalización. Utiliza el protocolo
-#     TCP que garantiza la entrega ordenada de los datos.
+#     Esta función envía mensajes o señales de finalización al Servicio 1
+#     por una conexión TCP persistente del pool. Cada mensaje va como una
+#     trama con largo, ya que la misma conexión transporta varios mensajes.
+#     TCP garantiza la entrega ordenada de los datos. Con
+#     --conexiones-destino, cada cadena sale siempre por la misma conexión.
 #
 #     PARÁMETROS:
 #          mensaje = cadena de texto que será enviada al Servicio 1 vía TCP
+#
+#     RETORNA:
+#          True si el mensaje se envió y False si hubo un error
 #---------------------------------------------------------------------------
 
 def enviar_a_servicio1_tcp(mensaje):
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.connect((HOST, PORT_DESTINO))
-            sock.send(mensaje.encode('utf-8'))
-            print(f"Mensaje enviado al Servicio 1: {mensaje}")
+        enlaces_servicio1.elegir(mensaje).enviar(empaquetar_trama(mensaje))
+        print(f"Mensaje enviado al Servicio 1: {mostrar_mensaje(mensaje)}")
+        return True
     except Exception as e:
         print(f"Error enviando mensaje al Servicio 1: {e}")
-
-#FUNCIÓN VERIFICAR MENSAJE DE FINALIZACIÓN----------------------------------
-#     Esta función utiliza expresiones regulares para verificar si un mensaje
-#     recibido corresponde a una señal de finalización del sistema. El patrón
-#     esperado es: YYYY-MM-DD HH:MM:SS-FIN
-#
-#     PARÁMETROS:
-#          mensaje = cadena de texto a verificar
-#     
-#     RETORNA:
-#          bool = True si es mensaje de finalización, False en caso contrario
-#---------------------------------------------------------------------------
-
-def es_mensaje_finalizacion(mensaje):
-    patron = r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}-FIN'
-    return bool(re.match(patron, mensaje))
+        return False
 
 #FUNCIÓN GUARDAR MENSAJE FINAL----------------------------------------------
-#     Esta función guarda el mensaje final en un archivo de texto cuando
-#     se alcanza el largo mínimo especificado. Incluye timestamp, mensaje
-#     completo y cantidad de palabras para referencia posterior.
+#     Esta función guarda el mensaje final cuando se alcanza el largo mínimo
+#     especificado. Incluye identificador de la cadena, timestamp, mensaje
+#     completo y cantidad de palabras. Cada cadena se agrega como un
+#     registro a la bitácora, que conserva todos los resultados y comparte
+#     un fsync entre las cadenas que se completan casi al mismo tiempo; la
+#     función retorna cuando el registro ya está en disco.
 #
 #     PARÁMETROS:
 #          mensaje = cadena con el mensaje final completo
+#          largo = cantidad de palabras del mensaje
 #          timestamp = marca de tiempo cuando se completó el mensaje
+#          id_cadena = identificador de la cadena completada
+#
+#     RETORNA:
+#          True si el registro quedó en disco y False si hubo un error; en
+#          ese caso no se avisa al Servicio 1 y el mensaje queda pendiente
+#          en el WAL
 #---------------------------------------------------------------------------
 
-def guardar_mensaje_final(mensaje, timestamp):
+def guardar_mensaje_final(mensaje, largo, timestamp, id_cadena):
     try:
-        with open(ARCHIVO_SALIDA, 'w', encoding='utf-8') as archivo:
-            archivo.write(f"Mensaje final completado\n")
-            archivo.write(f"Timestamp: {timestamp}\n")
-            archivo.write(f"Mensaje: {mensaje}\n")
-            archivo.write(f"Cantidad de palabras: {len(mensaje.split())}\n")
+        posicion = bitacora.agregar(id_cadena, timestamp, largo, mensaje)
         
-        print(f"Mensaje final guardado en {ARCHIVO_SALIDA}")
+        print(f"Mensaje final de la cadena {id_cadena} guardado en {bitacora.ruta} (posición {posicion})")
+        return True
         
     except Exception as e:
         print(f"Error guardando archivo: {e}")
+        return False
 
-#FUNCIÓN INICIAR FINALIZACIÓN-----------------------------------------------
-#     Esta función inicia la cadena de finalización cuando el mensaje
-#     alcanza el largo mínimo requerido. Construye la señal de finalización
-#     y la envía al Servicio 1 para cerrar el ciclo del sistema.
+#FUNCIÓN NOTIFICAR CADENA COMPLETA------------------------------------------
+#     Esta función avisa al Servicio 1 que una cadena alcanzó el largo
+#     mínimo requerido. El Servicio 1 lleva la cuenta de las cadenas en
+#     circulación e inicia la cadena de finalización cuando se completan
+#     todas, por lo que este servicio sigue activo para las demás.
 #
 #     PARÁMETROS:
-#          Ninguno (utiliza variables globales)
+#          id_cadena = identificador de la cadena completada
+#          codec = codec con que se envía el aviso (el del mensaje recibido)
+#
+#     RETORNA:
+#          True si el aviso se envió y False si hubo un error
 #---------------------------------------------------------------------------
 
-def iniciar_finalizacion():
-    global servidor_activo
-    print("Iniciando cadena de finalización...")
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    mensaje_fin = f"{timestamp}-FIN_CADENA"
-    
-    try:
-        enviar_a_servicio1_tcp(mensaje_fin)
-        print("Señal de finalización enviada al Servicio 1")
-    except Exception as e:
-        print(f"Error enviando señal de finalización: {e}")
-    
-    servidor_activo = False
+def notificar_cadena_completa(id_cadena, codec=CODEC_TEXTO):
+    aviso = construir_aviso_completa(id_cadena, codec)
+    if not enviar_a_servicio1_tcp(aviso):
+        return False
+    print(f"Aviso de cadena completa enviado al Servicio 1: {mostrar_mensaje(aviso)}")
+    return True
 
 #FUNCIÓN PROCESAR MENSAJE HTTP----------------------------------------------
 #     Esta función procesa los mensajes HTTP recibidos del Servicio 3.
 #     Verifica si el mensaje ha alcanzado el largo mínimo especificado,
-#     y en caso afirmativo, guarda el mensaje final e inicia la finalización.
-#     Si no ha alcanzado el largo mínimo, solicita una nueva palabra al usuario.
+#     y en caso afirmativo, guarda el mensaje final y avisa al Servicio 1.
+#     Si no ha alcanzado el largo mínimo, solicita una nueva palabra al proveedor.
 #
 #     PARÁMETROS:
 #          mensaje = cadena de texto recibida en el body de la petición HTTP
+#
+#     RETORNA:
+#          False si no se pudo reenviar el mensaje o guardar la cadena
+#          completada (queda pendiente en el WAL)
 #---------------------------------------------------------------------------
 
 def procesar_mensaje_http(mensaje):
-    global servidor_activo
     try:
-        print(f"Procesando mensaje: {mensaje}")
+        print(f"Procesando mensaje: {mostrar_mensaje(mensaje)}")
+        tipo, contenido = interpretar_mensaje(mensaje)
+        codec = codec_de(mensaje)
+        
+        # MEDIR LATENCIA DEL ÚLTIMO SALTO (EL CODEC BINARIO USA NANOSEGUNDOS)-
+        if codec == CODEC_BINARIO and tipo in (TIPO_DELTA, TIPO_COMPLETO):
+            print(f"Latencia desde el Servicio 3: {(time.time_ns() - contenido.timestamp) / 1e6:.3f} ms")
         
         # VERIFICAR SI ES SEÑAL DE FINALIZACIÓN------------------------------
-        if es_mensaje_finalizacion(mensaje):
+        if tipo == TIPO_FIN:
             print("Señal de finalización recibida del Servicio 3")
-            servidor_activo = False
-            return
+            tabla_cadenas.limpiar()
+            enviado = enviar_a_servicio1_tcp(mensaje) if reenviar_fin else True
+            apagado.activar()
+            return enviado
         
-        # PROCESAR MENSAJE NORMAL CON EXPRESIONES REGULARES------------------
-        patron = r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})-(\d+)-(\d+)-(.+)$'
-        match = re.match(patron, mensaje)
+        # REENVIAR EL AVISO DE UNA CADENA COMPLETADA EN UNA ETAPA ANTERIOR---
+        if tipo == TIPO_COMPLETA:
+            return enviar_a_servicio1_tcp(mensaje)
         
-        if match:
-            timestamp, largo_minimo_str, largo_actual_str, mensaje_actual = match.groups()
+        # PROCESAR MENSAJE EN MODO DELTA-------------------------------------
+        if tipo == TIPO_DELTA:
+            delta = contenido
+            estado = tabla_cadenas.aplicar_delta(delta)
+            if estado is None:
+                print(f"Mensaje duplicado de la cadena {delta.id_cadena}, se ignora")
+                return
             
-            # CONVERTIR STRINGS A ENTEROS------------------------------------
-            try:
-                largo_minimo = int(largo_minimo_str)
-                largo_actual = int(largo_actual_str)
-            except ValueError:
-                print("Error: Formato de números inválido en el mensaje")
+            print(f"Cadena {estado.id_cadena}: largo mínimo {estado.largo_minimo}, largo actual {estado.largo}")
+            
+            if estado.largo >= estado.largo_minimo:
+                print("¡El mensaje ha alcanzado el largo mínimo!")
+                if not guardar_mensaje_final(estado.texto(), estado.largo, delta.timestamp, estado.id_cadena):
+                    return False
+                tabla_cadenas.eliminar(estado.id_cadena)
+                return notificar_cadena_completa(estado.id_cadena, codec)
+            
+            print("El mensaje aún no alcanza el largo mínimo. Continuando...")
+            
+            nueva_palabra = proveedor_palabras.siguiente()
+            
+            tabla_cadenas.agregar_palabras(estado, nueva_palabra)
+            mensaje_delta = tabla_cadenas.construir_delta(estado, codec)
+            print(f"Mensaje delta: {mostrar_mensaje(mensaje_delta)}")
+            
+            return enviar_a_servicio1_tcp(mensaje_delta)
+        
+        # PROCESAR MENSAJE EN MODO COMPLETO----------------------------------
+        if tipo == TIPO_COMPLETO:
+            recibido = contenido
+            timestamp, id_cadena, largo_minimo, largo_actual, mensaje_actual = recibido
+            
+            if not tabla_cadenas.registrar_salto(id_cadena, largo_minimo, largo_actual):
+                print(f"Mensaje duplicado de la cadena {id_cadena}, se ignora")
                 return
             
-            print(f"Timestamp: {timestamp}")
+            print(f"Cadena: {id_cadena}, Timestamp: {formatear_timestamp(timestamp)}")
             print(f"Largo mínimo: {largo_minimo}, Largo actual: {largo_actual}")
-            print(f"Mensaje actual: {mensaje_actual}")
+            print(f"Mensaje actual: {mostrar_texto(mensaje_actual)}")
             
             # VERIFICAR SI SE ALCANZÓ EL LARGO MÍNIMO------------------------
             if largo_actual >= largo_minimo:
                 print("¡El mensaje ha alcanzado el largo mínimo!")
-                guardar_mensaje_final(mensaje_actual, timestamp)
-                iniciar_finalizacion()
+                # RECIÉN AQUÍ SE NECESITA EL TEXTO (SE DESCOMPRIME)----------
+                if not guardar_mensaje_final(str(mensaje_actual), largo_actual, timestamp, id_cadena):
+                    return False
+                tabla_cadenas.eliminar(id_cadena)
+                return notificar_cadena_completa(id_cadena, codec)
             else:
                 print("El mensaje aún no alcanza el largo mínimo. Continuando...")
                 
-                nueva_palabra = input("Ingrese una nueva palabra: ").strip()
-                while not nueva_palabra:
-                    nueva_palabra = input("La palabra no puede estar vacía. Ingrese una nueva palabra: ").strip()
-                
-                # CONSTRUIR MENSAJE ACTUALIZADO------------------------------
-                mensaje_actualizado = f"{mensaje_actual} {nueva_palabra}"
-                nuevo_largo = len(mensaje_actualizado.split())
-                nuevo_timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                nueva_palabra = proveedor_palabras.siguiente()
                 
-                mensaje_completo = f"{nuevo_timestamp}-{largo_minimo}-{nuevo_largo}-{mensaje_actualizado}"
+                # CONSTRUIR MENSAJE ACTUALIZADO (SIN RECONTAR EL TEXTO)------
+                mensaje_completo = serializar_mensaje(extender_mensaje(recibido, nueva_palabra), codec)
                 
-                print(f"Mensaje actualizado: {mensaje_completo}")
+                print(f"Mensaje actualizado: {mostrar_mensaje(mensaje_completo)}")
                 
                 # ENVIAR MENSAJE ACTUALIZADO AL SERVICIO 1-------------------
-                enviar_a_servicio1_tcp(mensaje_completo)
+                return enviar_a_servicio1_tcp(mensaje_completo)
         else:
             print("Error: Formato de mensaje inválido. No coincide con el patrón esperado.")
                 
     except Exception as e:
         print(f"Error procesando mensaje HTTP: {e}")
 
+#FUNCIÓN ENCOLAR MENSAJE---------------------------------------------------
+#     Esta función registra un mensaje en el WAL y lo encola en el pool de
+#     trabajadores. La usa el lanzador de un solo proceso; el servidor HTTP
+#     registra el mensaje antes de responder y lo encola después. Con
+#     --politica descartar, los mensajes que llegan con la cola saturada se
+#     pierden.
+#
+#     PARÁMETROS:
+#          mensaje = mensaje recibido del Servicio 3
+#---------------------------------------------------------------------------
+
+def encolar_mensaje(mensaje):
+    if grupo is not None and grupo.derivar(mensaje):
+        return
+    if not control.admitir(mensaje):
+        return
+    pool_trabajadores.enviar(wal.tarea(procesar_con_wal, mensaje))
+
 #CLASE MANEJADOR DE PETICIONES HTTP-----------------------------------------
 #     Esta clase hereda de BaseHTTPRequestHandler y define cómo manejar
-#     las peticiones HTTP POST que llegan al servidor. Extrae el cuerpo
-#     del mensaje, envía una respuesta HTTP apropiada y procesa el mensaje.
+#     las peticiones HTTP POST que llegan al servidor. Usa HTTP/1.1, por lo
+#     que el Servicio 3 puede enviar varias peticiones por la misma conexión.
+#     Extrae el cuerpo del mensaje, lo registra en el WAL, responde 200 de
+#     inmediato y deja el procesamiento en la cola del pool de trabajadores,
+#     así la atención de peticiones nunca espera por el trabajo hacia el
+#     Servicio 1 y un mensaje aceptado no se pierde si el servicio cae.
+#     Con --procesos, el mensaje de una cadena de otro proceso se deriva a
+#     este, que lo registra en su propio WAL.
+#
+#     Con la cola saturada se aplica la política de carga antes de
+#     registrar el mensaje: con esperar la respuesta se retiene hasta que
+#     la cola baje, y el Servicio 3 no recibe más que las peticiones que ya
+#     envió; con rechazar se responde 503 con Retry-After sin registrarlo,
+#     y el Servicio 3 lo reintenta; con descartar se responde 200 y el
+#     mensaje se pierde.
 #---------------------------------------------------------------------------
 
 class HTTPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # RESPUESTA EN UN SOLO SEGMENTO: SIN BUFFER, LOS HEADERS Y EL CUERPO-----
+    # SALEN POR SEPARADO Y NAGLE RETIENE EL CUERPO HASTA EL ACK RETARDADO
+    # DEL CLIENTE (~40 ms POR PETICIÓN); handle_one_request() VACÍA EL BUFFER
+    wbufsize = io.DEFAULT_BUFFER_SIZE
+    
     def do_POST(self):
         try:
             # EXTRAER CUERPO DE LA PETICIÓN HTTP-----------------------------
             content_length = int(self.headers.get('Content-Length', 0))
-            body = self.rfile.read(content_length).decode('utf-8')
+            body = self.rfile.read(content_length)
             
-            print(f"Mensaje HTTP recibido: {body}")
+            # LOS MENSAJES COMPRIMIDOS SE RECIBEN SIN DESCOMPRIMIR-----------
+            try:
+                body = decodificar_datos(decodificar_contenido(body, self.headers.get('Content-Encoding')))
+            except ValueError as e:
+                print(f"Error en do_POST: {e}")
+                self.send_response(415)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            
+            print(f"Mensaje HTTP recibido: {mostrar_mensaje(body)}")
+            if grupo is not None and grupo.derivar(body):
+                tarea = None
+            elif control.rechazar(body):
+                # SERVICIO SATURADO: EL SERVICIO 3 REINTENTA MÁS TARDE--------
+                self.send_response(503)
+                self.send_header('Retry-After', str(RETRY_AFTER))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            elif not control.admitir(body):
+                tarea = None
+            else:
+                control.pausar(rechaza=True)
+                tarea = wal.tarea(procesar_con_wal, body)
             
             # ENVIAR RESPUESTA HTTP 200 OK-----------------------------------
+            respuesta = b'Mensaje recibido correctamente'
             self.send_response(200)
             self.send_header('Content-type', 'text/plain')
+            self.send_header('Content-Length', str(len(respuesta)))
             self.end_headers()
-            self.wfile.write(b'Mensaje recibido correctamente')
+            self.wfile.write(respuesta)
+            self.wfile.flush()
             
-            # PROCESAR EL MENSAJE RECIBIDO-----------------------------------
-            procesar_mensaje_http(body)
+            # ENCOLAR EL MENSAJE PARA SU PROCESAMIENTO-----------------------
+            if tarea is not None:
+                pool_trabajadores.enviar(tarea)
             
         except Exception as e:
             print(f"Error en do_POST: {e}")
             self.send_response(500)
+            self.send_header('Content-Length', '0')
             self.end_headers()
+    
+    # LOS CLIENTES DE UN SOCKET UNIX NO TIENEN DIRECCIÓN (host, puerto)------
+    def address_string(self):
+        if isinstance(self.client_address, str):
+            return mostrar_direccion(self.server.server_address)
+        return super().address_string()
 
 #FUNCIÓN EJECUTAR SERVIDOR HTTP---------------------------------------------
 #     Esta función ejecuta el servidor HTTP que recibe peticiones POST
-#     del Servicio 3. Utiliza la clase HTTPServer de Python y mantiene
-#     un timeout para verificar periódicamente el estado del servidor.
+#     del Servicio 3. Utiliza ThreadingHTTPServer (o su equivalente sobre un
+#     socket Unix), que atiende cada conexión en su propio hilo, de modo
+#     que una conexión persistente no bloquea a las demás, hasta
+#     --max-conexiones a la vez (las demás esperan en el backlog). En lugar
+#     de serve_forever(), que revisa cada medio segundo
+#     si debe detenerse, cada conexión se espera junto con la señal de
+#     apagado y se atiende con handle_request().
 #
 #     PARÁMETROS:
 #          Ninguno (utiliza variables globales)
 #---------------------------------------------------------------------------
 
 def ejecutar_servidor_http():
-    global servidor_activo
+    global servidor_http
     try:
-        server = HTTPServer((HOST, PORT_SERVIDOR), HTTPHandler)
-        server.timeout = 1.0  # Timeout para permitir verificar servidor_activo
+        servidor_http = crear_servidor_http(direccion_servidor, HTTPHandler, conexiones, backlog)
         
-        print(f"Servicio 4 escuchando en {HOST}:{PORT_SERVIDOR} (HTTP)")
+        print(f"Servicio 4 escuchando en {mostrar_direccion(direccion_servidor)} (HTTP)")
         
-        while servidor_activo:
-            try:
-                server.handle_request()
-            except Exception as e:
-                if servidor_activo:
-                    print(f"Error en servidor HTTP: {e}")
-                break
+        while apagado.esperar_legible(servidor_http):
+            servidor_http.handle_request()
                 
     except Exception as e:
-        print(f"Error iniciando servidor HTTP: {e}")
+        if apagado.activo():
+            print(f"Error en servidor HTTP: {e}")
+
+#FUNCIÓN EJECUTAR RECEPTOR DE MEMORIA COMPARTIDA----------------------------
+#     Con --transporte compartida, esta función reemplaza al servidor HTTP:
+#     lee del anillo en memoria compartida los mensajes que escribe el
+#     Servicio 3, ya aceptados, y los encola igual que un POST.
+#
+#     PARÁMETROS:
+#          Ninguno (utiliza variables globales)
+#---------------------------------------------------------------------------
+
+def ejecutar_receptor_compartido():
+    print(f"Servicio 4 leyendo el anillo {receptor_compartido.nombre} (memoria compartida)")
+    try:
+        for mensaje in receptor_compartido.recibir(apagado):
+            print(f"Mensaje recibido del anillo: {mostrar_mensaje(mensaje)}")
+            encolar_mensaje(mensaje)
+            control.pausar()
+    except Exception as e:
+        if apagado.activo():
+            print(f"Error en el receptor de memoria compartida: {e}")
+
+#FUNCIÓN CONFIGURAR SERVICIO------------------------------------------------
+#     Esta función interpreta las opciones de línea de comandos y prepara el
+#     estado del servicio: proveedor de palabras, bitácora, WAL, direcciones
+#     según el transporte y enlace hacia el Servicio 1. La usan main() y el
+#     lanzador de un solo proceso, que entrega un enlace en memoria en
+#     lugar del pool de conexiones TCP. Con --transporte compartida el
+#     receptor, y con --transporte-destino compartida el enlace, son
+#     anillos en memoria compartida. Con --reenviar-fin, el servicio ocupa
+#     una etapa intermedia y pasa la finalización al servicio siguiente.
+#     Con --procesos, el servicio se divide antes de crear el enlace, y
+#     cada proceso crea el suyo, su WAL y su bitácora.
+#
+#     PARÁMETROS:
+#          argv = lista de opciones, o None para usar las de la terminal
+#          enlace = objeto con enviar(trama) y cerrar() hacia el Servicio 1,
+#                   o None para usar el transporte elegido
+#
+#     RETORNA:
+#          las opciones interpretadas
+#---------------------------------------------------------------------------
+
+def configurar(argv=None, enlace=None):
+    global proveedor_palabras, bitacora, wal, procesar_con_wal, enlaces_servicio1, receptor_compartido, direccion_servidor, direccion_destino, reenviar_fin, grupo
+    global control, conexiones, backlog
+    parser = argparse.ArgumentParser(description="Servicio 4")
+    parser.add_argument('--async', dest='asincrono', action='store_true',
+                        help="ejecutar el servidor sobre asyncio en lugar de un hilo por mensaje")
+    parser.add_argument('--palabras', default="interactivo",
+                        help="origen de las palabras: interactivo, archivo:RUTA, aleatorio[:SEMILLA] o tuberia[:RUTA]")
+    parser.add_argument('--trabajadores', type=int, default=CANTIDAD_TRABAJADORES,
+                        help="cantidad de hilos trabajadores que procesan mensajes")
+    parser.add_argument('--cola', type=int, default=CAPACIDAD_COLA,
+                        help="cantidad máxima de mensajes en espera de un trabajador")
+    parser.add_argument('--bitacora', default=ARCHIVO_BITACORA,
+                        help="archivo de solo agregado donde se guardan las cadenas completadas")
+    parser.add_argument('--wal', default=ARCHIVO_WAL,
+                        help="archivo del WAL con los mensajes aún no reenviados al Servicio 1")
+    parser.add_argument('--transporte', choices=TRANSPORTES, default=TRANSPORTE_INET,
+                        help="inet usa HTTP/TCP sobre localhost; unix usa sockets de dominio Unix; compartida usa anillos en memoria compartida, solo en el modo con hilos (todos los servicios deben usar el mismo)")
+    parser.add_argument('--directorio-sockets', default=DIRECTORIO_SOCKETS,
+                        help="directorio de los sockets Unix")
+    agregar_opciones_nodo(parser, PORT_SERVIDOR, PORT_DESTINO)
+    agregar_opcion_procesos(parser)
+    agregar_opciones_contrapresion(parser)
+    parser.add_argument('--reenviar-fin', action='store_true',
+                        help="reenviar la señal de finalización al servicio siguiente (cuando este no es el Servicio 1)")
+    parser.add_argument('--diccionario', default=None,
+                        help="archivo de texto con cuyas palabras más recientes se entrena un diccionario de compresión (todos los servicios deben usar el mismo)")
+    args = parser.parse_args(argv)
+    if args.asincrono and args.transporte == TRANSPORTE_COMPARTIDA:
+        parser.error("--transporte compartida no se puede combinar con --async")
+    if args.conexiones_destino <= 0:
+        parser.error("la cantidad de conexiones hacia el destino debe ser mayor a 0")
+    validar_contrapresion(parser, args)
+    control = ControlCarga("Servicio 4", args.politica)
+    conexiones = Cupos(args.max_conexiones)
+    backlog = args.backlog
+    direccion_servidor = direccion_servicio(args.transporte, args.host, args.puerto, directorio=args.directorio_sockets)
+    grupo = iniciar_procesos(parser, args, "Servicio 4", [(direccion_servidor, socket.SOCK_STREAM)], apagado)
+    try:
+        proveedor_palabras = crear_proveedor(args.palabras)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.diccionario:
+        cargar_diccionario(args.diccionario)
+    bitacora = BitacoraCadenas(args.bitacora if grupo is None else grupo.ruta(args.bitacora))
+    wal = WALMensajes(args.wal if grupo is None else grupo.ruta(args.wal))
+    if grupo is not None:
+        grupo.reclamar(wal.recuperados)
+    procesar_con_wal = wal.proteger(procesar_mensaje_http)
+    reenviar_fin = args.reenviar_fin
+    transporte_destino = args.transporte_destino or args.transporte
+    tabla_cadenas.nodos = args.nodos
+    direccion_destino = direccion_servicio(transporte_destino, args.host_destino, args.puerto_destino, directorio=args.directorio_sockets)
+    if args.transporte == TRANSPORTE_COMPARTIDA:
+        receptor_compartido = ReceptorCompartido(args.puerto, args.directorio_sockets)
+    if enlace is None and transporte_destino == TRANSPORTE_COMPARTIDA:
+        enlace = EmisorCompartido(args.puerto_destino, args.directorio_sockets)
+    if enlace is not None:
+        enlaces_servicio1 = EnlacesPorCadena([enlace])
+    else:
+        exclusiva = args.conexiones_destino > 1
+        enlaces_servicio1 = EnlacesPorCadena(PoolConexiones(direccion_destino, exclusiva=exclusiva) for _ in range(args.conexiones_destino))
+    return args
+
+#FUNCIÓN INICIAR TRABAJADORES-----------------------------------------------
+#     Esta función crea el pool de trabajadores con cola acotada y le
+#     entrega los mensajes que quedaron sin reenviar en el WAL. Con
+#     --procesos, también recibe los mensajes que derivan los demás.
+#
+#     PARÁMETROS:
+#          args = opciones interpretadas por configurar()
+#---------------------------------------------------------------------------
+
+def iniciar_trabajadores(args):
+    global pool_trabajadores
+    pool_trabajadores = PoolTrabajadores("Servicio 4", args.trabajadores, args.cola, args.marca_alta, args.marca_baja)
+    control.pool = pool_trabajadores
+    for tarea in wal.reprocesar(procesar_con_wal):
+        pool_trabajadores.enviar(tarea)
+    if grupo is not None:
+        grupo.escuchar(encolar_mensaje)
+
+#FUNCIÓN FINALIZAR SERVICIO-------------------------------------------------
+#     Esta función activa el apagado, cierra el servidor HTTP, espera a que
+#     los trabajadores terminen las tareas encoladas y cierra el enlace, la
+#     bitácora y el WAL, mostrando sus métricas.
+#---------------------------------------------------------------------------
+
+def finalizar():
+    print("Finalizando Servicio 4...")
+    apagado.activar()
+    conexiones.cerrar()
+    if servidor_http is not None:
+        servidor_http.server_close()
+    if pool_trabajadores is not None:
+        pool_trabajadores.detener()
+        print(f"Métricas del pool de trabajadores: {pool_trabajadores.resumen()}")
+        print(f"Métricas del control de carga: {control.resumen()}")
+    for pool in enlaces_servicio1:
+        pool.cerrar()
+    bitacora.cerrar()
+    wal.cerrar()
+    if grupo is not None:
+        grupo.cerrar()
+        print(f"Métricas del grupo de procesos: {grupo.resumen()}")
+    eliminar_socket(direccion_servidor)
+    if receptor_compartido is not None:
+        receptor_compartido.cerrar()
+    metricas = bitacora.metricas()
+    print(f"Métricas de la bitácora: {metricas['registros']} registros, {metricas['fsyncs']} fsync")
 
 #FUNCIÓN PRINCIPAL DEL PROGRAMA---------------------------------------------
 
-def main():
-    global servidor_activo
+def main(argv=None):
     print("=== SERVICIO 4 - HTTP SERVER / TCP CLIENT ===")
+    args = configurar(argv)
     
-    # INICIAR SERVIDOR HTTP EN HILO SEPARADO--------------------------------
-    servidor_thread = threading.Thread(target=ejecutar_servidor_http)
-    servidor_thread.daemon = True
-    servidor_thread.start()
-    
-    # MANTENER EL SERVICIO ACTIVO-------------------------------------------
     try:
-        while servidor_activo:
-            time.sleep(1)
+        if args.asincrono:
+            # EJECUTAR EL SERVIDOR SOBRE ASYNCIO----------------------------
+            runtime = RuntimeAsync(apagado.activo, control, args.trabajadores, args.cola, args.marca_alta, args.marca_baja, wal)
+            runtime.ejecutar(
+                lambda: runtime.servir_http(direccion_servidor, procesar_con_wal),
+                lambda: [tarea() for tarea in wal.reprocesar(procesar_con_wal)],
+            )
+        else:
+            # CREAR POOL DE TRABAJADORES Y REPROCESAR EL WAL----------------
+            iniciar_trabajadores(args)
+            
+            # INICIAR SERVIDOR HTTP EN HILO SEPARADO------------------------
+            servidor_thread = threading.Thread(target=ejecutar_servidor_http if receptor_compartido is None else ejecutar_receptor_compartido)
+            servidor_thread.daemon = True
+            servidor_thread.start()
+            
+            # ESPERAR LA SEÑAL DE APAGADO, SIN REVISAR PERIÓDICAMENTE------
+            apagado.esperar()
     except KeyboardInterrupt:
         print("\nInterrupción detectada. Finalizando...")
     finally:
-        print("Finalizando Servicio 4...")
-        servidor_activo = False
+        finalizar()
 
 #EJECUCIÓN DEL PROGRAMA PRINCIPAL-------------------------------------------
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,215 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import json
+import os
+from collections import namedtuple
+from transporte import TRANSPORTES, TRANSPORTE_INET
+from cadenas import NODOS_ANILLO
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+HOST = 'localhost'
+PUERTO_BASE = 9000
+PUERTOS_POR_ANILLO = 100
+ROL_ORIGEN = "servicio1"
+ETAPA = ("servicio2", "servicio3", "servicio4")
+
+# PROTOCOLO CON QUE CADA ROL RECIBE Y CON QUE ENVÍA AL SIGUIENTE NODO-------
+ROLES = {
+    "servicio1": ("tcp", "tcp"),
+    "servicio2": ("tcp", "udp"),
+    "servicio3": ("udp", "http"),
+    "servicio4": ("http", "tcp"),
+}
+
+Nodo = namedtuple('Nodo', ['nombre', 'rol', 'host', 'puerto', 'transporte', 'opciones'])
+Anillo = namedtuple('Anillo', ['nombre', 'nodos'])
+
+#FUNCIÓN GENERAR TOPOLOGÍA--------------------------------------------------
+#     Esta función describe K anillos independientes con la misma forma: el
+#     Servicio 1 seguido de una o más etapas Servicio 2 -> Servicio 3 ->
+#     Servicio 4. Cada anillo usa su propio rango de puertos, así que
+#     pueden correr en paralelo en la misma máquina.
+#
+#     PARÁMETROS:
+#          anillos = cantidad de anillos
+#          etapas = cantidad de etapas Servicio 2 -> 3 -> 4 de cada anillo
+#          puerto_base = puerto del primer nodo del primer anillo
+#          transporte = transporte de todos los saltos
+#          host = dirección de todos los nodos
+#
+#     RETORNA:
+#          lista de Anillo
+#---------------------------------------------------------------------------
+
+def generar_topologia(anillos=1, etapas=1, puerto_base=PUERTO_BASE, transporte=TRANSPORTE_INET, host=HOST):
+    topologia = []
+    for numero in range(anillos):
+        roles = (ROL_ORIGEN,) + ETAPA * etapas
+        nodos = [
+            Nodo(f"anillo{numero}-{indice}", rol, host, puerto_base + numero * PUERTOS_POR_ANILLO + indice, transporte, [])
+            for indice, rol in enumerate(roles)
+        ]
+        topologia.append(Anillo(f"anillo{numero}", nodos))
+    validar_topologia(topologia)
+    return topologia
+
+#FUNCIÓN CARGAR TOPOLOGÍA---------------------------------------------------
+#     Esta función lee una topología de un archivo JSON con la forma
+#          {"anillos": [{"nombre": "...", "nodos": [
+#               {"rol": "servicio1", "puerto": 9001, "host": "localhost",
+#                "transporte": "inet", "nombre": "...", "opciones": [...]},
+#               ...]}]}
+#     donde los nodos están en el orden en que los recorre la cadena y el
+#     transporte de cada nodo es el del salto hacia el nodo siguiente. Solo
+#     "rol" y "puerto" son obligatorios; "opciones" se agrega a la línea de
+#     comandos del nodo.
+#
+#     PARÁMETROS:
+#          ruta = ruta del archivo JSON
+#
+#     RETORNA:
+#          lista de Anillo
+#---------------------------------------------------------------------------
+
+def cargar_topologia(ruta):
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        descripcion = json.load(archivo)
+    topologia = []
+    for numero, anillo in enumerate(descripcion.get("anillos", [])):
+        nombre_anillo = anillo.get("nombre", f"anillo{numero}")
+        nodos = [
+            Nodo(
+                nodo.get("nombre", f"{nombre_anillo}-{indice}"),
+                nodo["rol"],
+                nodo.get("host", HOST),
+                int(nodo["puerto"]),
+                nodo.get("transporte", TRANSPORTE_INET),
+                list(nodo.get("opciones", [])),
+            )
+            for indice, nodo in enumerate(anillo["nodos"])
+        ]
+        topologia.append(Anillo(nombre_anillo, nodos))
+    validar_topologia(topologia)
+    return topologia
+
+# LA MISMA FORMA QUE LEE cargar_topologia()--------------------------------
+def describir_topologia(topologia):
+    return {"anillos": [
+        {"nombre": anillo.nombre, "nodos": [nodo._asdict() for nodo in anillo.nodos]}
+        for anillo in topologia
+    ]}
+
+def guardar_topologia(topologia, ruta):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(describir_topologia(topologia), archivo, indent=2, ensure_ascii=False)
+
+#FUNCIÓN VALIDAR TOPOLOGÍA--------------------------------------------------
+#     Esta función comprueba que cada anillo se pueda ejecutar: un solo
+#     Servicio 1, que inicia y completa las cadenas; cada salto con el
+#     mismo protocolo en ambos extremos (por ejemplo, después de un
+#     Servicio 2, que envía por UDP, solo puede venir un Servicio 3);
+#     saltos unix o compartida solo entre nodos del mismo host; y nombres
+#     y puertos sin repetir. Lanza ValueError con el primer problema.
+#
+#     PARÁMETROS:
+#          topologia = lista de Anillo
+#---------------------------------------------------------------------------
+
+def validar_topologia(topologia):
+    if not topologia:
+        raise ValueError("La topología no tiene anillos")
+    nombres, puertos = set(), set()
+    for anillo in topologia:
+        origenes = [nodo for nodo in anillo.nodos if nodo.rol == ROL_ORIGEN]
+        if len(origenes) != 1:
+            raise ValueError(f"El anillo {anillo.nombre} debe tener exactamente un {ROL_ORIGEN}")
+        for indice, nodo in enumerate(anillo.nodos):
+            siguiente = anillo.nodos[(indice + 1) % len(anillo.nodos)]
+            if nodo.rol not in ROLES:
+                raise ValueError(f"Rol desconocido en {nodo.nombre}: {nodo.rol}")
+            if nodo.transporte not in TRANSPORTES:
+                raise ValueError(f"Transporte desconocido en {nodo.nombre}: {nodo.transporte}")
+            if siguiente.rol in ROLES and ROLES[nodo.rol][1] != ROLES[siguiente.rol][0]:
+                raise ValueError(
+                    f"{nodo.nombre} ({nodo.rol}) envía por {ROLES[nodo.rol][1]}, "
+                    f"pero {siguiente.nombre} ({siguiente.rol}) recibe por {ROLES[siguiente.rol][0]}"
+                )
+            if nodo.transporte != TRANSPORTE_INET and nodo.host != siguiente.host:
+                raise ValueError(f"El salto {nodo.nombre} -> {siguiente.nombre} usa {nodo.transporte} entre hosts distintos")
+            if nodo.nombre in nombres or (nodo.host, nodo.puerto) in puertos:
+                raise ValueError(f"Nombre o puerto repetido: {nodo.nombre} ({nodo.host}:{nodo.puerto})")
+            nombres.add(nodo.nombre)
+            puertos.add((nodo.host, nodo.puerto))
+
+#FUNCIÓN BUSCAR NODO--------------------------------------------------------
+
+def buscar_nodo(topologia, nombre):
+    for anillo in topologia:
+        for indice, nodo in enumerate(anillo.nodos):
+            if nodo.nombre == nombre:
+                return anillo, indice
+    raise ValueError(f"La topología no tiene un nodo llamado {nombre}")
+
+#FUNCIÓN OPCIONES DE NODO---------------------------------------------------
+#     Esta función arma la línea de comandos con que el módulo de un rol
+#     cumple el papel de un nodo: su dirección, la del nodo siguiente, el
+#     transporte del salto de entrada (el del nodo anterior) y el de
+#     salida, el largo del anillo y archivos propios para el WAL y la
+#     bitácora, de modo que varios nodos compartan un directorio. Un
+#     Servicio 4 que no precede al Servicio 1 reenvía la finalización.
+#
+#     PARÁMETROS:
+#          anillo = Anillo del nodo
+#          indice = posición del nodo en el anillo
+#          directorio = directorio de los WAL y bitácoras
+#
+#     RETORNA:
+#          lista de opciones para configurar() del rol
+#---------------------------------------------------------------------------
+
+def opciones_nodo(anillo, indice, directorio):
+    nodo = anillo.nodos[indice]
+    anterior = anillo.nodos[indice - 1]
+    siguiente = anillo.nodos[(indice + 1) % len(anillo.nodos)]
+    opciones = [
+        '--host', nodo.host, '--puerto', str(nodo.puerto),
+        '--host-destino', siguiente.host, '--puerto-destino', str(siguiente.puerto),
+        '--transporte', anterior.transporte, '--transporte-destino', nodo.transporte,
+        '--nodos', str(len(anillo.nodos)),
+        '--wal', os.path.join(directorio, f"{nodo.nombre}.wal"),
+    ]
+    if nodo.rol == ROL_ORIGEN:
+        opciones += ['--wal-cadenas', os.path.join(directorio, f"{nodo.nombre}-cadenas.wal")]
+    if nodo.rol == "servicio4":
+        opciones += ['--bitacora', os.path.join(directorio, f"{nodo.nombre}.log")]
+        if siguiente.rol != ROL_ORIGEN:
+            opciones.append('--reenviar-fin')
+    return opciones + nodo.opciones
+
+#FUNCIÓN AGREGAR OPCIONES DE NODO-------------------------------------------
+#     Agrega a la línea de comandos de un servicio las opciones con que
+#     ocupa un lugar en una topología. Sin ellas, el servicio usa sus
+#     puertos de siempre y el mismo transporte en la entrada y la salida.
+#
+#     PARÁMETROS:
+#          parser = argparse.ArgumentParser del servicio
+#          puerto = puerto en que escucha el servicio por defecto
+#          puerto_destino = puerto del servicio siguiente por defecto
+#---------------------------------------------------------------------------
+
+def agregar_opciones_nodo(parser, puerto, puerto_destino):
+    parser.add_argument('--host', default=HOST,
+                        help="dirección en que escucha este servicio")
+    parser.add_argument('--puerto', type=int, default=puerto,
+                        help="puerto en que escucha este servicio")
+    parser.add_argument('--host-destino', default=HOST,
+                        help="dirección del servicio siguiente del anillo")
+    parser.add_argument('--puerto-destino', type=int, default=puerto_destino,
+                        help="puerto del servicio siguiente del anillo")
+    parser.add_argument('--transporte-destino', choices=TRANSPORTES, default=None,
+                        help="transporte del salto hacia el servicio siguiente (por defecto, el de --transporte)")
+    parser.add_argument('--conexiones-destino', type=int, default=1,
+                        help="conexiones (o emisores UDP) independientes hacia el servicio siguiente; cada cadena sale siempre por la misma, y con un servicio siguiente de --procesos N, usar varias por proceso (el kernel asigna cada una a un proceso por hash) para repartir las cadenas entre ellos")
+    parser.add_argument('--nodos', type=int, default=NODOS_ANILLO,
+                        help="cantidad de nodos del anillo (la usan el modo delta y el --en-vuelo por defecto del Servicio 1)")
@@ -0,0 +1,152 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import queue
+import threading
+import time
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+CANTIDAD_TRABAJADORES = 4
+CAPACIDAD_COLA = 64
+PLAZO_DRENAJE = 5.0
+
+#FUNCIÓN MARCAS POR DEFECTO------------------------------------------------
+#     Completa las marcas de la cola que no se indicaron: la alta en 3/4 de
+#     la capacidad y la baja en 1/4, siempre por debajo de la alta.
+#
+#     RETORNA:
+#          tupla (marca alta, marca baja)
+#---------------------------------------------------------------------------
+
+def marcas_por_defecto(capacidad, marca_alta=None, marca_baja=None):
+    if marca_alta is None:
+        marca_alta = max(1, capacidad * 3 // 4)
+    if marca_baja is None:
+        marca_baja = min(capacidad // 4, marca_alta - 1)
+    return marca_alta, marca_baja
+
+#CLASE POOL DE TRABAJADORES-------------------------------------------------
+#     Esta clase reemplaza el hilo por mensaje por una cantidad fija de
+#     hilos trabajadores que toman tareas de una cola acotada. Si llegan
+#     más mensajes de los que se alcanzan a procesar, la cola se llena y
+#     quien encola espera, en lugar de crear hilos sin límite. Registra
+#     métricas de profundidad de la cola y tiempo de espera de las tareas.
+#
+#     La cola tiene además dos marcas: al llegar a la marca alta el pool
+#     queda saturado, y deja de estarlo recién cuando los trabajadores la
+#     bajan hasta la marca baja. La histéresis evita que los servicios
+#     (contrapresion.py) pausen y reanuden la lectura con cada mensaje.
+#
+#     PARÁMETROS:
+#          nombre = nombre usado para identificar los hilos y las métricas
+#          cantidad = número de hilos trabajadores
+#          capacidad = cantidad máxima de tareas en espera
+#          marca_alta = profundidad desde la que el pool está saturado
+#                       (por defecto, 3/4 de la capacidad)
+#          marca_baja = profundidad hasta la que debe bajar la cola para
+#                       dejar de estar saturado (por defecto, 1/4)
+#---------------------------------------------------------------------------
+
+class PoolTrabajadores:
+    def __init__(self, nombre, cantidad=CANTIDAD_TRABAJADORES, capacidad=CAPACIDAD_COLA, marca_alta=None, marca_baja=None):
+        self.nombre = nombre
+        self.marca_alta, self.marca_baja = marcas_por_defecto(capacidad, marca_alta, marca_baja)
+        self._cola = queue.Queue(maxsize=capacidad)
+        self._lock = threading.Lock()
+        self._cambio = threading.Condition(self._lock)
+        self._saturado = False
+        self._saturaciones = 0
+        self._detenido = False
+        self._procesadas = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+        self._profundidad_maxima = 0
+        self._hilos = []
+        for numero in range(cantidad):
+            hilo = threading.Thread(target=self._trabajar, name=f"{nombre}-{numero}")
+            hilo.daemon = True
+            hilo.start()
+            self._hilos.append(hilo)
+
+    # ENCOLAR UNA TAREA (ESPERA SI LA COLA ESTÁ LLENA)-----------------------
+    def enviar(self, funcion, *args):
+        self._cola.put((time.monotonic(), funcion, args))
+        # LA PROFUNDIDAD SE LEE CON EL LOCK: ASÍ UN TRABAJADOR NO PUEDE------
+        # VACIAR LA COLA ENTRE LA LECTURA Y LA MARCA DE SATURACIÓN
+        with self._lock:
+            profundidad = self._cola.qsize()
+            if profundidad > self._profundidad_maxima:
+                self._profundidad_maxima = profundidad
+            if profundidad >= self.marca_alta and not self._saturado:
+                self._saturado = True
+                self._saturaciones += 1
+
+    def _trabajar(self):
+        while True:
+            tarea = self._cola.get()
+            if tarea is None:
+                return
+            encolada, funcion, args = tarea
+            espera = time.monotonic() - encolada
+            with self._lock:
+                profundidad = self._cola.qsize()
+                self._procesadas += 1
+                self._espera_total += espera
+                self._espera_maxima = max(self._espera_maxima, espera)
+                if self._saturado and profundidad <= self.marca_baja:
+                    self._saturado = False
+                    self._cambio.notify_all()
+            try:
+                funcion(*args)
+            except Exception as e:
+                print(f"Error en trabajador {threading.current_thread().name}: {e}")
+
+    def saturado(self):
+        return self._saturado
+
+    # ESPERAR A QUE LA COLA BAJE HASTA LA MARCA BAJA (O A LA DETENCIÓN)-----
+    def esperar_espacio(self):
+        with self._cambio:
+            while self._saturado and not self._detenido:
+                self._cambio.wait()
+
+    def metricas(self):
+        with self._lock:
+            procesadas = self._procesadas
+            return {
+                'profundidad': self._cola.qsize(),
+                'profundidad_maxima': self._profundidad_maxima,
+                'saturaciones': self._saturaciones,
+                'procesadas': procesadas,
+                'espera_promedio_ms': 1000 * self._espera_total / procesadas if procesadas else 0.0,
+                'espera_maxima_ms': 1000 * self._espera_maxima,
+            }
+
+    def resumen(self):
+        datos = self.metricas()
+        return (
+            f"{self.nombre}: {datos['procesadas']} tareas, "
+            f"cola actual {datos['profundidad']} (máx. {datos['profundidad_maxima']}), "
+            f"espera promedio {datos['espera_promedio_ms']:.1f} ms (máx. {datos['espera_maxima_ms']:.1f} ms), "
+            f"saturada {datos['saturaciones']} veces (marcas {self.marca_alta}/{self.marca_baja})"
+        )
+
+    # DETENER DESPUÉS DE PROCESAR LO ENCOLADO (CON PLAZO)------------------
+    # Cada trabajador termina al tomar su marca de fin, que queda detrás de
+    # las tareas pendientes; las que no alcanzan a procesarse se informan.
+    def detener(self, plazo=PLAZO_DRENAJE):
+        with self._cambio:
+            self._detenido = True
+            self._cambio.notify_all()
+        limite = time.monotonic() + plazo
+        try:
+            for _ in self._hilos:
+                self._cola.put(None, timeout=max(0.0, limite - time.monotonic()))
+        except queue.Full:
+            pass
+        for hilo in self._hilos:
+            if hilo is not threading.current_thread():
+                hilo.join(max(0.0, limite - time.monotonic()))
+        pendientes = sum(1 for tarea in list(self._cola.queue) if tarea is not None)
+        if pendientes:
+            print(f"{self.nombre}: {pendientes} tareas sin procesar al vencer el plazo de detención")
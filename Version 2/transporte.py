@@ -0,0 +1,183 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import os
+import socket
+import socketserver
+import tempfile
+from http.server import ThreadingHTTPServer
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+TRANSPORTE_INET = "inet"
+TRANSPORTE_UNIX = "unix"
+TRANSPORTE_COMPARTIDA = "compartida"
+TRANSPORTES = (TRANSPORTE_INET, TRANSPORTE_UNIX, TRANSPORTE_COMPARTIDA)
+DIRECTORIO_SOCKETS = tempfile.gettempdir()
+PREFIJO_SOCKET = "laboratorio-redes"
+BACKLOG = 128  # conexiones completas que el kernel retiene sin aceptar
+
+# SOCKETS QUE UN GRUPO DE PROCESOS ENLAZA ANTES DE BIFURCARSE (procesos.py);
+# CADA HIJO RECIBE LOS SUYOS, INDEXADOS POR (DIRECCIÓN, TIPO)--------------
+sockets_heredados = {}
+
+#FUNCIÓN DIRECCIÓN DE SERVICIO----------------------------------------------
+#     Esta función traduce el puerto de un servicio a la dirección que usa
+#     el transporte elegido. Con "inet" es el par (host, puerto) de siempre;
+#     con "unix" es la ruta de un socket de dominio Unix derivada del
+#     puerto, de modo que los servicios que corren en la misma máquina se
+#     comunican sin pasar por la pila TCP/IP. Con "compartida" los saltos
+#     van por los anillos de memoria_compartida.py y la dirección INET no
+#     se usa. El flujo y los datagramas de
+#     un mismo puerto usan rutas distintas, como en INET usan protocolos
+#     distintos.
+#
+#     PARÁMETROS:
+#          transporte = "inet" o "unix"
+#          host = dirección del servicio (solo con "inet")
+#          port = puerto del servicio
+#          tipo = socket.SOCK_STREAM o socket.SOCK_DGRAM
+#          directorio = directorio de los sockets Unix
+#
+#     RETORNA:
+#          tupla (host, port) o ruta del socket
+#---------------------------------------------------------------------------
+
+def direccion_servicio(transporte, host, port, tipo=socket.SOCK_STREAM, directorio=DIRECTORIO_SOCKETS):
+    if transporte == TRANSPORTE_UNIX:
+        extension = "dgram" if tipo == socket.SOCK_DGRAM else "sock"
+        return os.path.join(directorio, f"{PREFIJO_SOCKET}-{port}.{extension}")
+    return (host, port)
+
+def familia(direccion):
+    return socket.AF_UNIX if isinstance(direccion, str) else socket.AF_INET
+
+def mostrar_direccion(direccion):
+    if isinstance(direccion, str):
+        return direccion
+    return f"{direccion[0]}:{direccion[1]}"
+
+# BORRAR EL ARCHIVO DE UN SOCKET UNIX (UNA EJECUCIÓN ANTERIOR LO DEJA)-----
+def eliminar_socket(direccion):
+    if isinstance(direccion, str):
+        try:
+            os.unlink(direccion)
+        except FileNotFoundError:
+            pass
+
+#FUNCIÓN CREAR SOCKET SERVIDOR----------------------------------------------
+#     Esta función crea el socket en que escucha un servicio, sea INET o
+#     Unix. Los servidores de flujo reutilizan la dirección (INET) o borran
+#     el archivo que haya quedado de una ejecución anterior (Unix). Con
+#     reusar_puerto, varios sockets INET se enlazan al mismo puerto
+#     (SO_REUSEPORT) y el kernel reparte entre ellos las conexiones y los
+#     datagramas. Si este proceso heredó un socket para la dirección, se
+#     retorna ese en lugar de crear otro.
+#
+#     PARÁMETROS:
+#          direccion = dirección retornada por direccion_servicio()
+#          tipo = socket.SOCK_STREAM o socket.SOCK_DGRAM
+#          backlog = conexiones en espera de accept() (solo flujo)
+#          reusar_puerto = si se activa SO_REUSEPORT (solo INET)
+#
+#     RETORNA:
+#          socket enlazado, y escuchando si es de flujo
+#---------------------------------------------------------------------------
+
+def crear_socket_servidor(direccion, tipo=socket.SOCK_STREAM, backlog=BACKLOG, reusar_puerto=False):
+    heredado = sockets_heredados.pop((direccion, tipo), None)
+    if heredado is not None:
+        return heredado
+    sock = socket.socket(familia(direccion), tipo)
+    try:
+        if isinstance(direccion, str):
+            eliminar_socket(direccion)
+        elif tipo == socket.SOCK_STREAM:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reusar_puerto:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(direccion)
+        if tipo == socket.SOCK_STREAM:
+            sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+#CLASE CONEXIONES LIMITADAS-------------------------------------------------
+#     Mezcla para los servidores HTTP con un hilo por conexión: antes de
+#     aceptar la siguiente, el servidor ocupa un cupo (contrapresion.py) y
+#     el hilo lo libera al cerrar la conexión. Sin cupos libres el servidor
+#     deja de aceptar y las conexiones esperan en el backlog del kernel.
+#---------------------------------------------------------------------------
+
+class ConexionesLimitadas:
+    cupos = None
+
+    def process_request(self, request, client_address):
+        if self.cupos is not None and not self.cupos.ocupar():
+            self.shutdown_request(request)
+            return
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            if self.cupos is not None:
+                self.cupos.liberar()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            if self.cupos is not None:
+                self.cupos.liberar()
+
+class ServidorHTTP(ConexionesLimitadas, ThreadingHTTPServer):
+    pass
+
+#CLASE SERVIDOR HTTP SOBRE SOCKET UNIX--------------------------------------
+#     Equivalente a ThreadingHTTPServer para un socket de dominio Unix: un
+#     hilo por conexión, con los mismos manejadores de peticiones.
+#---------------------------------------------------------------------------
+
+class ServidorHTTPUnix(ConexionesLimitadas, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        eliminar_socket(self.server_address)
+        super().server_bind()
+
+#FUNCIÓN CREAR SERVIDOR HTTP------------------------------------------------
+#     Crea el servidor HTTP de un hilo por conexión en la dirección dada,
+#     con la cola de conexiones del kernel y los cupos indicados. Un
+#     socket heredado de un grupo de procesos ya está enlazado y
+#     escuchando: solo se le asigna al servidor.
+#
+#     PARÁMETROS:
+#          direccion = (host, puerto) o ruta de un socket Unix
+#          manejador = clase de BaseHTTPRequestHandler
+#          cupos = Cupos que limitan las conexiones simultáneas, o None
+#          backlog = largo de la cola de conexiones sin aceptar
+#
+#     RETORNA:
+#          el servidor, listo para handle_request()
+#---------------------------------------------------------------------------
+
+def crear_servidor_http(direccion, manejador, cupos=None, backlog=BACKLOG):
+    clase = ServidorHTTPUnix if isinstance(direccion, str) else ServidorHTTP
+    servidor = clase(direccion, manejador, bind_and_activate=False)
+    servidor.cupos = cupos
+    servidor.request_queue_size = backlog
+    heredado = None if isinstance(direccion, str) else sockets_heredados.pop((direccion, socket.SOCK_STREAM), None)
+    if heredado is None:
+        try:
+            servidor.server_bind()
+            servidor.server_activate()
+        except OSError:
+            servidor.server_close()
+            raise
+        return servidor
+    servidor.socket.close()
+    servidor.socket = heredado
+    servidor.server_address = heredado.getsockname()
+    servidor.server_name, servidor.server_port = servidor.server_address[:2]
+    return servidor
@@ -0,0 +1,304 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from transporte import familia, eliminar_socket, PREFIJO_SOCKET
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+# CABECERA: MARCA, TIPO, SESIÓN DEL EMISOR, SECUENCIA Y BASE DE LA VENTANA-
+# 0xA2 nunca inicia un texto UTF-8 ni un mensaje binario (0xA1), así que el
+# receptor distingue los datagramas confiables de los simples.
+MARCA_CONFIABLE = 0xA2
+CABECERA_CONFIABLE = struct.Struct('!BBIII')
+TIPO_DATOS = 0
+TIPO_ACK = 1
+VENTANA = 32
+RTO_INICIAL = 0.2
+RTO_MINIMO = 0.01
+RTO_MAXIMO = 2.0
+PLAZO_SESION = 60.0  # segundos sin datagramas tras los que se olvida una sesión
+REINTENTOS_AVISO = 12  # reintentos tras los que se avisa (sin dejar de reenviar)
+
+#CLASE EMISOR UDP CONFIABLE-------------------------------------------------
+#     Esta clase agrega entrega confiable sobre UDP sin perder su baja
+#     latencia. Cada datagrama lleva un número de secuencia y queda
+#     pendiente hasta que llega su ACK; si el ACK no llega a tiempo se
+#     retransmite. El tiempo de retransmisión (RTO) se adapta al RTT medido
+#     como en TCP (RFC 6298, sin muestras de datagramas retransmitidos) y
+#     se duplica en cada reintento, hasta RTO_MAXIMO. Un datagrama nunca se
+#     abandona: se sigue reenviando (con un aviso tras REINTENTOS_AVISO)
+#     hasta que llegue su ACK o se cierre el emisor. Al llegar el ACK se
+#     llama la función al_confirmar del datagrama, con la que el servicio
+#     confirma sus mensajes en el WAL. Una ventana deslizante limita la
+#     distancia entre el datagrama más antiguo sin confirmar y el siguiente
+#     a enviar: si se llena, enviar() espera. Cada datagrama informa la base
+#     de la ventana, para que el receptor olvide lo que ya no se reenviará.
+#     Un solo socket y un solo hilo atienden los ACK y las retransmisiones;
+#     sin datagramas pendientes, el hilo duerme hasta el próximo envío.
+#     Con un socket de datagramas Unix, el emisor se enlaza a una ruta
+#     propia para que el receptor pueda devolverle los ACK.
+#
+#     PARÁMETROS:
+#          direccion = (host, port) del receptor, o ruta de su socket Unix
+#          ventana = cantidad máxima de datagramas sin confirmar
+#          perdida = probabilidad de descartar un envío (para simular pérdida)
+#---------------------------------------------------------------------------
+
+class EmisorUDPConfiable:
+    def __init__(self, direccion, ventana=VENTANA, perdida=0.0):
+        self.destino = direccion
+        self.perdida = perdida
+        self._sesion = int.from_bytes(os.urandom(4), 'big')
+        self._secuencia = 0
+        self._pendientes = {}
+        self._condicion = threading.Condition()
+        self._ventana = ventana
+        self._srtt = None
+        self._rttvar = None
+        self._rto = RTO_INICIAL
+        self._retransmisiones = 0
+        self._cerrado = False
+        self._sock = socket.socket(familia(direccion), socket.SOCK_DGRAM)
+        self._ruta_propia = None
+        if isinstance(direccion, str):
+            # UN SOCKET UNIX NO SE PUEDE CONECTAR A UNA RUTA QUE AÚN NO EXISTE
+            self._ruta_propia = os.path.join(os.path.dirname(direccion), f"{PREFIJO_SOCKET}-emisor-{os.getpid()}-{self._sesion:08x}.dgram")
+            self._sock.bind(self._ruta_propia)
+        else:
+            self._sock.connect(self.destino)
+        self._sock.setblocking(False)
+        self._aviso_lector, self._aviso_escritor = socket.socketpair()
+        self._hilo = threading.Thread(target=self._atender, name="udp-confiable")
+        self._hilo.daemon = True
+        self._hilo.start()
+
+    def _transmitir(self, datagrama):
+        if self.perdida and random.random() < self.perdida:
+            return
+        try:
+            if self._ruta_propia is None:
+                self._sock.send(datagrama)
+            else:
+                self._sock.sendto(datagrama, self.destino)
+        except OSError:
+            # EL RECEPTOR AÚN NO ESCUCHA; LA RETRANSMISIÓN LO RESUELVE
+            pass
+
+    # LOS PENDIENTES ESTÁN EN ORDEN DE SECUENCIA (DICT ORDENADO)-----------
+    def _base(self):
+        return next(iter(self._pendientes), self._secuencia)
+
+    # ENVIAR UN DATAGRAMA (ESPERA SI LA VENTANA ESTÁ LLENA)-----------------
+    # al_confirmar, si se indica, se llama desde el hilo de los ACK.
+    def enviar(self, datos, al_confirmar=None):
+        with self._condicion:
+            while self._secuencia - self._base() >= self._ventana and not self._cerrado:
+                self._condicion.wait()
+            if self._cerrado:
+                raise ConnectionError("Emisor UDP cerrado")
+            secuencia = self._secuencia
+            datagrama = CABECERA_CONFIABLE.pack(MARCA_CONFIABLE, TIPO_DATOS, self._sesion, secuencia, self._base()) + datos
+            self._secuencia += 1
+            ahora = time.monotonic()
+            despertar = not self._pendientes
+            self._pendientes[secuencia] = {
+                'datagrama': datagrama,
+                'enviado': ahora,
+                'vence': ahora + self._rto,
+                'intentos': 0,
+                'al_confirmar': al_confirmar,
+            }
+            self._condicion.notify_all()
+        self._transmitir(datagrama)
+        if despertar:
+            self._avisar()
+
+    # DESPERTAR AL HILO QUE ATIENDE LOS ACK---------------------------------
+    def _avisar(self):
+        try:
+            self._aviso_escritor.send(b"\0")
+        except OSError:
+            pass
+
+    # ACTUALIZAR EL RTO CON UNA MUESTRA DE RTT (RFC 6298)--------------------
+    def _medir_rtt(self, muestra):
+        if self._srtt is None:
+            self._srtt = muestra
+            self._rttvar = muestra / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - muestra)
+            self._srtt = 0.875 * self._srtt + 0.125 * muestra
+        self._rto = min(RTO_MAXIMO, max(RTO_MINIMO, self._srtt + 4 * self._rttvar))
+
+    def _confirmar(self, secuencia):
+        with self._condicion:
+            pendiente = self._pendientes.pop(secuencia, None)
+            if pendiente is None:
+                return
+            if pendiente['intentos'] == 0:
+                self._medir_rtt(time.monotonic() - pendiente['enviado'])
+            self._condicion.notify_all()
+            cerrado = self._cerrado
+        # TRAS CERRAR, LO PENDIENTE QUEDA EN EL WAL DEL SERVICIO (YA CERRADO)--
+        if pendiente['al_confirmar'] is not None and not cerrado:
+            try:
+                pendiente['al_confirmar']()
+            except Exception as e:
+                print(f"Error confirmando datagrama {secuencia}: {e}")
+
+    def _retransmitir_vencidos(self):
+        reenviar = []
+        ahora = time.monotonic()
+        with self._condicion:
+            for secuencia, pendiente in list(self._pendientes.items()):
+                if pendiente['vence'] > ahora:
+                    continue
+                pendiente['intentos'] += 1
+                if pendiente['intentos'] == REINTENTOS_AVISO:
+                    print(f"Aviso: datagrama {secuencia} sin confirmar tras {REINTENTOS_AVISO} reintentos, se sigue reenviando cada {RTO_MAXIMO} s")
+                pendiente['vence'] = ahora + min(RTO_MAXIMO, self._rto * 2 ** min(pendiente['intentos'], REINTENTOS_AVISO))
+                self._retransmisiones += 1
+                reenviar.append(pendiente['datagrama'])
+            proximo = min((p['vence'] for p in self._pendientes.values()), default=None)
+        for datagrama in reenviar:
+            self._transmitir(datagrama)
+        if proximo is None:
+            return None
+        return max(0.001, proximo - time.monotonic())
+
+    # HILO QUE RECIBE LOS ACK Y RETRANSMITE LOS DATAGRAMAS VENCIDOS----------
+    # Sin pendientes la espera es None: select() duerme hasta un aviso.
+    def _atender(self):
+        espera = None
+        while not self._cerrado:
+            try:
+                legibles, _, _ = select.select([self._sock, self._aviso_lector], [], [], espera)
+                if self._aviso_lector in legibles:
+                    self._aviso_lector.recv(4096)
+                if self._sock in legibles:
+                    self._recibir_acks()
+            except (ValueError, OSError):
+                if self._cerrado:
+                    return
+            espera = self._retransmitir_vencidos()
+
+    def _recibir_acks(self):
+        while True:
+            try:
+                datos = self._sock.recv(CABECERA_CONFIABLE.size)
+                marca, tipo, sesion, secuencia, _ = CABECERA_CONFIABLE.unpack_from(datos)
+            except (BlockingIOError, ConnectionRefusedError):
+                return
+            except struct.error:
+                continue
+            if marca == MARCA_CONFIABLE and tipo == TIPO_ACK and sesion == self._sesion:
+                self._confirmar(secuencia)
+
+    def metricas(self):
+        with self._condicion:
+            return {
+                'pendientes': len(self._pendientes),
+                'rto_ms': 1000 * self._rto,
+                'srtt_ms': 1000 * self._srtt if self._srtt is not None else None,
+                'retransmisiones': self._retransmisiones,
+            }
+
+    # CERRAR ESPERANDO QUE SE CONFIRME LO PENDIENTE (CON PLAZO)-------------
+    def cerrar(self, plazo=5.0):
+        limite = time.monotonic() + plazo
+        with self._condicion:
+            while self._pendientes and time.monotonic() < limite:
+                self._condicion.wait(limite - time.monotonic())
+            if self._pendientes:
+                print(f"Error: {len(self._pendientes)} datagramas sin confirmar al cerrar el emisor UDP")
+            self._cerrado = True
+            self._condicion.notify_all()
+        self._avisar()
+        self._hilo.join(1.0)
+        self._sock.close()
+        if self._ruta_propia is not None:
+            eliminar_socket(self._ruta_propia)
+        self._aviso_lector.close()
+        self._aviso_escritor.close()
+
+#CLASE RECEPTOR UDP CONFIABLE-----------------------------------------------
+#     Esta clase es la contraparte del emisor: responde un ACK por cada
+#     datagrama confiable recibido y descarta los duplicados (por ejemplo,
+#     una retransmisión cuyo ACK se perdió). Para cada sesión de emisor
+#     recuerda la secuencia hasta la cual recibió todo (o que el emisor ya
+#     no reenviará) y las secuencias sueltas por encima de ella, que quedan
+#     acotadas por el tamaño de la ventana. Las sesiones sin datagramas
+#     durante PLAZO_SESION se olvidan (un emisor reiniciado o bifurcado
+#     usa una sesión nueva); un emisor con datagramas pendientes reenvía
+#     al menos cada RTO_MAXIMO, así que su sesión sigue viva.
+#     Los datagramas sin cabecera confiable se entregan tal cual.
+#
+#     PARÁMETROS:
+#          plazo_sesion = segundos sin datagramas tras los que se olvida
+#                         una sesión
+#---------------------------------------------------------------------------
+
+class ReceptorUDPConfiable:
+    def __init__(self, plazo_sesion=PLAZO_SESION):
+        self.plazo_sesion = plazo_sesion
+        self._sesiones = {}
+        self._lock = threading.Lock()
+        self._proxima_limpieza = time.monotonic() + plazo_sesion
+
+    # OLVIDAR LAS SESIONES INACTIVAS (CON EL LOCK, A LO SUMO UNA VEZ POR PLAZO)
+    def _limpiar(self, ahora):
+        if ahora < self._proxima_limpieza:
+            return
+        self._proxima_limpieza = ahora + self.plazo_sesion
+        for clave in [c for c, s in self._sesiones.items() if ahora - s['visto'] > self.plazo_sesion]:
+            del self._sesiones[clave]
+
+    def _es_nuevo(self, clave, secuencia, base_emisor):
+        ahora = time.monotonic()
+        with self._lock:
+            self._limpiar(ahora)
+            sesion = self._sesiones.setdefault(clave, {'base': 0, 'recibidas': set()})
+            sesion['visto'] = ahora
+            if base_emisor > sesion['base']:
+                # LO ANTERIOR A LA BASE DEL EMISOR NUNCA SE VOLVERÁ A ENVIAR
+                sesion['base'] = base_emisor
+                sesion['recibidas'] = {s for s in sesion['recibidas'] if s >= base_emisor}
+            if secuencia < sesion['base'] or secuencia in sesion['recibidas']:
+                return False
+            sesion['recibidas'].add(secuencia)
+            while sesion['base'] in sesion['recibidas']:
+                sesion['recibidas'].discard(sesion['base'])
+                sesion['base'] += 1
+            return True
+
+    # UN DATAGRAMA CONFIABLE QUE NO SE CONFIRMA SE VUELVE A RECIBIR--------
+    @staticmethod
+    def es_confiable(datagrama):
+        return len(datagrama) >= CABECERA_CONFIABLE.size and datagrama[0] == MARCA_CONFIABLE
+
+    # DATOS DE UN DATAGRAMA CONFIABLE, SIN SU CABECERA---------------------
+    @staticmethod
+    def datos(datagrama):
+        return datagrama[CABECERA_CONFIABLE.size:]
+
+    # FILTRAR UN DATAGRAMA RECIBIDO----------------------------------------
+    # Retorna los datos a procesar, o None si el datagrama es un duplicado.
+    def recibir(self, datagrama, addr, responder):
+        if not self.es_confiable(datagrama):
+            return datagrama
+        _, tipo, sesion, secuencia, base_emisor = CABECERA_CONFIABLE.unpack_from(datagrama)
+        if tipo != TIPO_DATOS:
+            return None
+        try:
+            responder(CABECERA_CONFIABLE.pack(MARCA_CONFIABLE, TIPO_ACK, sesion, secuencia, 0), addr)
+        except OSError as e:
+            print(f"Error enviando ACK: {e}")
+        if not self._es_nuevo((addr, sesion), secuencia, base_emisor):
+            return None
+        return self.datos(datagrama)
@@ -0,0 +1,140 @@
+#LIBRERÍAS NECESARIAS-------------------------------------------------------
+
+import functools
+import os
+import struct
+import threading
+import zlib
+
+#VARIABLES NECESARIAS-------------------------------------------------------
+
+# ENTRADA: TIPO, CRC32, NÚMERO DE MENSAJE Y LARGO DE LOS DATOS---------------
+# Los mensajes de texto y binarios se guardan tal cual llegaron; una
+# confirmación solo lleva el número del mensaje que confirma.
+CABECERA_ENTRADA = struct.Struct('!BIQI')
+ENTRADA_TEXTO = 1
+ENTRADA_BINARIA = 2
+ENTRADA_CONFIRMACION = 3
+TAMANO_COMPACTACION = 1024 * 1024
+DIFERIDA = object()  # lo retorna una función que confirmará el mensaje más tarde
+
+#CLASE WAL DE MENSAJES------------------------------------------------------
+#     Esta clase es un registro de escritura anticipada (WAL) para los
+#     mensajes que un servicio tiene en curso. Cada mensaje recibido se
+#     escribe antes de procesarlo y se marca como confirmado cuando se
+#     reenvió con éxito al siguiente servicio. Si el proceso muere, al
+#     volver a abrirse el WAL entrega los mensajes sin confirmar para
+#     procesarlos de nuevo; los duplicados que esto pueda generar ya los
+#     descartan los servicios siguientes. Las entradas se escriben sin
+#     fsync: sobreviven a la caída del proceso, no a la del sistema.
+#     Al abrir, y cuando no quedan pendientes y el archivo creció, el WAL
+#     se compacta para que la recuperación lea solo lo necesario.
+#
+#     PARÁMETROS:
+#          ruta = archivo del WAL
+#---------------------------------------------------------------------------
+
+class WALMensajes:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._pendientes = self._leer()
+        self.recuperados = sorted(self._pendientes.items())
+        if self.recuperados:
+            print(f"WAL {ruta}: {len(self.recuperados)} mensajes sin reenviar recuperados")
+        self._siguiente = max(self._pendientes, default=0) + 1
+        self._compactar()
+
+    # LEER EL WAL Y QUEDARSE CON LOS MENSAJES SIN CONFIRMAR-----------------
+    # Una entrada final incompleta (caída a mitad de escritura) se ignora.
+    def _leer(self):
+        pendientes = {}
+        if not os.path.exists(self.ruta):
+            return pendientes
+        with open(self.ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        posicion = 0
+        while posicion + CABECERA_ENTRADA.size <= len(contenido):
+            tipo, crc, numero, largo = CABECERA_ENTRADA.unpack_from(contenido, posicion)
+            inicio = posicion + CABECERA_ENTRADA.size
+            datos = contenido[inicio:inicio + largo]
+            if len(datos) < largo or zlib.crc32(datos, numero & 0xFFFFFFFF) != crc:
+                break
+            if tipo == ENTRADA_CONFIRMACION:
+                pendientes.pop(numero, None)
+            else:
+                pendientes[numero] = datos.decode('utf-8') if tipo == ENTRADA_TEXTO else datos
+            posicion = inicio + largo
+        return pendientes
+
+    def _entrada(self, tipo, numero, datos=b""):
+        return CABECERA_ENTRADA.pack(tipo, zlib.crc32(datos, numero & 0xFFFFFFFF), numero, len(datos)) + datos
+
+    # REESCRIBIR EL WAL SOLO CON LOS PENDIENTES (REEMPLAZO ATÓMICO)----------
+    def _compactar(self):
+        temporal = self.ruta + ".tmp"
+        with open(temporal, 'wb') as archivo:
+            for numero, datos in sorted(self._pendientes.items()):
+                archivo.write(self._datos_entrada(numero, datos))
+        os.replace(temporal, self.ruta)
+        self._archivo = open(self.ruta, 'ab')
+
+    def _datos_entrada(self, numero, datos):
+        if isinstance(datos, str):
+            return self._entrada(ENTRADA_TEXTO, numero, datos.encode('utf-8'))
+        return self._entrada(ENTRADA_BINARIA, numero, bytes(datos))
+
+    # REGISTRAR UN MENSAJE ANTES DE PROCESARLO------------------------------
+    def registrar(self, datos):
+        with self._lock:
+            numero = self._siguiente
+            self._siguiente += 1
+            self._pendientes[numero] = datos
+            self._archivo.write(self._datos_entrada(numero, datos))
+            self._archivo.flush()
+            return numero
+
+    # MARCAR UN MENSAJE COMO REENVIADO--------------------------------------
+    def confirmar(self, numero):
+        with self._lock:
+            if self._pendientes.pop(numero, None) is None:
+                return
+            self._archivo.write(self._entrada(ENTRADA_CONFIRMACION, numero))
+            self._archivo.flush()
+            if not self._pendientes and self._archivo.tell() > TAMANO_COMPACTACION:
+                self._archivo.truncate(0)
+                self._archivo.seek(0)
+
+    # ENVOLVER UNA FUNCIÓN DE PROCESAMIENTO---------------------------------
+    # La función retorna False si no pudo reenviar el mensaje; en ese caso
+    # queda pendiente para el próximo reinicio. Con numero se reprocesa un
+    # mensaje recuperado sin volver a registrarlo. Con diferida, la función
+    # recibe además confirmar=función y, si retorna DIFERIDA, el mensaje se
+    # confirma cuando ella la llame (por ejemplo, al llegar el ACK).
+    def proteger(self, procesar, diferida=False):
+        def procesar_registrado(datos, *args, numero=None):
+            if numero is None:
+                numero = self.registrar(datos)
+            if diferida:
+                resultado = procesar(datos, *args, confirmar=functools.partial(self.confirmar, numero))
+            else:
+                resultado = procesar(datos, *args)
+            if resultado is not False and resultado is not DIFERIDA:
+                self.confirmar(numero)
+        return procesar_registrado
+
+    # REGISTRAR UN MENSAJE Y RETORNAR LA TAREA QUE LO PROCESA---------------
+    # Permite registrarlo al recibirlo, antes de que espere en una cola.
+    def tarea(self, procesar_registrado, datos, *args):
+        return functools.partial(procesar_registrado, datos, *args, numero=self.registrar(datos))
+
+    # TAREAS PARA REPROCESAR LOS MENSAJES RECUPERADOS-----------------------
+    def reprocesar(self, procesar_registrado, *args):
+        return [
+            functools.partial(procesar_registrado, datos, *args, numero=numero)
+            for numero, datos in self.recuperados
+        ]
+
+    def cerrar(self):
+        with self._lock:
+            self._archivo.close()